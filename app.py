@@ -1,20 +1,58 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import ccxt
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import time
 import os
 
+from engine import backtest
+from streaming import StreamingBacktest
+from charts import backtest_figure, line_downsample, frame_downsample
+from strategies import ma_cross_strategy, rsi_strategy, bollinger_bands_strategy, signal_matrix, STRATEGIES
+from composite import composite_strategy, LEGS
+from compact import CompactCandles, compact_backtest
+from portfolio import align_close, backtest_portfolio, ALLOCATIONS
+from sweep import parameter_grid, run_sweep
+from walkforward import walk_forward
+from screener import screen, rank
+from metrics import performance, periods_per_year
+from montecarlo import robustness
+from profiling import StageTimer, SamplingProfiler
+from synthetic import synthetic_ohlcv
+from data import parse_timeframe, timeframe_ms
+from cache_manager import CacheManager
+from results import ResultCache, data_fingerprint, result_key
+from exchanges import connect, exchange_symbols, unthrottled, health as exchange_health, HEALTH_TTL
+from scheduler import FetchScheduler, INTERACTIVE, BACKGROUND
+
 # 앱 타이틀 설정
 st.set_page_config(page_title="코인 백테스팅 시스템", layout="wide")
 st.title("코인 백테스팅 시스템")
 
-# 캐시 디렉토리 생성
-if not os.path.exists('cache'):
-    os.makedirs('cache')
+# 캐시 용량 상한 (MB, 환경 변수 CACHE_MAX_MB로 조정)
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_MB', 512)) * 1024 * 1024
+
+# 단계별 성능 측정 결과를 이어 쓸 JSON Lines 파일 (환경 변수 PERF_LOG, 비어 있으면 기록하지 않음)
+PERF_LOG = os.environ.get('PERF_LOG')
+
+# 캐시 관리자 (프로세스 내 모든 세션이 공유)
+@st.cache_resource
+def get_cache_manager():
+    return CacheManager('cache', CACHE_MAX_BYTES)
+
+cache_manager = get_cache_manager()
+
+# 백테스팅 결과 캐시 용량 상한 (MB, 환경 변수 RESULT_CACHE_MAX_MB로 조정)
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_MB', 128)) * 1024 * 1024
+
+# 백테스팅 결과 캐시 (디스크에 저장되므로 다른 세션/프로세스와도 공유)
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(os.path.join('cache', 'results'), RESULT_CACHE_MAX_BYTES)
+
+result_cache = get_result_cache()
 
 # 지원되는 거래소 목록
 SUPPORTED_EXCHANGES = {
@@ -25,7 +63,7 @@ SUPPORTED_EXCHANGES = {
     "KuCoin": "kucoin"
 }
 
-# 거래소별 기본 코인 목록
+# 거래소별 기본 코인 목록 (심볼 목록 맨 앞에 표시)
 EXCHANGE_COINS = {
     "binanceus": ["BTC/USDT", "ETH/USDT", "ADA/USDT", "SOL/USDT", "XRP/USDT"],
     "binance": ["BTC/USDT", "ETH/USDT", "ADA/USDT", "SOL/USDT", "XRP/USDT", "DOGE/USDT", "DOT/USDT"],
@@ -42,71 +80,57 @@ selected_exchange_name = st.sidebar.selectbox(
 )
 exchange_id = SUPPORTED_EXCHANGES[selected_exchange_name]
 
-# 거래소 설정 및 에러 처리
-@st.cache_data(ttl=3600)
+# 거래소 연결: 모든 후보를 동시에 확인하고 선택한 거래소를 우선 사용
+@st.cache_resource(ttl=HEALTH_TTL, show_spinner="거래소 연결 확인 중...")
 def get_exchange(exchange_id):
-    try:
-        exchange_class = getattr(ccxt, exchange_id)
-        exchange = exchange_class({
-            'enableRateLimit': True,
-        })
-        
-        # 테스트 API 호출로 연결 확인
-        exchange.load_markets()
-        return {
-            "exchange": exchange,
-            "status": "success",
-            "message": f"{exchange_id} 거래소에 연결되었습니다."
-        }
-    except Exception as e:
-        return {
-            "exchange": None,
-            "status": "error",
-            "message": f"{exchange_id} 연결 실패: {str(e)}"
-        }
+    connected_id, exchange = connect(exchange_id, list(SUPPORTED_EXCHANGES.values()))
+    if exchange is None:
+        # 실패 결과는 캐시하지 않도록 예외로 처리
+        raise ConnectionError("모든 거래소 연결에 실패했습니다.")
+    return connected_id, exchange
 
-# 선택한 거래소 초기화
-exchange_result = get_exchange(exchange_id)
+try:
+    connected_id, exchange = get_exchange(exchange_id)
+except ConnectionError:
+    st.error("모든 거래소 연결에 실패했습니다. 네트워크 연결을 확인하세요.")
+    st.stop()
 
-if exchange_result["status"] == "success":
-    st.sidebar.success(exchange_result["message"])
-    exchange = exchange_result["exchange"]
+if connected_id == exchange_id:
+    st.sidebar.success(f"{exchange_id} 거래소에 연결되었습니다.")
 else:
-    st.sidebar.error(exchange_result["message"])
-    
-    # 대체 거래소 자동 시도
-    st.sidebar.warning("다른 거래소로 연결을 시도합니다...")
-    
-    for backup_id in SUPPORTED_EXCHANGES.values():
-        if backup_id != exchange_id:
-            backup_result = get_exchange(backup_id)
-            if backup_result["status"] == "success":
-                st.sidebar.success(f"대체 거래소: {backup_result['message']}")
-                exchange = backup_result["exchange"]
-                exchange_id = backup_id
-                # 선택된 거래소명 업데이트
-                for name, id in SUPPORTED_EXCHANGES.items():
-                    if id == exchange_id:
-                        selected_exchange_name = name
-                break
-    
-    if exchange_result["status"] == "error" and "exchange" not in locals():
-        st.error("모든 거래소 연결에 실패했습니다. 네트워크 연결을 확인하세요.")
-        st.stop()
+    failure = exchange_health().get(exchange_id, {}).get('message')
+    st.sidebar.error(f"{exchange_id} 연결 실패: {failure}")
+    st.sidebar.success(f"대체 거래소: {connected_id} 거래소에 연결되었습니다.")
+    exchange_id = connected_id
+    # 선택된 거래소명 업데이트
+    for name, id in SUPPORTED_EXCHANGES.items():
+        if id == exchange_id:
+            selected_exchange_name = name
+
+# 요청 스케줄러 (거래소별 하나, 모든 세션이 공유) - 허용 속도 안에서 여러 요청을 동시에 보냄
+@st.cache_resource
+def get_scheduler(exchange_id, _exchange):
+    return FetchScheduler(unthrottled(_exchange))
+
+scheduler = get_scheduler(exchange_id, exchange)
 
 # 사이드바: 기본 설정
 st.sidebar.header("백테스팅 설정")
 
 # 코인 선택 - 선택된 거래소에 따라 목록 변경
+symbol_options = exchange_symbols(exchange, EXCHANGE_COINS.get(exchange_id, ["BTC/USDT", "ETH/USDT"]))
 symbol = st.sidebar.selectbox(
     "코인 선택",
-    EXCHANGE_COINS.get(exchange_id, ["BTC/USDT", "ETH/USDT"])
+    symbol_options
 )
 
-# 시간 프레임 선택
+# 시간 프레임 선택 - 코인마다 가장 세밀한 시간 프레임만 받아 저장하고 나머지는 로컬에서 집계
+# (거래소가 지원하지 않는 2h, 12h 등도 집계로 만들 수 있음)
+TIMEFRAMES = ["1m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "12h", "1d", "1w"]
 timeframe = st.sidebar.selectbox(
     "시간 프레임",
-    ["1h", "4h", "1d"]
+    TIMEFRAMES,
+    index=TIMEFRAMES.index("1h")
 )
 
 # 전략 선택
@@ -130,236 +154,202 @@ slippage_percent = st.sidebar.number_input("슬리피지 (%)", min_value=0.0, ma
 slippage_ratio = slippage_percent / 100.0
 
 # OHLCV 데이터 가져오기
-@st.cache_data(ttl=3600)
-def fetch_ohlcv(_exchange, symbol, timeframe, since, limit=1000):
-    cache_file = f"cache/{_exchange.id}_{symbol.replace('/', '_')}_{timeframe}_{since}.csv"
-    
-    # 캐시 파일이 존재하면 로드
-    if os.path.exists(cache_file):
-        return pd.read_csv(cache_file, index_col=0, parse_dates=True)
-    
+# compact=True이면 float32 열 배열(compact.CompactCandles)로 반환 (메모리 절약 모드)
+def fetch_ohlcv(_exchange, symbol, timeframe, since, compact=False):
     try:
-        # 데이터 가져오기
-        ohlcv = _exchange.fetch_ohlcv(symbol, timeframe, since, limit)
-        
-        # 데이터프레임 변환
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        
-        # 캐시 저장
-        df.to_csv(cache_file)
-        
-        return df
+        # 저장된 구간은 재사용하고 빠진 구간 및 형성 중인 마지막 캔들만 가져오기 (빠진 구간은 페이지를 동시에 요청)
+        return cache_manager.load(_exchange, symbol, timeframe, since, fetch=scheduler.range_fetcher(INTERACTIVE),
+                                  compact=compact)
     except Exception as e:
-        st.error(f"데이터를 가져오는 데 실패했습니다: {str(e)}")
-        # 샘플 데이터 생성 (대체 데이터)
-        st.warning("샘플 데이터를 사용합니다.")
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back)
-        date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-        
-        # 랜덤 가격 생성
-        np.random.seed(42)  # 재현성을 위한 시드 설정
-        base_price = 100
-        prices = [base_price]
-        for i in range(1, len(date_range)):
-            change = np.random.normal(0, 2)  # 평균 0, 표준편차 2의 정규분포
-            new_price = max(prices[-1] * (1 + change/100), 1)  # 최소 가격은 1
-            prices.append(new_price)
-        
-        # 캔들스틱 데이터 생성
-        df = pd.DataFrame(index=date_range)
-        df['close'] = prices
-        df['open'] = df['close'].shift(1).fillna(df['close'][0] * 0.99)
-        df['high'] = df[['open', 'close']].max(axis=1) * (1 + np.random.uniform(0, 0.03, len(df)))
-        df['low'] = df[['open', 'close']].min(axis=1) * (1 - np.random.uniform(0, 0.03, len(df)))
-        df['volume'] = np.random.uniform(1000, 10000, len(df))
-        
-        return df
-
-# 전략 구현 - MA 교차
-def ma_cross_strategy(df, short_window=20, long_window=50):
-    signals = pd.DataFrame(index=df.index)
-    signals['price'] = df['close']
-    signals['short_ma'] = df['close'].rolling(window=short_window, min_periods=1).mean()
-    signals['long_ma'] = df['close'].rolling(window=long_window, min_periods=1).mean()
-    
-    # 매수 신호: 단기 MA가 장기 MA를 상향 돌파
-    signals['signal'] = 0
-    signals['signal'][short_window:] = np.where(
-        signals['short_ma'][short_window:] > signals['long_ma'][short_window:], 1, 0
-    )
-    
-    # 포지션 변화 감지
-    signals['position'] = signals['signal'].diff()
-    
-    return signals
+        df = sample_ohlcv(e, timeframe, since)
+        return CompactCandles.from_frame(df) if compact else df
 
-# 전략 구현 - RSI
-def rsi_strategy(df, rsi_period=14, oversold=30, overbought=70):
-    signals = pd.DataFrame(index=df.index)
-    signals['price'] = df['close']
-    
-    # RSI 계산
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
-    
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    signals['rsi'] = rsi
-    
-    # 매수 신호: RSI가 oversold 아래로 갔다가 다시 올라옴
-    # 매도 신호: RSI가 overbought 위로 갔다가 다시 내려옴
-    signals['signal'] = 0
-    signals['signal'] = np.where(signals['rsi'] < oversold, 1, 0)  # 매수
-    signals['signal'] = np.where(signals['rsi'] > overbought, 0, signals['signal'])  # 매도
-    
-    # 포지션 변화 감지
-    signals['position'] = signals['signal'].diff()
-    
-    return signals
+# 데이터를 가져오지 못했을 때의 대체 데이터 - 선택한 시간 프레임과 기간으로 재현 가능한 가상 데이터
+def sample_ohlcv(error, timeframe, since):
+    st.error(f"데이터를 가져오는 데 실패했습니다: {str(error)}")
+    st.warning("샘플 데이터를 사용합니다.")
+    return synthetic_ohlcv(timeframe=timeframe, start=since, end=int(time.time() * 1000), seed=42)
 
-# 전략 구현 - 볼린저 밴드
-def bollinger_bands_strategy(df, window=20, num_std=2):
-    signals = pd.DataFrame(index=df.index)
-    signals['price'] = df['close']
-    
-    # 볼린저 밴드 계산
-    signals['rolling_mean'] = df['close'].rolling(window=window).mean()
-    signals['rolling_std'] = df['close'].rolling(window=window).std()
-    signals['upper_band'] = signals['rolling_mean'] + (signals['rolling_std'] * num_std)
-    signals['lower_band'] = signals['rolling_mean'] - (signals['rolling_std'] * num_std)
-    
-    # 매수 신호: 가격이 하단 밴드 아래로 갔다가 다시 위로
-    # 매도 신호: 가격이 상단 밴드 위로 갔다가 다시 아래로
-    signals['signal'] = 0
-    signals['signal'] = np.where(signals['price'] < signals['lower_band'], 1, 0)  # 매수
-    signals['signal'] = np.where(signals['price'] > signals['upper_band'], 0, signals['signal'])  # 매도
-    
-    # 포지션 변화 감지
-    signals['position'] = signals['signal'].diff()
-    
-    return signals
+# 여러 코인을 동시에 가져오기 (코인마다 스케줄러 작업 하나, 실패한 코인만 대체 데이터 사용)
+def fetch_many(symbols, timeframe, since):
+    futures = {s: scheduler.submit(lambda paced, s=s: cache_manager.load(paced, s, timeframe, since), INTERACTIVE)
+               for s in symbols}
+    frames = {}
+    for s, future in futures.items():
+        try:
+            frames[s] = future.result()
+        except Exception as e:
+            frames[s] = sample_ohlcv(e, timeframe, since)
+    return frames
 
-# 백테스팅 함수 (수수료 및 슬리피지 포함)
-def backtest(signals, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001):
-    positions = pd.DataFrame(index=signals.index).fillna(0.0)
-    positions['asset'] = signals['signal']  # 보유 자산 (0 또는 1)
-    
-    # 포트폴리오 가치 계산
-    portfolio = pd.DataFrame(index=signals.index)
-    portfolio['positions'] = positions['asset'] * signals['price']  # 보유 자산 가치
-    
-    # 현금 및 총 가치 계산 (수수료 및 슬리피지 포함)
-    cash = initial_capital
-    total_values = []
-    
-    for i, row in signals.iterrows():
-        # 매수 또는 매도 시 수수료 및 슬리피지 계산
-        position_change = positions['asset'].diff().fillna(0).loc[i]
-        
-        if position_change > 0:  # 매수
-            # 슬리피지 적용 가격
-            effective_price = row['price'] * (1 + slippage_ratio)
-            # 수수료 계산
-            fee = cash * fee_ratio
-            # 구매할 수 있는 자산 수량
-            asset_amount = (cash - fee) / effective_price
-            cash = 0  # 모든 현금을 자산 구매에 사용
-            
-            position_value = asset_amount * row['price']
-            total_value = position_value + cash
-        
-        elif position_change < 0:  # 매도
-            # 슬리피지 적용 가격
-            effective_price = row['price'] * (1 - slippage_ratio)
-            # 보유 자산 가치
-            position_value = portfolio['positions'].loc[i] if i in portfolio.index else 0
-            # 매도 후 현금 (수수료 차감)
-            sale_value = position_value * effective_price / row['price']
-            fee = sale_value * fee_ratio
-            cash = sale_value - fee
-            
-            position_value = 0
-            total_value = position_value + cash
-        
-        else:  # 포지션 변화 없음
-            if positions['asset'].loc[i] == 1:  # 자산 보유 중
-                position_value = portfolio['positions'].loc[i] if i in portfolio.index else 0
-                total_value = position_value + cash
-            else:  # 현금 보유 중
-                position_value = 0
-                total_value = cash
-        
-        total_values.append(total_value)
-    
-    portfolio['cash'] = initial_capital - (positions['asset'].diff().fillna(0) * signals['price']).cumsum()
-    portfolio['total'] = pd.Series(total_values, index=signals.index)
-    portfolio['returns'] = portfolio['total'].pct_change()
-    
-    # 거래 기록
-    trades = pd.DataFrame(columns=['timestamp', 'type', 'price', 'effective_price', 'units', 'value', 'fee'])
-    for i, row in signals.iterrows():
-        if row['position'] == 1:  # 매수
-            effective_price = row['price'] * (1 + slippage_ratio)
-            cash_available = portfolio.loc[i, 'cash'] if i in portfolio.index else 0
-            fee = cash_available * fee_ratio
-            units = (cash_available - fee) / effective_price
-            
-            trade = {
-                'timestamp': i,
-                'type': 'BUY',
-                'price': row['price'],
-                'effective_price': effective_price,
-                'units': units,
-                'value': units * row['price'],
-                'fee': fee
-            }
-            trades = pd.concat([trades, pd.DataFrame([trade])], ignore_index=True)
-            
-        elif row['position'] == -1:  # 매도
-            effective_price = row['price'] * (1 - slippage_ratio)
-            position_value = portfolio.loc[i, 'positions'] if i in portfolio.index else 0
-            units = position_value / row['price']
-            fee = effective_price * units * fee_ratio
-            
-            trade = {
-                'timestamp': i,
-                'type': 'SELL',
-                'price': row['price'],
-                'effective_price': effective_price,
-                'units': units,
-                'value': units * effective_price,
-                'fee': fee
-            }
-            trades = pd.concat([trades, pd.DataFrame([trade])], ignore_index=True)
-    
-    return portfolio, trades
+# 실행 모드
+# - 파라미터 최적화: 슬라이더 범위 안의 모든 조합을 병렬로 백테스팅
+# - 포트폴리오: 여러 코인에 같은 전략을 동시에 적용하고 자본을 나누어 운용
+# - 실시간 모니터링: 새로 마감된 캔들만 이어서 계산하며 주기적으로 결과 갱신
+# - 워크포워드: 학습 구간에서 최적화한 파라미터를 바로 다음 검증 구간에 적용하는 과정을 구간을 밀며 반복
+# - 스크리너: 거래소의 여러 코인에 같은 전략을 적용해 끝난 코인부터 순위표로 표시
+run_mode = st.sidebar.radio("실행 모드", ["단일 백테스팅", "파라미터 최적화", "워크포워드", "포트폴리오", "실시간 모니터링",
+                                      "스크리너"])
+walkforward_mode = run_mode == "워크포워드"
+# 파라미터 범위를 입력받는 모드
+sweep_mode = run_mode == "파라미터 최적화" or walkforward_mode
+portfolio_mode = run_mode == "포트폴리오"
+live_mode = run_mode == "실시간 모니터링"
+screener_mode = run_mode == "스크리너"
 
 # 전략 파라미터 사이드바 추가
 if strategy == "MA 교차":
     st.sidebar.subheader("MA 교차 파라미터")
-    short_window = st.sidebar.slider("단기 이동평균 기간", 5, 50, 20)
-    long_window = st.sidebar.slider("장기 이동평균 기간", 20, 200, 50)
+    if sweep_mode:
+        short_range = st.sidebar.slider("단기 이동평균 기간 범위", 5, 50, (5, 50))
+        long_range = st.sidebar.slider("장기 이동평균 기간 범위", 20, 200, (20, 200))
+        grid_step = st.sidebar.slider("탐색 간격", 1, 20, 5)
+        sweep_ranges = {
+            'short_window': range(short_range[0], short_range[1] + 1, grid_step),
+            'long_window': range(long_range[0], long_range[1] + 1, grid_step),
+        }
+    else:
+        short_window = st.sidebar.slider("단기 이동평균 기간", 5, 50, 20)
+        long_window = st.sidebar.slider("장기 이동평균 기간", 20, 200, 50)
     
 elif strategy == "RSI":
     st.sidebar.subheader("RSI 파라미터")
-    rsi_period = st.sidebar.slider("RSI 기간", 5, 30, 14)
-    oversold = st.sidebar.slider("과매도 기준", 20, 40, 30)
-    overbought = st.sidebar.slider("과매수 기준", 60, 80, 70)
+    if sweep_mode:
+        period_range = st.sidebar.slider("RSI 기간 범위", 5, 30, (5, 30))
+        oversold_range = st.sidebar.slider("과매도 기준 범위", 20, 40, (20, 40))
+        overbought_range = st.sidebar.slider("과매수 기준 범위", 60, 80, (60, 80))
+        grid_step = st.sidebar.slider("탐색 간격", 1, 10, 2)
+        sweep_ranges = {
+            'rsi_period': range(period_range[0], period_range[1] + 1, grid_step),
+            'oversold': range(oversold_range[0], oversold_range[1] + 1, grid_step),
+            'overbought': range(overbought_range[0], overbought_range[1] + 1, grid_step),
+        }
+    else:
+        rsi_period = st.sidebar.slider("RSI 기간", 5, 30, 14)
+        oversold = st.sidebar.slider("과매도 기준", 20, 40, 30)
+        overbought = st.sidebar.slider("과매수 기준", 60, 80, 70)
     
 elif strategy == "볼린저 밴드":
     st.sidebar.subheader("볼린저 밴드 파라미터")
-    bb_window = st.sidebar.slider("이동평균 기간", 5, 50, 20)
-    bb_std = st.sidebar.slider("표준편차 배수", 1.0, 3.0, 2.0, 0.1)
+    if sweep_mode:
+        window_range = st.sidebar.slider("이동평균 기간 범위", 5, 50, (5, 50))
+        std_range = st.sidebar.slider("표준편차 배수 범위", 1.0, 3.0, (1.0, 3.0), 0.1)
+        grid_step = st.sidebar.slider("탐색 간격", 1, 10, 1)
+        sweep_ranges = {
+            'window': range(window_range[0], window_range[1] + 1, grid_step),
+            'num_std': np.round(np.arange(std_range[0], std_range[1] + 1e-9, 0.1 * grid_step), 2),
+        }
+    else:
+        bb_window = st.sidebar.slider("이동평균 기간", 5, 50, 20)
+        bb_std = st.sidebar.slider("표준편차 배수", 1.0, 3.0, 2.0, 0.1)
+
+# 전략 함수에 넘길 파라미터
+if not sweep_mode:
+    if strategy == "MA 교차":
+        strategy_kwargs = dict(short_window=short_window, long_window=long_window)
+    elif strategy == "RSI":
+        strategy_kwargs = dict(rsi_period=rsi_period, oversold=oversold, overbought=overbought)
+    else:
+        strategy_kwargs = dict(window=bb_window, num_std=bb_std)
+
+# 워크포워드 설정
+if walkforward_mode:
+    st.sidebar.subheader("워크포워드 설정")
+    train_days = st.sidebar.slider("학습 기간 (일)", 7, 180, 60)
+    test_days = st.sidebar.slider("검증 기간 (일)", 1, 90, 15)
+    objective_name = st.sidebar.selectbox("최적화 기준", ["총 수익률", "샤프 비율", "소르티노 비율", "칼마 비율"])
+    objective = {'총 수익률': 'total_return', '샤프 비율': 'sharpe_ratio', '소르티노 비율': 'sortino_ratio',
+                 '칼마 비율': 'calmar_ratio'}[objective_name]
+
+# 포트폴리오 설정
+if portfolio_mode:
+    st.sidebar.subheader("포트폴리오 설정")
+    portfolio_symbols = st.sidebar.multiselect(
+        "포트폴리오 코인",
+        symbol_options,
+        default=[s for s in EXCHANGE_COINS.get(exchange_id, []) if s in symbol_options]
+    )
+    allocation_name = st.sidebar.selectbox("자본 배분", list(ALLOCATIONS.keys()))
+    max_weight_percent = st.sidebar.slider("코인별 최대 비중 (%)", 5, 100, 100, 5)
+
+# 스크리너 설정 - 기준 통화가 같은 코인 중 앞에서부터 최대 코인 수만큼 (기본 코인을 먼저 포함)
+SCREEN_METRICS = {"총 수익률": 'total_return', "샤프 비율": 'sharpe_ratio', "소르티노 비율": 'sortino_ratio',
+                  "칼마 비율": 'calmar_ratio', "승률": 'win_rate', "수익 팩터": 'profit_factor'}
+if screener_mode:
+    st.sidebar.subheader("스크리너 설정")
+    quotes = sorted({s.split('/')[1] for s in symbol_options if '/' in s})
+    default_quote = symbol_options[0].split('/')[1] if symbol_options and '/' in symbol_options[0] else None
+    screener_quote = st.sidebar.selectbox("기준 통화", quotes,
+                                          index=quotes.index(default_quote) if default_quote in quotes else 0)
+    screener_limit = st.sidebar.slider("최대 코인 수", 10, 500, 100, 10)
+    screener_metric_name = st.sidebar.selectbox("순위 기준", list(SCREEN_METRICS.keys()))
+
+# 실시간 모니터링 설정
+if live_mode:
+    st.sidebar.subheader("실시간 모니터링 설정")
+    refresh_seconds = st.sidebar.slider("갱신 주기 (초)", 5, 300, 30, 5)
+    # 설정이 바뀌면 누적 상태를 새로 만들어야 하므로 설정값을 함께 저장
+    live_key = (exchange_id, symbol, timeframe, strategy, tuple(sorted(strategy_kwargs.items())),
+                initial_capital, fee_ratio, slippage_ratio, days_back)
+
+# 복합 전략 설정 (단일 백테스팅) - 선택한 전략에 다른 전략(기본 파라미터)과 지표 조건을 AND/OR/투표로 결합
+COMBINE_LABELS = {"사용 안 함": None, "AND (모두 만족)": 'and', "OR (하나 이상)": 'or', "투표 (과반)": 'vote'}
+if run_mode == "단일 백테스팅":
+    with st.sidebar.expander("복합 전략"):
+        combine_label = st.selectbox("결합 방식", list(COMBINE_LABELS.keys()))
+        extra_strategies = st.multiselect("함께 사용할 전략 (기본 파라미터)", [name for name in LEGS if name != strategy])
+        use_rsi_filter = st.checkbox("RSI 조건 추가")
+        rsi_filter_op = st.selectbox("RSI 비교", ["<", ">"], disabled=not use_rsi_filter)
+        rsi_filter_value = st.slider("RSI 기준값", 10, 90, 50, disabled=not use_rsi_filter)
+    composite_legs = [{'strategy': name, 'params': {}} for name in extra_strategies]
+    if use_rsi_filter:
+        composite_legs.append({'indicator': 'rsi', 'window': 14, 'op': rsi_filter_op, 'value': rsi_filter_value})
+    combine = COMBINE_LABELS[combine_label]
+    if combine is None:
+        composite_legs = []
+
+# 손절/익절 설정 (단일 백테스팅) - 0이면 사용하지 않음
+# 하위 시간 프레임을 고르면 봉 안의 가격 순서대로 먼저 닿은 가격을 찾고, 아니면 봉의 고가/저가로 판정
+if run_mode == "단일 백테스팅":
+    with st.sidebar.expander("손절/익절"):
+        stop_loss_percent = st.number_input("손절 (%)", min_value=0.0, max_value=50.0, value=0.0, step=0.5)
+        take_profit_percent = st.number_input("익절 (%)", min_value=0.0, max_value=200.0, value=0.0, step=0.5)
+        trailing_percent = st.number_input("추적 손절 (%)", min_value=0.0, max_value=50.0, value=0.0, step=0.5,
+                                           help="진입 후 최고가 대비 하락률")
+        intrabar_options = ["봉 고가/저가"] + [tf for tf in ["1m", "5m", "15m", "1h"]
+                                             if parse_timeframe(tf) < parse_timeframe(timeframe)]
+        intrabar_timeframe = st.selectbox("체결 판정 데이터", intrabar_options,
+                                          help="하위 시간 프레임 캔들을 추가로 받아 손절과 익절 중 먼저 닿은 가격을 찾습니다.")
+    stops = {'stop_loss': stop_loss_percent / 100 or None, 'take_profit': take_profit_percent / 100 or None,
+             'trailing_stop': trailing_percent / 100 or None}
+    stops = stops if any(stops.values()) else None
+
+# 성능 측정 설정 (단일 백테스팅)
+if run_mode == "단일 백테스팅":
+    with st.sidebar.expander("성능 측정"):
+        measure_memory = st.checkbox("메모리 사용량 측정", help="단계별 최대 메모리 할당량을 측정합니다. 실행이 느려질 수 있습니다.")
+        run_profiler = st.checkbox("샘플링 프로파일러", help="이번 실행의 호출 스택을 주기적으로 기록해 시간이 많이 걸린 함수를 표시합니다.")
+        compact_mode = st.checkbox("메모리 절약 모드", help="캔들을 float32 배열로, 신호를 비트마스크로 보관하고 "
+                                   "차트에 표시할 구간만 DataFrame으로 만듭니다. 지표 선, 결과 캐시, "
+                                   "하위 시간 프레임 손절/익절 판정은 사용하지 않습니다. "
+                                   "실행 최대 메모리를 항상 측정해 표시합니다.")
 
 # 백테스팅 시작 버튼
 start_backtest = st.sidebar.button("백테스팅 시작")
 
+if live_mode and start_backtest:
+    since = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1000)
+    since -= since % timeframe_ms(exchange, timeframe)
+    st.session_state['live'] = {
+        'key': live_key,
+        'since': since,
+        'stream': StreamingBacktest(strategy, strategy_kwargs, initial_capital, fee_ratio, slippage_ratio),
+    }
+
+live_running = live_mode and st.session_state.get('live', {}).get('key') == live_key
+
 # 초기 안내 메시지
-if not start_backtest:
+if not start_backtest and not live_running:
     st.info("👈 왼쪽 사이드바에서 백테스팅 설정 후 '백테스팅 시작' 버튼을 클릭하세요.")
     
     # 사용 안내
@@ -402,203 +392,421 @@ if not start_backtest:
         상단 밴드 위로 올라갈 때 매도하는 전략입니다.
         """)
 
-if start_backtest:
-    with st.spinner('데이터 로딩 중...'):
-        # 종료 날짜: 현재
-        end_date = datetime.now()
-        # 시작 날짜: 종료 날짜에서 days_back일 전
-        start_date = end_date - timedelta(days=days_back)
-        
-        # UNIX 타임스탬프로 변환 (밀리초 단위)
-        since = int(start_date.timestamp() * 1000)
+# 차트 구간 선택 슬라이더 (timestamps: 밀리초 epoch 배열)
+def chart_range(timestamps):
+    first, last = pd.Timestamp(timestamps[0], unit='ms').to_pydatetime(), pd.Timestamp(timestamps[-1], unit='ms').to_pydatetime()
+    if first < last:
+        step = pd.Timedelta(milliseconds=float(np.median(np.diff(timestamps)))).to_pytimedelta()
+        return st.slider("차트 구간", min_value=first, max_value=last, value=(first, last),
+                         step=step, format="YYYY-MM-DD HH:mm")
+    return first, last
+
+# 백테스팅 결과 차트 - 구간을 바꾸면 이 부분만 다시 실행해 선택한 구간을 화면 해상도에 맞게 다시 집계
+@st.fragment
+def show_backtest_chart(df, signals, portfolio, symbol, title, overlays, panel, trades=None):
+    start, end = chart_range(df.index.asi8 // 10 ** 6)
+    fig = backtest_figure(df, signals, portfolio, symbol, title, overlays, panel, start, end, trades)
+    st.plotly_chart(fig, use_container_width=True)
+
+# 메모리 절약 모드 차트 - 선택한 구간의 DataFrame만 만들어 표시 (지표 선 없음)
+@st.fragment
+def show_compact_chart(run, symbol, title, trades=None):
+    lo, hi = run.candles.locate(*chart_range(run.candles.timestamp))
+    st.plotly_chart(backtest_figure(*run.window(lo, hi), symbol, title, trades=trades),
+                    use_container_width=True)
+
+# 강건성 분석 패널 - 실행 버튼과 설정은 이 부분만 다시 실행 (백테스팅 결과 유지)
+@st.fragment
+def robustness_panel(returns, trades, actual, periods):
+    st.subheader("강건성 분석 (몬테카를로)")
+    col1, col2 = st.columns(2)
+    paths = col1.select_slider("경로 수", [1000, 2000, 5000, 10000], value=10000)
+    block = col2.number_input("블록 길이 (봉, 0 = 자동)", min_value=0, max_value=1000, value=0)
+    if not st.button("강건성 분석 실행"):
+        st.caption("봉별 수익률을 블록 단위로 다시 뽑은 경로와 거래 순서를 섞은 경로로 결과의 분포를 확인합니다.")
+        return
+    
+    try:
+        with st.spinner(f'{paths}개 경로 계산 중...'):
+            table, distributions, used_block = robustness(returns, trades, actual, paths, block or None, periods=periods)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+    
+    st.caption(f"블록 길이 {used_block}봉 · 경로 {paths}개 · 실제값 이하 비율이 높을수록 실제 결과가 대부분의 경로보다 운이 좋았던 경우입니다.")
+    st.dataframe(table.style.format('{:.2f}', na_rep=''))
+    
+    # 분포는 서버에서 구간별로 집계해 막대 그래프로 전송
+    names = list(distributions)
+    fig = make_subplots(rows=(len(names) + 2) // 3, cols=3, subplot_titles=names)
+    for i, name in enumerate(names):
+        counts, edges = np.histogram(distributions[name], bins=50)
+        row, col = i // 3 + 1, i % 3 + 1
+        fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, name=name, marker_color='blue',
+                             showlegend=False), row=row, col=col)
+        if i < len(actual):
+            fig.add_vline(x=actual[i], line_width=2, line_dash="dash", line_color="red", row=row, col=col)
+    fig.update_layout(height=300 * ((len(names) + 2) // 3), bargap=0)
+    st.plotly_chart(fig, use_container_width=True)
+
+# 단계별 실행 시간 / 처리 행 수 / 메모리 및 프로파일러 결과 (접힌 상태로 표시)
+def performance_panel(timer, profiler=None):
+    with st.expander(f"Performance - 총 {timer.total:.3f}초"):
+        columns = {'seconds': '시간 (초)', 'share': '비율 (%)', 'rows': '행 수',
+                   'rows_per_second': '초당 행 수', 'peak_mb': '최대 메모리 (MB)'}
+        if timer.memory:
+            st.metric("실행 최대 메모리", f"{timer.peak_bytes / 1024 ** 2:,.1f} MB")
+        table = timer.frame().rename(columns=columns)
+        if not timer.memory:
+            table = table.drop(columns=columns['peak_mb'])
+        st.dataframe(table.style.format('{:,.3f}', na_rep='')
+                     .format('{:,.0f}', subset=[columns['rows'], columns['rows_per_second']], na_rep=''))
+        st.download_button("JSON Lines 내보내기", timer.to_jsonl(), file_name='performance.jsonl',
+                           mime='application/x-ndjson', on_click='ignore')
+        if profiler is not None:
+            st.markdown(f"**샘플링 프로파일러** ({profiler.samples}개 표본, {profiler.interval * 1000:.0f}ms 간격)")
+            st.dataframe(profiler.top().style.format('{:.1f}%'))
+            st.download_button("호출 스택 내보내기 (flamegraph)", profiler.folded(), file_name='profile.folded',
+                               mime='text/plain', on_click='ignore')
+
+if start_backtest and run_mode == "파라미터 최적화":
+    with st.spinner('파라미터 최적화 중...'):
+        since = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1000)
+        since -= since % timeframe_ms(exchange, timeframe)
         
-        # 데이터 가져오기
         try:
             df = fetch_ohlcv(exchange, symbol, timeframe, since)
             
-            # 선택한 전략 적용
-            if strategy == "MA 교차":
-                signals = ma_cross_strategy(df, short_window, long_window)
-                strategy_params = f"단기: {short_window}, 장기: {long_window}"
-            elif strategy == "RSI":
-                signals = rsi_strategy(df, rsi_period, oversold, overbought)
-                strategy_params = f"기간: {rsi_period}, 과매도: {oversold}, 과매수: {overbought}"
-            else:  # 볼린저 밴드
-                signals = bollinger_bands_strategy(df, bb_window, bb_std)
-                strategy_params = f"기간: {bb_window}, 표준편차: {bb_std}"
-            
-            # 백테스팅 실행 (수수료 및 슬리피지 포함)
-            portfolio, trades = backtest(signals, initial_capital, fee_ratio, slippage_ratio)
+            grid = parameter_grid(strategy, **sweep_ranges)
+            progress_bar = st.progress(0.0, text=f"{len(grid)}개 조합 탐색 중...")
+            results = run_sweep(
+                df, strategy, grid, initial_capital, fee_ratio, slippage_ratio,
+                progress=lambda done, total: progress_bar.progress(done / total, text=f"{done}/{total} 조합 완료"),
+                periods=periods_per_year(timeframe)
+            )
+            progress_bar.empty()
             
-            # 성과 지표 계산
-            total_return = ((portfolio['total'].iloc[-1] / initial_capital) - 1) * 100
-            max_drawdown = (portfolio['total'] / portfolio['total'].cummax() - 1).min() * 100
+            st.subheader(f"파라미터 최적화 결과: {symbol} - {strategy} ({len(results)}개 조합)")
             
-            # 승률 계산
-            if len(trades) > 0:
-                trades['profit'] = 0
-                for i in range(0, len(trades), 2):
-                    if i + 1 < len(trades):
-                        buy_value = trades.iloc[i]['value']
-                        sell_value = trades.iloc[i + 1]['value']
-                        # 수수료 고려한 순이익
-                        trades.loc[i + 1, 'profit'] = sell_value - buy_value - trades.iloc[i]['fee'] - trades.iloc[i+1]['fee']
-                
-                wins = len(trades[trades['profit'] > 0])
-                total_trades = len(trades[trades['profit'] != 0])
-                win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
-            else:
-                win_rate = 0
-                
-            # 결과 표시
+            # 최고 성과 조합
+            best = results.iloc[0]
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("총 수익률", f"{total_return:.2f}%")
-            col2.metric("최대 손실폭 (MDD)", f"{max_drawdown:.2f}%")
-            col3.metric("승률", f"{win_rate:.2f}%")
-            col4.metric("거래 횟수", f"{len(trades) // 2}")
+            col1.metric("최고 수익률", f"{best['total_return']:.2f}%")
+            col2.metric("최대 손실폭 (MDD)", f"{best['max_drawdown']:.2f}%")
+            col3.metric("샤프 비율", f"{best['sharpe_ratio']:.2f}")
+            col4.metric("거래 횟수", f"{int(best['trades'])}")
+            
+            # 앞의 두 파라미터 기준 히트맵 (나머지 파라미터는 최고 수익률로 집계)
+            x_param, y_param = STRATEGIES[strategy][1][:2]
+            heatmap = results.pivot_table(index=y_param, columns=x_param, values='total_return', aggfunc='max')
+            fig_heatmap = go.Figure(
+                go.Heatmap(
+                    x=heatmap.columns,
+                    y=heatmap.index,
+                    z=heatmap.values,
+                    colorscale='RdYlGn',
+                    zmid=0,
+                    colorbar=dict(title='수익률 (%)')
+                )
+            )
+            fig_heatmap.update_layout(
+                title='파라미터 조합별 총 수익률 (%)',
+                xaxis_title=x_param,
+                yaxis_title=y_param,
+                height=600
+            )
+            st.plotly_chart(fig_heatmap, use_container_width=True)
             
-            # 차트 생성
-            fig = make_subplots(rows=2, cols=1, shared_xaxes=True, 
-                               vertical_spacing=0.03, 
-                               subplot_titles=(f'{symbol} 가격 및 신호', '포트폴리오 가치'),
-                               row_heights=[0.7, 0.3])
+            st.subheader("조합별 성과 순위")
+            st.dataframe(results)
             
-            # 가격 차트
-            fig.add_trace(
-                go.Candlestick(x=df.index,
-                    open=df['open'],
-                    high=df['high'],
-                    low=df['low'],
-                    close=df['close'],
-                    name='가격'),
-                row=1, col=1
+        except Exception as e:
+            st.error(f"오류가 발생했습니다: {str(e)}")
+            st.info("다른 코인, 시간 프레임 또는 기간을 선택해보세요.")
+
+if start_backtest and walkforward_mode:
+    with st.spinner('워크포워드 최적화 중...'):
+        since = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1000)
+        since -= since % timeframe_ms(exchange, timeframe)
+        
+        try:
+            df = fetch_ohlcv(exchange, symbol, timeframe, since)
+            
+            step_ms = timeframe_ms(exchange, timeframe)
+            train_bars = train_days * 24 * 60 * 60 * 1000 // step_ms
+            test_bars = test_days * 24 * 60 * 60 * 1000 // step_ms
+            grid = parameter_grid(strategy, **sweep_ranges)
+            progress_bar = st.progress(0.0, text=f"{len(grid)}개 조합 × fold 탐색 중...")
+            folds, oos_portfolio, oos_trades = walk_forward(
+                df, strategy, grid, train_bars, test_bars, initial_capital, fee_ratio, slippage_ratio, objective,
+                progress=lambda done, total: progress_bar.progress(done / total, text=f"{done}/{total} 작업 완료"),
+                periods=periods_per_year(timeframe)
             )
+            progress_bar.empty()
             
-            # 전략별 지표 추가
-            if strategy == "MA 교차":
-                fig.add_trace(
-                    go.Scatter(x=signals.index, y=signals['short_ma'], name=f'{short_window}일 MA', line=dict(color='blue')),
-                    row=1, col=1
-                )
-                fig.add_trace(
-                    go.Scatter(x=signals.index, y=signals['long_ma'], name=f'{long_window}일 MA', line=dict(color='orange')),
-                    row=1, col=1
-                )
-            elif strategy == "RSI":
-                # RSI 추가 차트
-                fig2 = make_subplots(rows=3, cols=1, shared_xaxes=True,
-                                    vertical_spacing=0.03,
-                                    subplot_titles=(f'{symbol} 가격 및 신호', 'RSI', '포트폴리오 가치'),
-                                    row_heights=[0.5, 0.2, 0.3])
-                
-                # 가격 차트 (fig2)
-                fig2.add_trace(
-                    go.Candlestick(x=df.index,
-                        open=df['open'],
-                        high=df['high'],
-                        low=df['low'],
-                        close=df['close'],
-                        name='가격'),
-                    row=1, col=1
-                )
-                
-                # RSI 차트 추가 (fig2)
-                fig2.add_trace(
-                    go.Scatter(x=signals.index, y=signals['rsi'], name='RSI', line=dict(color='purple')),
-                    row=2, col=1
-                )
-                # 과매수/과매도 선 추가 (fig2)
-                fig2.add_hline(y=oversold, line_width=1, line_dash="dash", line_color="green", row=2, col=1)
-                fig2.add_hline(y=overbought, line_width=1, line_dash="dash", line_color="red", row=2, col=1)
-                
-                # 포트폴리오 가치 차트 (fig2)
-                fig2.add_trace(
-                    go.Scatter(x=portfolio.index, y=portfolio['total'], name='포트폴리오 가치', line=dict(color='green')),
-                    row=3, col=1
-                )
-                
-                # 원래 차트에도 RSI 관련 지표 추가
-                fig.add_trace(
-                    go.Scatter(x=signals.index, y=signals['rsi'], name='RSI', line=dict(color='purple')),
-                    row=1, col=1
-                )
-            else:  # 볼린저 밴드
-                fig.add_trace(
-                    go.Scatter(x=signals.index, y=signals['rolling_mean'], name='MA', line=dict(color='blue')),
-                    row=1, col=1
-                )
-                fig.add_trace(
-                    go.Scatter(x=signals.index, y=signals['upper_band'], name='상단 밴드', line=dict(color='red')),
-                    row=1, col=1
-                )
-                fig.add_trace(
-                    go.Scatter(x=signals.index, y=signals['lower_band'], name='하단 밴드', line=dict(color='green')),
-                    row=1, col=1
-                )
+            st.subheader(f"워크포워드 결과: {symbol} - {strategy} ({len(folds)}개 fold)")
             
-            # 매수/매도 신호 표시
-            buy_signals = signals[signals['position'] == 1]
-            sell_signals = signals[signals['position'] == -1]
+            # 검증 구간만 이어 붙인 성과 (학습에 쓰지 않은 데이터 기준)
+            metrics = performance(oos_portfolio['total'].to_numpy(), oos_trades, initial_capital,
+                                  periods_per_year(timeframe))
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("검증 구간 수익률", f"{metrics['total_return']:.2f}%")
+            col2.metric("최대 손실폭 (MDD)", f"{metrics['max_drawdown']:.2f}%")
+            col3.metric("샤프 비율", f"{metrics['sharpe_ratio']:.2f}")
+            col4.metric("거래 횟수", f"{int(folds['test_trades'].sum())}")
             
-            fig.add_trace(
-                go.Scatter(x=buy_signals.index, y=buy_signals['price'], name='매수', 
-                           mode='markers', marker=dict(symbol='triangle-up', size=15, color='green')),
-                row=1, col=1
+            fig = go.Figure()
+            total_line = line_downsample(oos_portfolio['total'])
+            fig.add_trace(go.Scatter(x=total_line.index, y=total_line, name='검증 구간 자산', line=dict(color='green')))
+            # fold 경계
+            for test_start in folds['test_start'].iloc[1:]:
+                fig.add_vline(x=test_start, line_width=1, line_dash="dot", line_color="gray")
+            fig.update_layout(
+                title=f'검증 구간 자산 곡선 (학습 {train_days}일 / 검증 {test_days}일, 기준: {objective_name})',
+                xaxis_title='날짜',
+                yaxis_title='가치 ({})'.format(symbol.split('/')[1]),
+                height=500
             )
+            st.plotly_chart(fig, use_container_width=True)
             
-            fig.add_trace(
-                go.Scatter(x=sell_signals.index, y=sell_signals['price'], name='매도', 
-                           mode='markers', marker=dict(symbol='triangle-down', size=15, color='red')),
-                row=1, col=1
+            st.subheader("fold별 선택 파라미터 및 성과")
+            st.dataframe(folds)
+            
+            if len(oos_trades) > 0:
+                st.subheader("검증 구간 거래 기록")
+                st.dataframe(oos_trades)
+            
+        except Exception as e:
+            st.error(f"오류가 발생했습니다: {str(e)}")
+            st.info("기간을 늘리거나 학습/검증 기간을 줄여보세요.")
+
+if start_backtest and portfolio_mode:
+    with st.spinner('포트폴리오 백테스팅 중...'):
+        since = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1000)
+        since -= since % timeframe_ms(exchange, timeframe)
+        
+        try:
+            if not portfolio_symbols:
+                st.warning("포트폴리오에 포함할 코인을 선택하세요.")
+                st.stop()
+            
+            # 코인별 데이터를 공통 시간축에 맞춘 뒤 전략과 엔진을 모든 코인에 한 번에 적용
+            close = align_close(fetch_many(portfolio_symbols, timeframe, since))
+            signal = signal_matrix(strategy, close, **strategy_kwargs)
+            portfolio, positions, trades = backtest_portfolio(
+                close, signal.to_numpy(), initial_capital, fee_ratio, slippage_ratio,
+                ALLOCATIONS[allocation_name], max_weight_percent / 100
             )
+            quote = portfolio_symbols[0].split('/')[1]
             
-            # RSI 전략일 경우 매수/매도 신호도 fig2에 추가
-            if strategy == "RSI":
-                fig2.add_trace(
-                    go.Scatter(x=buy_signals.index, y=buy_signals['price'], name='매수', 
-                               mode='markers', marker=dict(symbol='triangle-up', size=15, color='green')),
-                    row=1, col=1
-                )
-                
-                fig2.add_trace(
-                    go.Scatter(x=sell_signals.index, y=sell_signals['price'], name='매도', 
-                               mode='markers', marker=dict(symbol='triangle-down', size=15, color='red')),
-                    row=1, col=1
-                )
+            metrics = performance(portfolio['total'].to_numpy(), None, initial_capital, periods_per_year(timeframe))
+            
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("총 수익률", f"{metrics['total_return']:.2f}%")
+            col2.metric("최대 손실폭 (MDD)", f"{metrics['max_drawdown']:.2f}%")
+            col3.metric("코인 수", f"{len(portfolio_symbols)}")
+            col4.metric("거래 횟수", f"{len(trades)}")
             
-            # 포트폴리오 가치 차트
+            # 포트폴리오 가치 및 코인별 보유 금액 (누적 영역은 코인끼리 같은 시점을 사용하도록 총액 기준으로 축소)
+            fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                               vertical_spacing=0.03,
+                               subplot_titles=('포트폴리오 가치', '코인별 보유 금액'),
+                               row_heights=[0.5, 0.5])
+            total_line = line_downsample(portfolio['total'])
             fig.add_trace(
-                go.Scatter(x=portfolio.index, y=portfolio['total'], name='포트폴리오 가치', line=dict(color='green')),
-                row=2, col=1
+                go.Scatter(x=total_line.index, y=total_line, name='포트폴리오 가치', line=dict(color='green')),
+                row=1, col=1
             )
-            
-            # 차트 레이아웃 설정
+            stacked = frame_downsample(positions, positions.sum(axis=1))
+            for s in stacked.columns:
+                fig.add_trace(
+                    go.Scatter(x=stacked.index, y=stacked[s], name=s, stackgroup='positions'),
+                    row=2, col=1
+                )
             fig.update_layout(
-                title=f'백테스팅 결과: {symbol} - {strategy} ({strategy_params})',
+                title=f'포트폴리오 백테스팅 결과: {strategy} ({allocation_name}, 최대 비중 {max_weight_percent}%)',
                 xaxis_title='날짜',
-                yaxis_title='가격 ({})'.format(symbol.split('/')[1]),
-                height=800,
-                xaxis_rangeslider_visible=False
+                yaxis_title=f'가치 ({quote})',
+                height=800
             )
+            st.plotly_chart(fig, use_container_width=True)
             
-            # RSI 전략일 경우 fig2 레이아웃 설정
-            if strategy == "RSI":
-                fig2.update_layout(
-                    title=f'백테스팅 결과: {symbol} - RSI 전략 ({strategy_params})',
-                    xaxis_title='날짜',
-                    yaxis_title='가격 ({})'.format(symbol.split('/')[1]),
-                    height=1000,
-                    xaxis_rangeslider_visible=False
-                )
-                
-                # RSI 차트 y축 범위 설정
-                fig2.update_yaxes(range=[0, 100], row=2, col=1)
+            if len(trades) > 0:
+                st.subheader("거래 기록")
+                st.dataframe(trades)
+            else:
+                st.warning("해당 기간과 전략에서는 거래가 발생하지 않았습니다. 파라미터를 조정해보세요.")
             
-            # 차트 표시
-            if strategy == "RSI":
-                st.plotly_chart(fig2, use_container_width=True)
+        except Exception as e:
+            st.error(f"오류가 발생했습니다: {str(e)}")
+            st.info("다른 코인, 시간 프레임 또는 기간을 선택해보세요.")
+
+if start_backtest and screener_mode:
+    since = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1000)
+    since -= since % timeframe_ms(exchange, timeframe)
+    universe = [s for s in symbol_options if s.split('/')[-1] == screener_quote][:screener_limit]
+    if not universe:
+        st.warning("선택한 기준 통화의 코인이 없습니다.")
+        st.stop()
+    metric = SCREEN_METRICS[screener_metric_name]
+    st.subheader(f"스크리너 결과: {strategy} - {len(universe)}개 코인 ({timeframe}, 최근 {days_back}일)")
+
+    # 데이터는 캐시를 거쳐 미리 받기 우선순위로 요청 (다른 세션의 화면 요청이 먼저 처리됨)
+    def load_symbol(s):
+        return scheduler.submit(lambda paced: cache_manager.load(paced, s, timeframe, since), BACKGROUND)
+
+    try:
+        progress_bar = st.progress(0.0, text=f"{len(universe)}개 코인 데이터 요청 중...")
+        table = st.empty()
+        rows, failures = [], []
+        shown = 0.0
+        results = screen(universe, load_symbol, strategy, strategy_kwargs, initial_capital, fee_ratio,
+                         slippage_ratio, periods_per_year(timeframe))
+        for done, row in enumerate(results, 1):
+            (failures if row['error'] else rows).append(row)
+            progress_bar.progress(done / len(universe), text=f"{done}/{len(universe)} 코인 완료 (실패 {len(failures)})")
+            # 끝난 코인이 생길 때마다 순위표 갱신 (너무 자주 그리지 않도록 0.5초 간격)
+            if rows and (time.monotonic() - shown > 0.5 or done == len(universe)):
+                table.dataframe(rank(rows, metric))
+                shown = time.monotonic()
+        progress_bar.empty()
+
+        if rows:
+            ranked = rank(rows, metric)
+            best = ranked.iloc[0]
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("최고 코인", best['symbol'])
+            col2.metric(f"최고 {screener_metric_name}", f"{best[metric]:.2f}")
+            col3.metric("보유보다 나은 코인", f"{int((ranked['total_return'] > ranked['buy_and_hold']).sum())}")
+            col4.metric("실패한 코인", f"{len(failures)}")
+        else:
+            st.warning("결과가 있는 코인이 없습니다. 기간이나 기준 통화를 바꿔보세요.")
+        if failures:
+            with st.expander(f"실패한 코인 ({len(failures)}개)"):
+                st.dataframe(pd.DataFrame(failures))
+
+    except Exception as e:
+        st.error(f"오류가 발생했습니다: {str(e)}")
+        st.info("최대 코인 수를 줄이거나 다른 시간 프레임을 선택해보세요.")
+
+if start_backtest and run_mode == "단일 백테스팅":
+    # 메모리 절약 모드는 절약 효과를 확인할 수 있도록 항상 최대 메모리를 측정
+    timer = StageTimer(memory=measure_memory or compact_mode, exchange=exchange_id, symbol=symbol, timeframe=timeframe,
+                       strategy=strategy, params=strategy_kwargs, days=days_back, compact=compact_mode)
+    profiler = SamplingProfiler().start() if run_profiler else None
+    with st.spinner('데이터 로딩 중...'):
+        # 종료 날짜: 현재
+        end_date = datetime.now()
+        # 시작 날짜: 종료 날짜에서 days_back일 전
+        start_date = end_date - timedelta(days=days_back)
+        
+        # UNIX 타임스탬프로 변환 (밀리초 단위)
+        since = int(start_date.timestamp() * 1000)
+        # 캔들 경계로 맞춰 같은 기간 요청이 같은 캐시 키를 사용하도록 함
+        since -= since % timeframe_ms(exchange, timeframe)
+        
+        # 데이터 가져오기
+        try:
+            df = fetch_ohlcv(exchange, symbol, timeframe, since, compact=compact_mode)
+            bars = len(df)
+            timer.lap('fetch', bars)
+            
+            # 손절/익절 판정용 하위 시간 프레임 캔들 (받지 못하면 봉 고가/저가로 판정)
+            intrabar = None
+            if stops and intrabar_timeframe != intrabar_options[0] and not compact_mode:
+                try:
+                    intrabar = cache_manager.load(exchange, symbol, intrabar_timeframe, since,
+                                                  fetch=scheduler.range_fetcher(INTERACTIVE))
+                except Exception as e:
+                    st.warning(f"{intrabar_timeframe} 캔들을 가져오지 못해 봉 고가/저가로 판정합니다: {str(e)}")
+                timer.lap('fetch_intrabar', 0 if intrabar is None else len(intrabar))
+
+            if compact_mode:
+                # 메모리 절약 모드: 신호 비트마스크와 자산 곡선/거래 기록만 남기고 DataFrame은 표시할 때 생성
+                run = compact_backtest(df, strategy, strategy_kwargs, initial_capital, fee_ratio, slippage_ratio,
+                                       composite_legs, combine or 'and', stops)
+                timer.lap('backtest', bars)
+                trades = run.trades()
+                metrics = performance(run.total, run.ledger, initial_capital, periods_per_year(timeframe), df.index())
+                bar_returns = run.returns()
+                timer.lap('metrics', bars)
+                cached = None
+            # 같은 데이터와 설정으로 실행한 결과가 있으면 전략/백테스팅/성과 지표 계산 없이 재사용
             else:
-                st.plotly_chart(fig, use_container_width=True)
+                key = result_key(df, strategy, strategy_kwargs, initial_capital, fee_ratio, slippage_ratio,
+                                 composite=composite_legs and {'combine': combine, 'legs': composite_legs},
+                                 stops=stops, intrabar=intrabar is not None and data_fingerprint(intrabar),
+                                 periods=periods_per_year(timeframe))
+                cached = result_cache.get(key)
+            if cached is not None:
+                frames, metrics = cached
+                signals, portfolio, trades = frames['signals'], frames['portfolio'], frames['trades']
+                timer.lap('result_cache', bars)
+            elif not compact_mode:
+                # 선택한 전략 적용
+                if strategy == "MA 교차":
+                    signals = ma_cross_strategy(df, short_window, long_window)
+                elif strategy == "RSI":
+                    signals = rsi_strategy(df, rsi_period, oversold, overbought)
+                else:  # 볼린저 밴드
+                    signals = bollinger_bands_strategy(df, bb_window, bb_std)
+                if composite_legs:
+                    # 선택한 전략과 추가 조건을 한 그래프로 계산 (공통 지표는 한 번만 계산)
+                    signals = composite_strategy(df, [{'strategy': strategy, 'params': strategy_kwargs}] + composite_legs,
+                                                 combine)
+                timer.lap('signals', len(signals))
+
+                # 백테스팅 실행 (수수료 및 슬리피지, 손절/익절 포함)
+                portfolio, trades = backtest(signals, initial_capital, fee_ratio, slippage_ratio, stops, df, intrabar)
+                timer.lap('backtest', bars)
+
+                # 성과 지표 계산 (시간 프레임 기준으로 연율화, 월별 수익률 포함)
+                metrics = performance(portfolio['total'].to_numpy(), trades, initial_capital,
+                                      periods_per_year(timeframe), portfolio.index)
+                timer.lap('metrics', bars)
+                result_cache.put(key, {'signals': signals, 'portfolio': portfolio, 'trades': trades}, metrics)
+                timer.lap('result_store', bars)
+            if not compact_mode:
+                bar_returns = portfolio['returns'].to_numpy()
+
+            # 차트 제목에 표시할 전략 설정
+            if strategy == "MA 교차":
+                strategy_params = f"단기: {short_window}, 장기: {long_window}"
+            elif strategy == "RSI":
+                strategy_params = f"기간: {rsi_period}, 과매도: {oversold}, 과매수: {overbought}"
+            else:  # 볼린저 밴드
+                strategy_params = f"기간: {bb_window}, 표준편차: {bb_std}"
+            if composite_legs:
+                strategy_params += f" {combine_label} " + ", ".join(
+                    leg.get('strategy') or f"RSI {leg['op']} {leg['value']}" for leg in composite_legs)
+
+            # 결과 표시
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("총 수익률", f"{metrics['total_return']:.2f}%")
+            col2.metric("최대 손실폭 (MDD)", f"{metrics['max_drawdown']:.2f}%")
+            col3.metric("승률", f"{metrics['win_rate']:.2f}%")
+            col4.metric("거래 횟수", f"{metrics['trades']}")
+            
+            # 차트: 전략별 지표 설정 후 화면에 표시할 그림 하나만 생성
+            if strategy == "MA 교차":
+                overlays = [('short_ma', f'{short_window}일 MA', 'blue'), ('long_ma', f'{long_window}일 MA', 'orange')]
+                panel = None
+            elif strategy == "RSI":
+                overlays = []
+                panel = {'column': 'rsi', 'name': 'RSI', 'color': 'purple', 'title': 'RSI',
+                         'levels': [(oversold, 'green'), (overbought, 'red')], 'range': [0, 100]}
+            else:  # 볼린저 밴드
+                overlays = [('rolling_mean', 'MA', 'blue'), ('upper_band', '상단 밴드', 'red'),
+                            ('lower_band', '하단 밴드', 'green')]
+                panel = None
+            
+            title = f'백테스팅 결과: {symbol} - {strategy} ({strategy_params})'
+            # 매수/매도 표시는 거래 기록 기준 (손절/익절로 청산된 거래는 이후 신호 매도를 표시하지 않음)
+            if compact_mode:
+                show_compact_chart(run, symbol, title, trades)
+            else:
+                show_backtest_chart(df, signals, portfolio, symbol, title, overlays, panel, trades)
+            timer.lap('chart', bars)
             
             # 거래 기록 표시
             if len(trades) > 0:
@@ -608,35 +816,29 @@ if start_backtest:
                 display_cols = ['timestamp', 'type', 'price', 'effective_price', 'units', 'value', 'fee']
                 if 'profit' in trades.columns:
                     display_cols.append('profit')
+                if stops:
+                    display_cols.append('reason')
                 
                 st.dataframe(trades[display_cols])
             
                 # 거래 통계
-                total_profit = trades['profit'].sum() if 'profit' in trades.columns else 0
-                total_fees = trades['fee'].sum()
-                
-                if 'profit' in trades.columns and len(trades[trades['profit'] != 0]) > 0:
-                    avg_profit = trades[trades['profit'] != 0]['profit'].mean()
-                    max_profit = trades['profit'].max()
-                    max_loss = trades['profit'].min()
-                else:
-                    avg_profit = max_profit = max_loss = 0
-                
                 st.subheader("거래 통계")
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric("총 이익/손실", f"{total_profit:.2f} {symbol.split('/')[1]}")
-                col2.metric("평균 이익/손실", f"{avg_profit:.2f} {symbol.split('/')[1]}")
-                col3.metric("총 수수료", f"{total_fees:.2f} {symbol.split('/')[1]}")
+                col1, col2, col3, col4, col5 = st.columns(5)
+                col1.metric("총 이익/손실", f"{metrics['total_profit']:.2f} {symbol.split('/')[1]}")
+                col2.metric("평균 이익/손실", f"{metrics['average_profit']:.2f} {symbol.split('/')[1]}")
+                col3.metric("총 수수료", f"{metrics['total_fees']:.2f} {symbol.split('/')[1]}")
+                col4.metric("수익 팩터", f"{metrics['profit_factor']:.2f}")
                 
-                if max_profit > 0:
-                    col4.metric("최대 이익", f"{max_profit:.2f} {symbol.split('/')[1]}")
-                if max_loss < 0:
-                    col4.metric("최대 손실", f"{max_loss:.2f} {symbol.split('/')[1]}")
+                if metrics['max_profit'] > 0:
+                    col5.metric("최대 이익", f"{metrics['max_profit']:.2f} {symbol.split('/')[1]}")
+                if metrics['max_loss'] < 0:
+                    col5.metric("최대 손실", f"{metrics['max_loss']:.2f} {symbol.split('/')[1]}")
+                timer.lap('trades', len(trades))
                 
                 # 월별 성과
-                if len(portfolio) > 30:  # 최소 한 달 이상의 데이터가 있는 경우
+                if bars > 30:  # 최소 한 달 이상의 데이터가 있는 경우
                     st.subheader("월별 성과")
-                    monthly_returns = portfolio['returns'].resample('M').sum() * 100
+                    monthly_returns = metrics['monthly_returns']
                     
                     fig_monthly = go.Figure()
                     fig_monthly.add_trace(
@@ -655,33 +857,22 @@ if start_backtest:
                     )
                     
                     st.plotly_chart(fig_monthly, use_container_width=True)
+                    timer.lap('monthly', bars)
                     
-                # 샤프 비율 계산
-                risk_free_rate = 0.02 / 365  # 연 2%의 무위험 수익률 가정 (일일)
-                daily_returns = portfolio['returns'].dropna()
+                # 위험 조정 성과 지표 (연 2% 무위험 수익률, 시간 프레임 기준 연율화)
+                daily_returns = pd.Series(bar_returns).dropna()
                 
                 if len(daily_returns) > 1:
-                    excess_returns = daily_returns - risk_free_rate
-                    sharpe_ratio = np.sqrt(252) * excess_returns.mean() / excess_returns.std() if excess_returns.std() != 0 else 0
-                    
                     st.subheader("위험 조정 성과 지표")
-                    col1, col2 = st.columns(2)
-                    col1.metric("샤프 비율", f"{sharpe_ratio:.2f}")
-                    
-                    # 최대 드로다운 기간 계산
-                    portfolio['dd'] = portfolio['total'] / portfolio['total'].cummax() - 1
-                    max_dd = portfolio['dd'].min()
-                    max_dd_idx = portfolio['dd'].idxmin()
-                    
-                    # 최대 드로다운 시작점 찾기
-                    dd_start = portfolio['total'][:max_dd_idx].idxmax()
-                    dd_end = max_dd_idx
-                    dd_days = (dd_end - dd_start).days
-                    
-                    col2.metric("최대 드로다운 기간", f"{dd_days}일")
+                    col1, col2, col3, col4 = st.columns(4)
+                    col1.metric("샤프 비율", f"{metrics['sharpe_ratio']:.2f}")
+                    col2.metric("소르티노 비율", f"{metrics['sortino_ratio']:.2f}")
+                    col3.metric("칼마 비율", f"{metrics['calmar_ratio']:.2f}")
+                    # MDD 고점에서 저점까지의 기간
+                    col4.metric("최대 드로다운 기간", f"{metrics['drawdown_days']:.0f}일")
                     
                     # 수익률 분포 히스토그램
-                    st.subheader("일일 수익률 분포")
+                    st.subheader(f"봉별 수익률 분포 ({timeframe})")
                     fig_hist = go.Figure()
                     fig_hist.add_trace(
                         go.Histogram(
@@ -692,19 +883,123 @@ if start_backtest:
                     )
                     
                     fig_hist.update_layout(
-                        title='일일 수익률 분포 (%)',
+                        title=f'{timeframe} 수익률 분포 (%)',
                         xaxis_title='수익률 (%)',
                         yaxis_title='빈도',
                         height=300
                     )
                     
                     st.plotly_chart(fig_hist, use_container_width=True)
+                    timer.lap('risk', len(daily_returns))
             else:
                 st.warning("해당 기간과 전략에서는 거래가 발생하지 않았습니다. 파라미터를 조정해보세요.")
+            
+            # 몬테카를로 강건성 분석 (요청할 때만 계산)
+            robustness_panel(bar_returns, trades,
+                             (metrics['total_return'], metrics['max_drawdown'], metrics['sharpe_ratio']),
+                             periods_per_year(timeframe))
+            timer.lap('robustness')
                 
         except Exception as e:
             st.error(f"오류가 발생했습니다: {str(e)}")
             st.info("다른 코인, 시간 프레임 또는 기간을 선택해보세요.")
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            timer.close()
+    
+    performance_panel(timer, profiler)
+    if PERF_LOG:
+        timer.append_to(PERF_LOG)
+
+# 실시간 모니터링: 갱신 주기마다 이 부분만 다시 실행
+# 새로 마감된 캔들만 엔진에 넣어 이전 결과에 이어 붙이므로 전체 기간을 다시 계산하지 않음
+@st.fragment(run_every=refresh_seconds if live_mode else None)
+def live_panel():
+    live = st.session_state['live']
+    stream = live['stream']
+    quote = symbol.split('/')[1]
+    try:
+        df = fetch_ohlcv(exchange, symbol, timeframe, live['since'])
+        # 형성 중인 마지막 캔들은 마감된 뒤에 반영
+        closed = df.index.asi8 // 10 ** 6 + timeframe_ms(exchange, timeframe) <= exchange.milliseconds()
+        added = stream.update(df[closed])
+    except Exception as e:
+        st.error(f"데이터 갱신에 실패했습니다: {str(e)}")
+        return
+    if len(stream) == 0:
+        st.warning("아직 마감된 캔들이 없습니다.")
+        return
+    
+    portfolio, trades = stream.results()
+    metrics = performance(portfolio['total'].to_numpy(), trades, initial_capital, periods_per_year(timeframe))
+    
+    st.subheader(f"실시간 모니터링: {symbol} - {strategy}")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("총 수익률", f"{metrics['total_return']:.2f}%")
+    col2.metric("최대 손실폭 (MDD)", f"{metrics['max_drawdown']:.2f}%")
+    col3.metric("거래 횟수", f"{metrics['trades']}")
+    col4.metric("현재 포지션", "보유 중" if stream.units > 0 else "현금")
+    st.caption(
+        f"마지막 캔들 {portfolio.index[-1]} · 이번 갱신에서 추가된 캔들 {added}개 · "
+        f"{datetime.now().strftime('%H:%M:%S')} 갱신 (주기 {refresh_seconds}초)"
+    )
+    
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                       vertical_spacing=0.03,
+                       subplot_titles=(f'{symbol} 가격 및 거래', '포트폴리오 가치'),
+                       row_heights=[0.7, 0.3])
+    price_line = line_downsample(pd.Series(stream.price.values, index=portfolio.index))
+    fig.add_trace(go.Scatter(x=price_line.index, y=price_line, name='가격', line=dict(color='gray')),
+                  row=1, col=1)
+    buys = trades[trades['type'] == 'BUY']
+    sells = trades[trades['type'] == 'SELL']
+    fig.add_trace(
+        go.Scatter(x=buys['timestamp'], y=buys['price'], name='매수',
+                   mode='markers', marker=dict(symbol='triangle-up', size=12, color='green')),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Scatter(x=sells['timestamp'], y=sells['price'], name='매도',
+                   mode='markers', marker=dict(symbol='triangle-down', size=12, color='red')),
+        row=1, col=1
+    )
+    total_line = line_downsample(portfolio['total'])
+    fig.add_trace(
+        go.Scatter(x=total_line.index, y=total_line, name='포트폴리오 가치', line=dict(color='green')),
+        row=2, col=1
+    )
+    fig.update_layout(xaxis_title='날짜', yaxis_title=f'가격 ({quote})', height=700)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    if len(trades) > 0:
+        st.subheader("최근 거래")
+        st.dataframe(trades.tail(20).iloc[::-1])
+
+if live_running:
+    live_panel()
+elif live_mode and 'live' in st.session_state:
+    st.info("설정이 바뀌었습니다. '백테스팅 시작' 버튼을 눌러 실시간 모니터링을 다시 시작하세요.")
+
+# 캐시 통계
+with st.sidebar.expander("캐시 통계"):
+    cache_stats = cache_manager.stats.as_dict()
+    lookups = cache_stats['hits'] + cache_stats['misses']
+    hit_rate = cache_stats['hits'] / lookups * 100 if lookups else 0
+    st.metric("적중률", f"{hit_rate:.1f}%")
+    st.caption(
+        f"적중 {cache_stats['hits']} / 실패 {cache_stats['misses']}  \n"
+        f"읽은 데이터 {cache_stats['bytes_read'] / 1024 ** 2:.1f} MB  \n"
+        f"받은 데이터 {cache_stats['bytes_fetched'] / 1024 ** 2:.1f} MB  \n"
+        f"삭제 {cache_stats['evictions']}건 ({cache_stats['bytes_evicted'] / 1024 ** 2:.1f} MB)  \n"
+        f"사용량 {cache_manager.usage() / 1024 ** 2:.1f} / {CACHE_MAX_BYTES / 1024 ** 2:.0f} MB"
+    )
+    result_stats = result_cache.stats.as_dict()
+    st.caption(
+        f"백테스팅 결과 캐시: 적중 {result_stats['hits']} / 실패 {result_stats['misses']}  \n"
+        f"삭제 {result_stats['evictions']}건, "
+        f"사용량 {result_cache.usage() / 1024 ** 2:.1f} / {RESULT_CACHE_MAX_BYTES / 1024 ** 2:.0f} MB"
+    )
 
 # 앱 정보 표시
 with st.expander("앱 정보"):
@@ -0,0 +1,243 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from cache_manager import CacheManager
+from compact import compact_backtest
+from data import fetch_range
+from engine import backtest
+import indicators
+from strategies import ma_cross_strategy, rsi_strategy, bollinger_bands_strategy
+from metrics import performance, periods_per_year
+from scheduler import FetchScheduler
+from synthetic import SyntheticExchange, synthetic_ohlcv
+
+# 네트워크 없이 가상 데이터로 단계별 처리 시간과 최대 메모리를 측정하고 기준값과 비교
+#
+#   python benchmark.py                       # 1e3 ~ 1e6 봉 측정
+#   python benchmark.py --sizes 1e7 --repeat 1
+#   python benchmark.py --save-baseline       # 현재 결과를 기준값으로 저장
+#
+# 기준값 파일이 있으면 느려졌거나 메모리가 늘어난 단계를 표시하고 종료 코드 1을 반환
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+BASELINE_PATH = 'benchmark_baseline.json'
+TIMEFRAME = '1m'
+SYMBOL = 'BTC/USDT'
+INITIAL_CAPITAL = 1000.0
+
+# 기준값 대비 허용 범위 (비율) 및 잡음으로 보는 최소 차이
+TIME_TOLERANCE = 0.3
+MEMORY_TOLERANCE = 0.2
+MIN_TIME_DIFF = 0.005
+MIN_MEMORY_DIFF = 1024 * 1024
+
+# 수집 단계 설정: 가상 거래소의 요청당 지연 (초), 스케줄러 허용 속도 (초당 요청 수), 동시 요청 수
+# 요청 수가 봉 수에 비례해 오래 걸리므로 FETCH_MAX_BARS 이하에서만 측정
+FETCH_LATENCY = 0.01
+FETCH_RATE = 100
+FETCH_WORKERS = 8
+FETCH_MAX_BARS = 100_000
+
+
+# 앱의 성과 지표 계산 부분 (월별 수익률 포함)
+def metrics_block(portfolio, trades):
+    return performance(portfolio['total'].to_numpy(), trades, INITIAL_CAPITAL, periods_per_year(TIMEFRAME),
+                       portfolio.index)
+
+
+# 단계 목록: (이름, 준비 함수, 측정 함수) - 준비 함수의 반환값을 측정 함수에 넘기고 준비 시간은 제외
+def stages(bars):
+    step = 60 * 1000
+    now = 1700000000000
+    start = now - bars * step
+    df = synthetic_ohlcv(bars, TIMEFRAME, start=start)
+    signals = ma_cross_strategy(df)
+    portfolio, trades = backtest(signals, INITIAL_CAPITAL)
+
+    def empty_cache():
+        root = tempfile.mkdtemp(prefix='bench-')
+        exchange = SyntheticExchange(start, now)
+        # 가상 거래소의 데이터 생성 시간은 수집 시간에서 제외
+        exchange.fetch_ohlcv(SYMBOL, TIMEFRAME, start, 1)
+        return root, exchange
+
+    def warm_cache():
+        root, exchange = empty_cache()
+        CacheManager(root).load(exchange, SYMBOL, TIMEFRAME, start)
+        return root, exchange
+
+    def load(args, compact=False):
+        root, exchange = args
+        try:
+            return CacheManager(root).load(exchange, SYMBOL, TIMEFRAME, start, compact=compact)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    # 캐시 읽기부터 성과 지표까지 한 번의 실행 (일반 모드 / 메모리 절약 모드) - 최대 메모리 비교용
+    def pipeline(args):
+        indicators.cache.clear()
+        loaded = load(args)
+        signals = ma_cross_strategy(loaded)
+        portfolio, trades = backtest(signals, INITIAL_CAPITAL)
+        return metrics_block(portfolio, trades)
+
+    def pipeline_compact(args):
+        indicators.cache.clear()
+        candles = load(args, compact=True)
+        run = compact_backtest(candles, "MA 교차", {}, INITIAL_CAPITAL)
+        return performance(run.total, run.ledger, INITIAL_CAPITAL, periods_per_year(TIMEFRAME), candles.index())
+
+    def latent_exchange():
+        exchange = SyntheticExchange(start, now, latency=FETCH_LATENCY)
+        exchange.fetch_ohlcv(SYMBOL, TIMEFRAME, start, 1)
+        return exchange
+
+    def fetch_scheduled(exchange):
+        with FetchScheduler(exchange, FETCH_RATE, FETCH_RATE, FETCH_WORKERS) as scheduler:
+            return scheduler.fetch_range(SYMBOL, TIMEFRAME, start, now)
+
+    # 지표 캐시를 비워 전략 계산을 매번 처음부터 측정
+    def cold(strategy):
+        def run(_):
+            indicators.cache.clear()
+            return strategy(df)
+        return run
+
+    fetch_stages = [
+        # 요청 지연이 있는 거래소에서 페이지를 차례로 요청 / 스케줄러로 동시에 요청
+        ('fetch_serial', latent_exchange, lambda exchange: fetch_range(exchange, SYMBOL, TIMEFRAME, start, now)),
+        ('fetch_scheduled', latent_exchange, fetch_scheduled),
+    ] if bars <= FETCH_MAX_BARS else []
+
+    return fetch_stages + [
+        ('generate', lambda: None, lambda _: synthetic_ohlcv(bars, TIMEFRAME, start=start)),
+        # 빈 캐시: 거래소(가상) 페이지 수집 + 저장 + 읽기 / 채워진 캐시: 저장된 파일 읽기
+        ('load_cold', empty_cache, load),
+        ('load_warm', warm_cache, load),
+        ('ma_cross', lambda: None, cold(ma_cross_strategy)),
+        ('rsi', lambda: None, cold(rsi_strategy)),
+        ('bollinger_bands', lambda: None, cold(bollinger_bands_strategy)),
+        ('backtest', lambda: None, lambda _: backtest(signals, INITIAL_CAPITAL)),
+        ('metrics', lambda: None, lambda _: metrics_block(portfolio, trades)),
+        ('pipeline', warm_cache, pipeline),
+        ('pipeline_compact', warm_cache, pipeline_compact),
+    ]
+
+
+# 가장 빠른 실행 시간과 (별도 실행에서) 최대 추가 메모리
+def measure(setup, run, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        args = setup()
+        gc.collect()
+        start = time.perf_counter()
+        run(args)
+        best = min(best, time.perf_counter() - start)
+
+    args = setup()
+    gc.collect()
+    tracemalloc.start()
+    run(args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(sizes, repeat=3, log=print):
+    results = []
+    for bars in sizes:
+        for name, setup, run in stages(bars):
+            seconds, peak = measure(setup, run, repeat)
+            results.append({
+                'stage': name,
+                'bars': bars,
+                'seconds': seconds,
+                'bars_per_second': bars / seconds if seconds > 0 else float('inf'),
+                'peak_bytes': peak,
+            })
+            log(f"{name:>16} {bars:>10,} 봉  {seconds * 1000:10.2f} ms  "
+                f"{results[-1]['bars_per_second']:14,.0f} 봉/초  {peak / 1024 ** 2:9.1f} MB")
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+# 기준값보다 허용 범위 이상 느려지거나 메모리를 더 쓴 단계 목록
+def regressions(results, baseline, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    reference = {(row['stage'], row['bars']): row for row in baseline['results']}
+    found = []
+    for row in results:
+        base = reference.get((row['stage'], row['bars']))
+        if base is None:
+            continue
+        if (row['seconds'] > base['seconds'] * (1 + time_tolerance)
+                and row['seconds'] - base['seconds'] > MIN_TIME_DIFF):
+            found.append((row['stage'], row['bars'], '시간', base['seconds'] * 1000, row['seconds'] * 1000, 'ms'))
+        if (row['peak_bytes'] > base['peak_bytes'] * (1 + memory_tolerance)
+                and row['peak_bytes'] - base['peak_bytes'] > MIN_MEMORY_DIFF):
+            found.append((row['stage'], row['bars'], '메모리', base['peak_bytes'] / 1024 ** 2,
+                          row['peak_bytes'] / 1024 ** 2, 'MB'))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가상 데이터로 단계별 성능을 측정하고 기준값과 비교합니다.")
+    parser.add_argument('--sizes', nargs='+', type=float, default=DEFAULT_SIZES, help="측정할 봉 수 목록")
+    parser.add_argument('--repeat', type=int, default=3, help="단계별 반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help=f"기준값 파일 (기본: {BASELINE_PATH})")
+    parser.add_argument('--save-baseline', action='store_true', help="이번 결과를 기준값으로 저장")
+    parser.add_argument('--output', help="이번 결과를 저장할 JSON 파일")
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    report = {'environment': environment(),
+              'results': run_benchmarks([int(size) for size in args.sizes], max(1, args.repeat))}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"기준값 파일({args.baseline})이 없어 비교하지 않았습니다. --save-baseline 으로 만들 수 있습니다.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    found = regressions(report['results'], baseline, args.time_tolerance, args.memory_tolerance)
+    if not found:
+        print("기준값 대비 성능 저하 없음")
+        return 0
+    print("기준값 대비 성능 저하:")
+    for stage, bars, kind, before, after, unit in found:
+        print(f"  {stage} ({bars:,} 봉) {kind}: {before:.2f} {unit} -> {after:.2f} {unit}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
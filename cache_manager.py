@@ -0,0 +1,210 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from data import PAGE_LIMIT, fetch_range, parse_timeframe, timeframe_ms
+from compact import CompactCandles
+from resample import bucket_start, divides, resample_columns
+from store import CandleStore, columns_frame
+
+# 시간 프레임별로 형성 중인 마지막 캔들을 다시 가져오기 전까지 허용하는 나이 (밀리초)
+FRESHNESS = {
+    '1m': 10 * 1000,
+    '5m': 30 * 1000,
+    '15m': 60 * 1000,
+    '1h': 5 * 60 * 1000,
+    '4h': 15 * 60 * 1000,
+    '1d': 60 * 60 * 1000,
+}
+# 메모리에 보관하는 집계 캔들 (기준 시계열 × 시간 프레임) 개수
+DERIVED_ENTRIES = 32
+
+
+# 캐시 적중/실패 및 바이트 카운터 (세션 스레드 간 공유)
+class CacheStats:
+    FIELDS = ['hits', 'misses', 'bytes_read', 'bytes_fetched', 'evictions', 'bytes_evicted']
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+# fetch_ohlcv 앞단의 디스크 캐시: 용량 상한(LRU 삭제), 시간 프레임별 신선도, 통계
+# 코인마다 가장 세밀한 시간 프레임만 저장하고 더 큰 시간 프레임(4h, 1d, 2h, 12h 등)은 로컬에서 집계
+# (집계 결과는 메모리에 보관하고, 기준 캔들이 이어 붙으면 마지막 봉부터만 다시 집계)
+class CacheManager:
+    def __init__(self, root='cache', max_bytes=512 * 1024 * 1024, freshness=None):
+        self.store = CandleStore(root)
+        self.max_bytes = max_bytes
+        self.freshness = dict(FRESHNESS, **(freshness or {}))
+        self.stats = CacheStats()
+        self._derived = OrderedDict()
+        self._derived_lock = threading.Lock()
+
+    def freshness_ms(self, exchange, timeframe):
+        return self.freshness.get(timeframe, timeframe_ms(exchange, timeframe) // 12)
+
+    # fetch: 빠진 구간을 가져오는 함수 fetch(symbol, timeframe, since, until) (기본: 페이지를 차례로 요청,
+    # scheduler.FetchScheduler.range_fetcher를 넘기면 페이지를 동시에 요청)
+    # compact=True이면 DataFrame 대신 float32 열 배열(compact.CompactCandles)로 반환
+    def load(self, exchange, symbol, timeframe, since, fetch=None, compact=False):
+        fetch = fetch or (lambda *args: fetch_range(exchange, *args))
+        base = self.base_timeframe(exchange, symbol, timeframe, since)
+        series = self.store.series(exchange.id, symbol, base)
+        now = exchange.milliseconds()
+        step = timeframe_ms(exchange, base)
+        fetched = 0
+        requested = False
+        refreshed = False
+
+        if len(series) == 0:
+            fetched += series.write(fetch(symbol, base, since, now))
+            series.update_meta(since=since)
+            requested = refreshed = True
+        else:
+            first, last = series.first, series.last
+            # since 와 이미 담고 있는 구간의 시작 사이에 빠진 캔들이 있을 때만 앞 구간 요청
+            # (상장 전 구간처럼 요청했지만 캔들이 없던 구간은 다시 요청하지 않음)
+            if since <= self._covered_from(series) - step:
+                fetched += series.write(fetch(symbol, base, since, first))
+                series.update_meta(since=min(since, series.meta().get('since', since)))
+                requested = True
+            # 마감된 캔들은 다시 받지 않고, 형성 중이던 마지막 캔들부터만 다시 요청
+            # (요청한 시간 프레임의 봉이 마감되었거나 그 시간 프레임의 허용 시간이 지났을 때)
+            fetched_at = series.meta().get('fetched_at', 0)
+            closes = bucket_start(last, timeframe) + timeframe_ms(exchange, timeframe)
+            if now >= closes or now - fetched_at > self.freshness_ms(exchange, timeframe):
+                fetched += series.write(fetch(symbol, base, last, now))
+                requested = refreshed = True
+
+        if refreshed:
+            series.update_meta(fetched_at=now, last_access=now)
+        else:
+            series.update_meta(last_access=now)
+        if requested:
+            self.stats.add(misses=1, bytes_fetched=fetched)
+        else:
+            self.stats.add(hits=1)
+
+        if base == timeframe:
+            columns = series.read(start=since)
+        else:
+            columns = self.derive(series, timeframe)
+            lo = int(np.searchsorted(columns['timestamp'], since, side='left'))
+            columns = {name: column[lo:] for name, column in columns.items()}
+        if compact:
+            df = CompactCandles.from_columns(columns)
+            self.stats.add(bytes_read=df.nbytes)
+        else:
+            df = columns_frame(columns)
+            self.stats.add(bytes_read=int(df.memory_usage(index=True).sum()))
+        self.prune(exchange.id, symbol, base)
+        self.evict(keep=series.path)
+        return df
+
+    # 시계열이 담고 있는 구간의 시작 (상장 전처럼 거래소에 더 앞선 캔들이 없으면 요청했던 since 기준)
+    def _covered_from(self, series):
+        first = series.first
+        return None if first is None else min(first, series.meta().get('since', first))
+
+    def _pages(self, exchange, timeframe, duration):
+        candles = max(0, duration) // timeframe_ms(exchange, timeframe)
+        return -(-candles // PAGE_LIMIT)
+
+    # timeframe 캔들을 만들 기준 시간 프레임 - 거래소에 보낼 요청(페이지) 수가 가장 적은 것
+    # - 저장된 시계열 중 timeframe을 집계로 만들 수 있는 것: since 앞으로 빠진 구간 (since부터 있으면 0)
+    # - 저장된 것이 없으면 timeframe 그대로, 거래소가 지원하지 않는 시간 프레임(2h, 12h 등)은
+    #   나누어떨어지는 가장 큰 거래소 시간 프레임으로 since부터 전부
+    # 요청 수가 같으면 더 세밀한 시간 프레임 (하나만 저장해 두고 나머지를 집계)
+    def base_timeframe(self, exchange, symbol, timeframe, since):
+        costs = {}
+        for tf in self.store.timeframes(exchange.id, symbol):
+            covered = self._covered_from(self.store.series(exchange.id, symbol, tf))
+            if covered is not None and divides(tf, timeframe):
+                costs[tf] = self._pages(exchange, tf, covered - since)
+        supported = getattr(exchange, 'timeframes', None)
+        if not supported or timeframe in supported:
+            fetchable = timeframe
+        else:
+            options = [tf for tf in supported if divides(tf, timeframe)]
+            if not options:
+                raise ValueError(f"{exchange.id} 거래소에서 {timeframe} 캔들을 만들 수 있는 시간 프레임이 없습니다.")
+            fetchable = max(options, key=parse_timeframe)
+        if fetchable not in costs:
+            costs[fetchable] = self._pages(exchange, fetchable, exchange.milliseconds() - since)
+        return min(costs, key=lambda tf: (costs[tf], parse_timeframe(tf)))
+
+    # 기준 시계열 전체를 timeframe으로 집계 (이전 결과가 있으면 마지막 봉부터만 다시 집계해 이어 붙임)
+    def derive(self, series, timeframe):
+        key = (series.path, timeframe)
+        base = series.columns()
+        timestamps = base['timestamp']
+        first = int(timestamps[0]) if len(timestamps) else None
+        with self._derived_lock:
+            previous_first, previous = self._derived.get(key, (None, None))
+        # 앞 구간이 추가되었으면 (첫 캔들이 바뀌면) 처음부터 다시 집계
+        if previous is not None and first is not None and previous_first == first:
+            lo = int(np.searchsorted(timestamps, previous['timestamp'][-1], side='left'))
+            tail = resample_columns({name: column[lo:] for name, column in base.items()}, timeframe)
+            derived = {name: np.concatenate((previous[name][:-1], tail[name])) for name in tail}
+        else:
+            derived = resample_columns(base, timeframe)
+        # 여러 세션이 같은 배열을 공유하므로 읽기 전용 (저장된 캔들의 메모리 맵과 같음)
+        for column in derived.values():
+            column.flags.writeable = False
+        with self._derived_lock:
+            self._derived[key] = (first, derived)
+            self._derived.move_to_end(key)
+            while len(self._derived) > DERIVED_ENTRIES:
+                self._derived.popitem(last=False)
+        return derived
+
+    # base 시계열로 집계할 수 있는 더 큰 시간 프레임 시계열 중 base가 같은 구간을 모두 담고 있는 것은 삭제 (중복 저장 방지)
+    def prune(self, exchange_id, symbol, base):
+        covering = self.store.series(exchange_id, symbol, base)
+        for tf in self.store.timeframes(exchange_id, symbol):
+            if tf == base or not divides(base, tf):
+                continue
+            series = self.store.series(exchange_id, symbol, tf)
+            covered = self._covered_from(series)
+            if covered is None or self._covered_from(covering) > covered:
+                continue
+            with series.lock(blocking=False) as acquired:
+                if acquired:
+                    series.remove()
+
+    def usage(self):
+        return sum(series.nbytes() for series in self.store.all_series())
+
+    # 용량 상한을 넘으면 가장 오래 사용하지 않은 시계열부터 삭제
+    def evict(self, keep=None):
+        entries = [(series, series.nbytes()) for series in self.store.all_series()]
+        total = sum(size for _, size in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort(key=lambda entry: entry[0].meta().get('last_access', 0))
+        for series, size in entries:
+            if total <= self.max_bytes:
+                break
+            if series.path == keep:
+                continue
+            # 다른 세션이 쓰는 중인 시계열은 건너뜀
+            with series.lock(blocking=False) as acquired:
+                if not acquired:
+                    continue
+                series.remove()
+            total -= size
+            self.stats.add(evictions=1, bytes_evicted=size)
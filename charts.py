@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# 차트 한 개에 보낼 최대 점 수 (화면 가로 픽셀 수준)
+# 캔들은 너무 좁으면 구분되지 않으므로 선보다 적게 사용
+CANDLE_POINTS = 600
+LINE_POINTS = 2000
+
+
+# [start, end] 시간 구간에 해당하는 위치 범위
+def visible_range(index, start=None, end=None):
+    lo = 0 if start is None else int(index.searchsorted(start, side='left'))
+    hi = len(index) if end is None else int(index.searchsorted(end, side='right'))
+    return lo, hi
+
+
+# 캔들을 구간별로 묶어 OHLC 집계 (시가: 첫 값, 고가: 최댓값, 저가: 최솟값, 종가: 마지막 값)
+def ohlc_downsample(df, max_points=CANDLE_POINTS):
+    n = len(df)
+    if n <= max_points:
+        return df
+    starts = np.unique(np.linspace(0, n, max_points, endpoint=False).astype(np.int64))
+    ends = np.append(starts[1:], n) - 1
+    return pd.DataFrame({
+        'open': df['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(df['high'].to_numpy(), starts),
+        'low': np.minimum.reduceat(df['low'].to_numpy(), starts),
+        'close': df['close'].to_numpy()[ends],
+        'volume': np.add.reduceat(df['volume'].to_numpy(), starts),
+    }, index=df.index[starts])
+
+
+# LTTB(Largest-Triangle-Three-Buckets): 선 모양을 유지하는 점을 구간마다 하나씩 선택해 위치 반환
+def lttb(values, max_points=LINE_POINTS):
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    # 첫 점과 마지막 점은 항상 유지하고, 사이를 max_points - 2개 구간으로 나눔
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    # 다음 구간 평균은 누적합으로 한 번에 계산
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    next_lo = edges[1:]
+    next_hi = np.append(edges[2:], n)
+    next_x = (next_lo + next_hi - 1) / 2
+    next_y = (cumsum[next_hi] - cumsum[next_lo]) / (next_hi - next_lo)
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        x = np.arange(lo, hi)
+        area = np.abs((a - next_x[i]) * (values[lo:hi] - values[a]) - (a - x) * (next_y[i] - values[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+# 선 차트용 축소 (NaN 구간은 제외하고 선택)
+def line_downsample(series, max_points=LINE_POINTS):
+    values = series.to_numpy(dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(values))
+    return series.iloc[valid[lttb(values[valid], max_points)]]
+
+
+# 백테스팅 결과 차트: 가격(캔들 + 지표 + 매수/매도), 선택적 보조 지표, 포트폴리오 가치
+# overlays: 가격 차트에 겹쳐 그릴 (열, 이름, 색상) 목록
+# panel: 별도 행에 그릴 보조 지표 {'column', 'name', 'color', 'title', 'levels', 'range'}
+# start, end: 표시할 구간 (해당 구간만 화면 해상도에 맞게 다시 집계)
+# trades: 거래 기록 (engine.TradeLedger.to_frame) - 매수/매도 표시를 실제 체결된 거래 기준으로 그림
+#         (손절/익절 등 신호가 아닌 사유의 매도는 별도 표시, 없으면 신호 열의 포지션 변화로 표시)
+def backtest_figure(df, signals, portfolio, symbol, title, overlays=(), panel=None, start=None, end=None,
+                    trades=None):
+    lo, hi = visible_range(df.index, start, end)
+    view = df.iloc[lo:hi]
+    view_signals = signals.iloc[lo:hi]
+
+    if panel is None:
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                            vertical_spacing=0.03,
+                            subplot_titles=(f'{symbol} 가격 및 신호', '포트폴리오 가치'),
+                            row_heights=[0.7, 0.3])
+        portfolio_row, height = 2, 800
+    else:
+        fig = make_subplots(rows=3, cols=1, shared_xaxes=True,
+                            vertical_spacing=0.03,
+                            subplot_titles=(f'{symbol} 가격 및 신호', panel['title'], '포트폴리오 가치'),
+                            row_heights=[0.5, 0.2, 0.3])
+        portfolio_row, height = 3, 1000
+
+    candles = ohlc_downsample(view)
+    fig.add_trace(
+        go.Candlestick(x=candles.index,
+            open=candles['open'],
+            high=candles['high'],
+            low=candles['low'],
+            close=candles['close'],
+            name='가격'),
+        row=1, col=1
+    )
+
+    for column, name, color in overlays:
+        line = line_downsample(view_signals[column])
+        fig.add_trace(go.Scatter(x=line.index, y=line, name=name, line=dict(color=color)), row=1, col=1)
+
+    if panel is not None:
+        line = line_downsample(view_signals[panel['column']])
+        fig.add_trace(go.Scatter(x=line.index, y=line, name=panel['name'], line=dict(color=panel['color'])),
+                      row=2, col=1)
+        for level, color in panel.get('levels', ()):
+            fig.add_hline(y=level, line_width=1, line_dash="dash", line_color=color, row=2, col=1)
+        if 'range' in panel:
+            fig.update_yaxes(range=panel['range'], row=2, col=1)
+
+    # 매수/매도 지점은 축소하지 않고 그대로 표시
+    if trades is None:
+        buys = view_signals[view_signals['position'] == 1]
+        sells = view_signals[view_signals['position'] == -1]
+        buy_x, buy_y, sell_x, sell_y = buys.index, buys['price'], sells.index, sells['price']
+        exits = None
+    else:
+        shown = trades[(trades['timestamp'] >= view.index[0]) & (trades['timestamp'] <= view.index[-1])] \
+            if len(view) else trades.iloc[:0]
+        buys = shown[shown['type'] == 'BUY']
+        sells = shown[(shown['type'] == 'SELL') & (shown['reason'] == 'signal')]
+        exits = shown[(shown['type'] == 'SELL') & (shown['reason'] != 'signal')]
+        buy_x, buy_y, sell_x, sell_y = buys['timestamp'], buys['price'], sells['timestamp'], sells['price']
+    fig.add_trace(
+        go.Scatter(x=buy_x, y=buy_y, name='매수',
+                   mode='markers', marker=dict(symbol='triangle-up', size=15, color='green')),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Scatter(x=sell_x, y=sell_y, name='매도',
+                   mode='markers', marker=dict(symbol='triangle-down', size=15, color='red')),
+        row=1, col=1
+    )
+    if exits is not None and len(exits):
+        fig.add_trace(
+            go.Scatter(x=exits['timestamp'], y=exits['price'], name='손절/익절', text=exits['reason'],
+                       mode='markers', marker=dict(symbol='x', size=12, color='orange')),
+            row=1, col=1
+        )
+
+    total = line_downsample(portfolio['total'].iloc[lo:hi])
+    fig.add_trace(
+        go.Scatter(x=total.index, y=total, name='포트폴리오 가치', line=dict(color='green')),
+        row=portfolio_row, col=1
+    )
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='날짜',
+        yaxis_title='가격 ({})'.format(symbol.split('/')[1]),
+        height=height,
+        xaxis_rangeslider_visible=False
+    )
+    return fig
+
+
+# 여러 코인 보유 금액(누적 영역)처럼 같은 x를 공유해야 하는 선들은 기준 선에서 고른 위치를 함께 사용
+def frame_downsample(frame, reference, max_points=LINE_POINTS):
+    return frame.iloc[lttb(reference.to_numpy(dtype=np.float64), max_points)]
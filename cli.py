@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Streamlit 없이 설정 파일의 백테스팅을 실행하고 결과를 디스크에 저장
+#
+#   python cli.py runs.json -o results --workers 4
+#
+# 설정 파일 (JSON 또는 TOML):
+#   {
+#     "defaults": {"exchange": "binance", "timeframe": "1h", "days": 180,
+#                  "initial_capital": 1000, "fee_percent": 0.1, "slippage_percent": 0.1},
+#     "runs": [
+#       {"name": "btc-ma", "symbol": "BTC/USDT", "strategy": "ma_cross",
+#        "params": {"short_window": 20, "long_window": 50}},
+#       {"name": "eth-rsi", "csv": "data/eth_1h.csv", "strategy": "rsi"},
+#       {"name": "btc-ma-rsi", "symbol": "BTC/USDT", "strategy": "composite",
+#        "params": {"combine": "and", "legs": [{"strategy": "ma_cross", "params": {}},
+#                                              {"indicator": "rsi", "window": 14, "op": "<", "value": 50}]}}
+#     ]
+#   }
+# csv를 지정하면 거래소 대신 파일(timestamp 인덱스 + open/high/low/close/volume 열)에서 데이터를 읽음
+# 손절/익절: stop_loss_percent, take_profit_percent, trailing_stop_percent (%) - 봉 고가/저가로 판정하며
+# intrabar_timeframe(거래소) 또는 intrabar_csv(파일)로 하위 시간 프레임 캔들을 주면 봉 안의 가격 순서로 판정
+# (csv 실행에서 intrabar_timeframe을 쓰려면 symbol도 지정해야 거래소에서 가져옴)
+
+DEFAULTS = {
+    'exchange': 'binance',
+    'timeframe': '1h',
+    'days': 180,
+    'initial_capital': 1000.0,
+    'fee_percent': 0.1,
+    'slippage_percent': 0.1,
+    'params': {},
+}
+
+# 설정 파일에서 쓸 수 있는 영문 전략 이름
+STRATEGY_ALIASES = {
+    'ma_cross': "MA 교차",
+    'rsi': "RSI",
+    'bollinger_bands': "볼린저 밴드",
+    'composite': "복합 전략",
+}
+
+SUMMARY_COLUMNS = ['name', 'symbol', 'timeframe', 'strategy', 'candles', 'total_return', 'cagr', 'max_drawdown',
+                   'sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'trades', 'win_rate', 'profit_factor',
+                   'seconds', 'error']
+
+
+# 복합 전략 조건의 영문 전략 이름 변환 (중첩 포함)
+def _leg_aliases(legs):
+    converted = []
+    for leg in legs:
+        leg = dict(leg)
+        if 'strategy' in leg:
+            leg['strategy'] = STRATEGY_ALIASES.get(leg['strategy'], leg['strategy'])
+        if 'legs' in leg:
+            leg['legs'] = _leg_aliases(leg['legs'])
+        converted.append(leg)
+    return converted
+
+
+def load_config(path):
+    if path.endswith('.toml'):
+        import tomllib
+        with open(path, 'rb') as f:
+            config = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+
+    defaults = dict(DEFAULTS, **config.get('defaults', {}))
+    runs = []
+    for i, run in enumerate(config.get('runs', [])):
+        run = dict(defaults, **run)
+        run['strategy'] = STRATEGY_ALIASES.get(run['strategy'], run['strategy'])
+        if 'legs' in run['params']:
+            run['params'] = dict(run['params'], legs=_leg_aliases(run['params']['legs']))
+        run.setdefault('name', f"{i:03d}-{run.get('symbol', os.path.basename(run.get('csv', 'run')))}")
+        runs.append(run)
+    return runs
+
+
+# timeframe/csv를 주지 않으면 실행의 기본 캔들 (csv 또는 거래소의 timeframe),
+# 주면 그 시간 프레임 또는 파일의 캔들 (손절/익절 판정용 하위 시간 프레임 등)
+def load_data(run, cache_root, timeframe=None, csv=None):
+    import pandas as pd
+
+    if timeframe is None and csv is None:
+        csv = run.get('csv')
+    if csv:
+        return pd.read_csv(csv, index_col=0, parse_dates=True)
+    if 'symbol' not in run:
+        raise ValueError("거래소에서 캔들을 가져오려면 symbol을 지정해야 합니다 "
+                         "(csv 실행의 하위 시간 프레임은 intrabar_csv로 지정).")
+    timeframe = timeframe or run['timeframe']
+
+    # 앱과 같은 캐시 디렉토리를 사용하므로 이미 받은 구간은 다시 요청하지 않음
+    from cache_manager import CacheManager
+    from data import timeframe_ms
+    from exchanges import create_exchange
+
+    exchange = create_exchange(run['exchange'])
+    since = exchange.milliseconds() - int(run['days'] * 24 * 60 * 60 * 1000)
+    since -= since % timeframe_ms(exchange, timeframe)
+    return CacheManager(cache_root).load(exchange, run['symbol'], timeframe, since)
+
+
+# 설정의 손절/익절 비율 (모두 없으면 None)
+def stop_settings(run):
+    stops = {name: run[f'{name}_percent'] / 100.0 for name in ('stop_loss', 'take_profit', 'trailing_stop')
+             if run.get(f'{name}_percent')}
+    return stops or None
+
+
+# 백테스팅 한 건 실행 후 결과 저장 (실패해도 예외 대신 오류 메시지를 요약에 기록)
+def execute(run, output_dir, cache_root):
+    from engine import backtest
+    from metrics import performance, periods_per_year
+    from strategies import STRATEGIES
+
+    start = time.perf_counter()
+    row = {name: run.get(name) for name in ['name', 'symbol', 'timeframe', 'strategy']}
+    try:
+        df = load_data(run, cache_root)
+        signals = STRATEGIES[run['strategy']][0](df, **run['params'])
+        initial_capital = float(run['initial_capital'])
+        stops = stop_settings(run)
+        intrabar = None
+        if stops and run.get('intrabar_csv'):
+            intrabar = load_data(run, cache_root, csv=run['intrabar_csv'])
+        elif stops and run.get('intrabar_timeframe'):
+            intrabar = load_data(run, cache_root, timeframe=run['intrabar_timeframe'])
+        portfolio, trades = backtest(signals, initial_capital, run['fee_percent'] / 100.0,
+                                     run['slippage_percent'] / 100.0, stops, df, intrabar)
+
+        run_dir = os.path.join(output_dir, run['name'])
+        os.makedirs(run_dir, exist_ok=True)
+        portfolio.to_csv(os.path.join(run_dir, 'portfolio.csv'))
+        trades.to_csv(os.path.join(run_dir, 'trades.csv'), index=False)
+
+        # CSV는 시간 프레임 설정과 다를 수 있으므로 타임스탬프 간격으로 연율화 기준 추정
+        periods = periods_per_year(index=df.index) if 'csv' in run else periods_per_year(run['timeframe'])
+        metrics = performance(portfolio['total'].to_numpy(), trades, initial_capital, periods)
+        row.update({name: metrics[name] for name in SUMMARY_COLUMNS if name in metrics}, candles=len(df), error='')
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+    row['seconds'] = time.perf_counter() - start
+    return row
+
+
+def run_all(runs, output_dir, cache_root='cache', workers=1, log=print):
+    os.makedirs(output_dir, exist_ok=True)
+    rows = []
+    if workers == 1:
+        for run in runs:
+            rows.append(execute(run, output_dir, cache_root))
+            log(_describe(rows[-1]))
+    else:
+        import multiprocessing as mp
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+            futures = [pool.submit(execute, run, output_dir, cache_root) for run in runs]
+            for future in as_completed(futures):
+                rows.append(future.result())
+                log(_describe(rows[-1]))
+
+    # 설정 파일 순서대로 요약 저장
+    order = {run['name']: i for i, run in enumerate(runs)}
+    rows.sort(key=lambda row: order[row['name']])
+    import pandas as pd
+    summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+    summary.to_csv(os.path.join(output_dir, 'summary.csv'), index=False)
+    return summary
+
+
+def _describe(row):
+    if row['error']:
+        return f"[실패] {row['name']}: {row['error']}"
+    return (f"[완료] {row['name']}: 수익률 {row['total_return']:.2f}%, MDD {row['max_drawdown']:.2f}%, "
+            f"거래 {row['trades']}회 ({row['seconds']:.2f}초)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="설정 파일의 백테스팅을 실행하고 결과를 저장합니다.")
+    parser.add_argument('config', help="실행 목록 설정 파일 (.json 또는 .toml)")
+    parser.add_argument('-o', '--output', default='results', help="결과 저장 디렉토리 (기본: results)")
+    parser.add_argument('--cache', default='cache', help="캔들 캐시 디렉토리 (기본: cache)")
+    parser.add_argument('--workers', type=int, default=1, help="동시에 실행할 프로세스 수 (기본: 1)")
+    args = parser.parse_args(argv)
+
+    runs = load_config(args.config)
+    names = [run['name'] for run in runs]
+    if len(set(names)) != len(names):
+        parser.error("실행 이름(name)이 중복되었습니다.")
+    summary = run_all(runs, args.output, args.cache, max(1, args.workers))
+    # 한 건이라도 실패하면 종료 코드 1 (야간 작업 모니터링용)
+    return 1 if (summary['error'] != '').any() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
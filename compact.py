@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from composite import compile_strategy
+from engine import simulate
+
+# 메모리 절약 모드: 수년치 1m/5m 캔들처럼 긴 시계열을 적은 메모리로 백테스팅
+# - 캔들: int64 밀리초 타임스탬프 + float32 시가/고가/저가/종가/거래량 (봉당 28바이트, DataFrame은 48바이트 이상)
+# - 신호: 봉당 1비트 비트마스크, 가격은 캔들 배열을 그대로 사용 (신호 DataFrame을 만들지 않음)
+# - 결과: 자산 곡선(total)과 거래 기록만 보관하고, DataFrame은 화면에 표시할 구간만 그때그때 생성
+# float32 가격은 유효 숫자가 7자리 정도이므로 지표/수익률이 일반 모드와 아주 조금 다를 수 있음
+
+PRICE_DTYPE = np.float32
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+
+# 열별 배열 캔들
+class CompactCandles:
+    def __init__(self, timestamp, open, high, low, close, volume):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.open = np.asarray(open, dtype=PRICE_DTYPE)
+        self.high = np.asarray(high, dtype=PRICE_DTYPE)
+        self.low = np.asarray(low, dtype=PRICE_DTYPE)
+        self.close = np.asarray(close, dtype=PRICE_DTYPE)
+        self.volume = np.asarray(volume, dtype=PRICE_DTYPE)
+
+    # store.CandleSeries.read() 결과 (메모리 맵 슬라이스)에서 필요한 구간만 float32로 복사
+    @classmethod
+    def from_columns(cls, columns):
+        return cls(np.array(columns['timestamp'], dtype=np.int64), *(columns[name] for name in OHLCV))
+
+    @classmethod
+    def from_frame(cls, df):
+        timestamp = df.index.to_numpy(dtype='datetime64[ms]').view(np.int64)
+        return cls(timestamp, *(df[name].to_numpy() for name in OHLCV))
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @property
+    def nbytes(self):
+        return self.timestamp.nbytes + sum(getattr(self, name).nbytes for name in OHLCV)
+
+    # 타임스탬프 배열을 복사 없이 감싼 DatetimeIndex
+    def index(self, lo=0, hi=None):
+        return pd.DatetimeIndex(self.timestamp[lo:hi].view('datetime64[ms]'), name='timestamp')
+
+    # [start, end] 시간 구간의 위치 범위 (charts.visible_range와 같음)
+    def locate(self, start=None, end=None):
+        lo = 0 if start is None else int(np.searchsorted(self.timestamp, _epoch_ms(start), side='left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamp, _epoch_ms(end), side='right'))
+        return lo, hi
+
+    # 화면 표시용 DataFrame (lo:hi 구간만)
+    def frame(self, lo=0, hi=None):
+        return pd.DataFrame({name: getattr(self, name)[lo:hi] for name in OHLCV}, index=self.index(lo, hi))
+
+
+def _epoch_ms(moment):
+    return pd.Timestamp(moment).value // 10 ** 6
+
+
+# 0/1 신호를 봉당 1비트로 보관
+class SignalBits:
+    def __init__(self, signal):
+        signal = np.asarray(signal)
+        self.size = len(signal)
+        self.bits = np.packbits(signal > 0)
+
+    def __len__(self):
+        return self.size
+
+    # lo:hi 구간만 풀어서 bool 배열로 반환
+    def unpack(self, lo=0, hi=None):
+        hi = self.size if hi is None else min(hi, self.size)
+        if hi <= lo:
+            return np.zeros(0, dtype=bool)
+        chunk = np.unpackbits(self.bits[lo // 8:(hi + 7) // 8])
+        return chunk[lo % 8:lo % 8 + hi - lo].astype(bool)
+
+
+# 메모리 절약 모드 백테스팅 결과
+class CompactResult:
+    def __init__(self, candles, signal, total, ledger, initial_capital):
+        self.candles = candles
+        self.signal = signal
+        self.total = total
+        self.ledger = ledger
+        self.initial_capital = initial_capital
+
+    def __len__(self):
+        return len(self.total)
+
+    # 보관 중인 배열 크기 (캔들 + 신호 + 자산 곡선 + 거래 기록)
+    @property
+    def nbytes(self):
+        ledger = sum(self.ledger.column(name).nbytes for name, _ in self.ledger.FIELDS)
+        return self.candles.nbytes + self.signal.bits.nbytes + self.total.nbytes + ledger
+
+    # 봉별 수익률 (일반 모드 portfolio['returns']와 같이 첫 봉은 NaN)
+    def returns(self):
+        returns = np.empty(len(self.total))
+        returns[:1] = np.nan
+        np.divide(self.total[1:], self.total[:-1], out=returns[1:])
+        returns[1:] -= 1
+        return returns
+
+    def trades(self):
+        return self.ledger.to_frame(self.candles.timestamp.view('datetime64[ms]'))
+
+    # 화면에 표시할 구간의 (캔들, 신호, 포트폴리오) DataFrame - backtest_figure에 그대로 넘길 수 있는 형태
+    def window(self, lo=0, hi=None):
+        hi = len(self) if hi is None else hi
+        index = self.candles.index(lo, hi)
+        # 구간 첫 봉의 포지션 변화는 직전 봉 신호와 비교
+        start = max(lo - 1, 0)
+        signal = self.signal.unpack(start, hi).astype(np.float64)
+        position = np.diff(signal, prepend=np.nan)
+        signals = pd.DataFrame({'price': self.candles.close[lo:hi], 'signal': signal[lo - start:],
+                                'position': position[lo - start:]}, index=index)
+        portfolio = pd.DataFrame({'total': self.total[lo:hi]}, index=index)
+        return self.candles.frame(lo, hi), signals, portfolio
+
+
+# 메모리 절약 모드 백테스팅
+# strategy/params: strategies.STRATEGIES의 전략 이름과 파라미터, legs/combine: 복합 전략 추가 조건
+# 신호는 composite 노드 그래프로 계산해 최종 0/1 신호만 남기고, 엔진 결과 중 자산 곡선과 거래 기록만 보관
+# stops는 봉 고가/저가로 판정 (하위 시간 프레임 캔들은 사용하지 않음)
+def compact_backtest(candles, strategy, params, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001,
+                     legs=(), combine='and', stops=None):
+    spec = {'combine': combine, 'legs': [{'strategy': strategy, 'params': params}, *legs]}
+    graph = compile_strategy(spec)
+    # 지표 캐시 키에는 타임스탬프(정수)만 쓰이므로 DatetimeIndex를 만들지 않음
+    close = pd.Series(candles.close, index=pd.Index(candles.timestamp, copy=False), copy=False)
+    signal = graph.evaluate({'close': close})[graph.output]
+
+    stop_candles = (np.arange(len(candles)), candles.open, candles.high, candles.low) if stops else None
+    result = simulate(candles.close, signal, initial_capital, fee_ratio, slippage_ratio,
+                      stops=stops, candles=stop_candles)
+    return CompactResult(candles, SignalBits(signal), result['total'], result['ledger'], initial_capital)
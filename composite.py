@@ -0,0 +1,198 @@
+import operator
+
+import numpy as np
+import pandas as pd
+
+from indicators import rolling_mean, rolling_std, average_gain, average_loss
+
+# 복합 전략: 기존 전략과 지표 조건을 AND/OR/투표로 묶은 전략
+#
+#   {'combine': 'and', 'legs': [
+#       {'strategy': 'MA 교차', 'params': {'short_window': 20, 'long_window': 50}},
+#       {'indicator': 'rsi', 'window': 14, 'op': '<', 'value': 50},
+#   ]}
+#
+# 정의를 지표/신호 노드의 의존 그래프로 바꾼 뒤 노드마다 한 번씩만 계산하므로,
+# 여러 조건이 같은 지표(예: 같은 기간의 이동평균이나 RSI)를 쓰면 그 지표는 한 번만 계산됨
+# legs 안에 다시 {'combine': ..., 'legs': [...]}를 넣어 중첩할 수 있음
+
+CLOSE = ('close',)
+
+COMPARISONS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+INDICATOR_FUNCTIONS = {
+    'rolling_mean': rolling_mean,
+    'rolling_std': rolling_std,
+    'average_gain': average_gain,
+    'average_loss': average_loss,
+}
+
+
+# 노드 그래프: 키(노드 종류와 설정의 튜플) -> (계산 함수, 의존 노드 키)
+# 같은 키는 한 번만 추가되고, 추가 순서가 곧 계산 순서 (의존 노드를 항상 먼저 추가)
+class StrategyGraph:
+    def __init__(self):
+        self.nodes = {CLOSE: (None, ())}
+        # 신호 DataFrame에 함께 담을 지표 열 이름 -> 노드 키 (같은 이름은 먼저 추가한 조건 기준)
+        self.columns = {}
+        self.output = None
+
+    def add(self, key, compute, *deps):
+        if key not in self.nodes:
+            self.nodes[key] = (compute, deps)
+        return key
+
+    def name(self, column, key):
+        self.columns.setdefault(column, key)
+
+    def indicator(self, name, window):
+        return self.add((name, window), lambda close: INDICATOR_FUNCTIONS[name](close, window).to_numpy(), CLOSE)
+
+    # 노드를 추가 순서대로 한 번씩 계산해 노드 키 -> 값 반환
+    def evaluate(self, df):
+        values = {CLOSE: df['close']}
+        for key, (compute, deps) in self.nodes.items():
+            if key != CLOSE:
+                values[key] = compute(*(values[dep] for dep in deps))
+        return values
+
+
+def _ma_cross(graph, short_window=20, long_window=50):
+    short_ma = graph.indicator('rolling_mean', short_window)
+    long_ma = graph.indicator('rolling_mean', long_window)
+    graph.name('short_ma', short_ma)
+    graph.name('long_ma', long_ma)
+
+    def compute(short, long):
+        signal = (short > long).astype(np.int8)
+        signal[:short_window] = 0
+        return signal
+    return graph.add(('ma_cross', short_window, long_window), compute, short_ma, long_ma)
+
+
+def _rsi(graph, window=None):
+    window = window or 14
+    gain = graph.indicator('average_gain', window)
+    loss = graph.indicator('average_loss', window)
+
+    def compute(gain, loss):
+        # 하락이 없는 구간은 RSI 100 (pandas 나눗셈과 같이 0으로 나누기 경고 없이 inf 처리)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 - (100 / (1 + gain / loss))
+    return graph.add(('rsi', window), compute, gain, loss)
+
+
+def _rsi_signal(graph, rsi_period=14, oversold=30, overbought=70):
+    rsi = _rsi(graph, rsi_period)
+    graph.name('rsi', rsi)
+    return graph.add(('rsi_signal', rsi_period, oversold, overbought),
+                     lambda rsi: ((rsi < oversold) & ~(rsi > overbought)).astype(np.int8), rsi)
+
+
+def _bollinger_bands(graph, window=20, num_std=2):
+    rolling = graph.indicator('rolling_mean', window)
+    # 기간을 다 채운 구간만 사용 (bollinger_bands_strategy와 같음)
+    full_mean = graph.add(('rolling_mean_full', window),
+                          lambda mean: np.concatenate((np.full(min(window - 1, len(mean)), np.nan), mean[window - 1:])),
+                          rolling)
+    std = graph.indicator('rolling_std', window)
+    upper = graph.add(('upper_band', window, num_std), lambda mean, std: mean + std * num_std, full_mean, std)
+    lower = graph.add(('lower_band', window, num_std), lambda mean, std: mean - std * num_std, full_mean, std)
+    graph.name('rolling_mean', full_mean)
+    graph.name('upper_band', upper)
+    graph.name('lower_band', lower)
+
+    def compute(close, upper, lower):
+        price = close.to_numpy()
+        return ((price < lower) & ~(price > upper)).astype(np.int8)
+    return graph.add(('bollinger_signal', window, num_std), compute, CLOSE, upper, lower)
+
+
+# 조건으로 쓸 수 있는 지표: 이름 -> (graph, window) -> 노드 키 (rsi의 window 기본값은 14)
+CONDITION_SOURCES = {
+    'close': lambda graph, window: CLOSE,
+    'rsi': _rsi,
+    'rolling_mean': lambda graph, window: graph.indicator('rolling_mean', window),
+    'rolling_std': lambda graph, window: graph.indicator('rolling_std', window),
+}
+# window를 반드시 지정해야 하는 조건 지표
+WINDOW_REQUIRED = ('rolling_mean', 'rolling_std')
+
+
+def _condition(graph, indicator, op, value, window=None):
+    if indicator not in CONDITION_SOURCES:
+        raise ValueError(f"지원하지 않는 조건 지표입니다: {indicator}")
+    if op not in COMPARISONS:
+        raise ValueError(f"지원하지 않는 비교 연산자입니다: {op}")
+    if indicator in WINDOW_REQUIRED and not window:
+        raise ValueError(f"{indicator} 조건에는 window를 지정해야 합니다.")
+    source = CONDITION_SOURCES[indicator](graph, window)
+    compare = COMPARISONS[op]
+    return graph.add(('condition', source, op, value),
+                     lambda values: compare(np.asarray(values, dtype=np.float64), value).astype(np.int8), source)
+
+
+# 조건별 신호 노드 함수 (strategies.STRATEGIES와 같은 이름과 파라미터)
+LEGS = {
+    "MA 교차": _ma_cross,
+    "RSI": _rsi_signal,
+    "볼린저 밴드": _bollinger_bands,
+}
+
+COMBINE_OPTIONS = ['and', 'or', 'vote']
+
+
+# 여러 신호 노드를 하나로 묶는 노드 (vote: min_votes개 이상이 보유 신호이면 보유, 기본값은 과반)
+def _combine(graph, combine, legs, min_votes=None):
+    if combine not in COMBINE_OPTIONS:
+        raise ValueError(f"지원하지 않는 결합 방식입니다: {combine}")
+    # 순서만 다른 같은 조합도 같은 노드가 되도록 정렬 (중복 조건은 표를 하나씩 더 갖도록 그대로 둠 -
+    # 같은 노드는 그래프에 한 번만 추가되므로 계산은 한 번)
+    legs = tuple(sorted(legs, key=repr))
+    if len(legs) == 1:
+        return legs[0]
+    if combine == 'and':
+        required = len(legs)
+    elif combine == 'or':
+        required = 1
+    else:
+        required = min_votes or len(legs) // 2 + 1
+    return graph.add(('combine', required, legs),
+                     lambda *signals: (np.sum(signals, axis=0) >= required).astype(np.int8), *legs)
+
+
+def _compile(graph, spec):
+    if 'legs' in spec:
+        legs = [_compile(graph, leg) for leg in spec['legs']]
+        if not legs:
+            raise ValueError("복합 전략에 조건이 없습니다.")
+        return _combine(graph, spec.get('combine', 'and'), legs, spec.get('min_votes'))
+    if 'strategy' in spec:
+        return LEGS[spec['strategy']](graph, **spec.get('params', {}))
+    return _condition(graph, spec['indicator'], spec['op'], spec['value'], spec.get('window'))
+
+
+# 복합 전략 정의 -> 노드 그래프 (graph.output이 최종 0/1 신호 노드)
+def compile_strategy(spec):
+    graph = StrategyGraph()
+    graph.output = _compile(graph, spec)
+    return graph
+
+
+# 복합 전략 실행 - 다른 전략 함수와 같은 형태의 신호 DataFrame (price, 지표 열, signal, position)
+def composite_strategy(df, legs, combine='and', min_votes=None):
+    graph = compile_strategy({'combine': combine, 'legs': legs, 'min_votes': min_votes})
+    values = graph.evaluate(df)
+
+    signals = pd.DataFrame(index=df.index)
+    signals['price'] = df['close']
+    for column, key in graph.columns.items():
+        signals[column] = values[key]
+    signals['signal'] = values[graph.output]
+    signals['position'] = signals['signal'].diff()
+    return signals
@@ -0,0 +1,59 @@
+import numpy as np
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+# 한 번 요청에 받는 최대 캔들 수
+PAGE_LIMIT = 1000
+
+
+# 시간 프레임 단위별 초 (ccxt와 동일한 규칙, 거래소 객체 없이 사용)
+TIMEFRAME_SECONDS = {
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+    'w': 7 * 24 * 60 * 60,
+    'M': 30 * 24 * 60 * 60,
+    'y': 365 * 24 * 60 * 60,
+}
+
+
+def parse_timeframe(timeframe):
+    return int(timeframe[:-1]) * TIMEFRAME_SECONDS[timeframe[-1]]
+
+
+def timeframe_ms(exchange, timeframe):
+    return exchange.parse_timeframe(timeframe) * 1000
+
+
+# 캔들 리스트 -> 열별 배열
+def to_columns(ohlcv):
+    array = np.asarray(ohlcv, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+    columns = {name: array[:, i] for i, name in enumerate(OHLCV_COLUMNS)}
+    columns['timestamp'] = columns['timestamp'].astype(np.int64)
+    return columns
+
+
+# since 부터 until 직전까지 거래소 페이지 크기 단위로 앞으로 걸어가며 가져오기
+# limit보다 짧은 페이지는 더 받을 캔들이 없다는 뜻이므로 다음 요청을 보내지 않음
+# (한 번에 limit보다 적게 주는 거래소도 있어, 이전 페이지보다 짧거나 첫 페이지가 현재 봉 근처까지 왔을 때만 끝으로 봄)
+def fetch_range(exchange, symbol, timeframe, since, until=None, limit=PAGE_LIMIT):
+    step = timeframe_ms(exchange, timeframe)
+    until = until if until is not None else exchange.milliseconds()
+    candles = []
+    cursor = since
+    largest = 0
+    while cursor < until:
+        raw = exchange.fetch_ohlcv(symbol, timeframe, cursor, limit)
+        page = [candle for candle in raw if candle[0] >= cursor]
+        if not page:
+            break
+        candles.extend(candle for candle in page if candle[0] < until)
+        # 거래소가 since를 무시하고 같은 구간을 돌려주면 더 진행하지 않음
+        next_cursor = page[-1][0] + step
+        if next_cursor <= cursor or next_cursor >= until:
+            break
+        if len(raw) < limit and (len(raw) < largest or (not largest and next_cursor > exchange.milliseconds() - step)):
+            break
+        largest = max(largest, len(raw))
+        cursor = next_cursor
+    return to_columns(candles)
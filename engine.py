@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+
+from stops import REASONS, SIGNAL, intrabar_candles, stop_exits
+
+TRADE_COLUMNS = ['timestamp', 'type', 'price', 'effective_price', 'units', 'value', 'fee', 'profit', 'reason']
+
+BUY = 1
+SELL = -1
+
+
+# 거래 기록 (열별 배열을 미리 할당하고 부족하면 2배로 늘림)
+class TradeLedger:
+    FIELDS = [
+        ('bar', np.int64),
+        ('side', np.int8),
+        ('price', np.float64),
+        ('effective_price', np.float64),
+        ('units', np.float64),
+        ('value', np.float64),
+        ('fee', np.float64),
+        ('profit', np.float64),
+        ('reason', np.int8),
+    ]
+
+    def __init__(self, capacity=64):
+        self.size = 0
+        self.columns = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in self.FIELDS}
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        capacity = len(self.columns['bar'])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def append(self, bar, side, price, effective_price, units, value, fee, profit=0.0, reason=SIGNAL):
+        self._reserve(1)
+        row = self.size
+        for name, item in zip(self.columns, (bar, side, price, effective_price, units, value, fee, profit, reason)):
+            self.columns[name][row] = item
+        self.size += 1
+
+    # 여러 건을 배열 단위로 한 번에 추가
+    def extend(self, **arrays):
+        count = len(arrays['bar'])
+        self._reserve(count)
+        for name, column in self.columns.items():
+            column[self.size:self.size + count] = arrays.get(name, 0)
+        self.size += count
+
+    def column(self, name):
+        return self.columns[name][:self.size]
+
+    # 마지막에 한 번만 DataFrame으로 변환
+    def to_frame(self, index):
+        bars = self.column('bar')
+        side = self.column('side')
+        return pd.DataFrame({
+            'timestamp': np.asarray(index)[bars],
+            'type': np.where(side == BUY, 'BUY', 'SELL'),
+            'price': self.column('price'),
+            'effective_price': self.column('effective_price'),
+            'units': self.column('units'),
+            'value': self.column('value'),
+            'fee': self.column('fee'),
+            'profit': self.column('profit'),
+            'reason': np.asarray(REASONS)[self.column('reason')],
+        }, columns=TRADE_COLUMNS)
+
+
+# 0/1 신호에서 실제 체결 지점(매수/매도 인덱스) 계산
+# prev: 이 구간 직전 봉의 신호 (이어서 계산할 때 사용, 없으면 첫 봉은 변화 없음으로 취급)
+def trade_points(signal, prev=None):
+    signal = np.nan_to_num(np.asarray(signal, dtype=np.float64)) > 0
+    first = signal[:1] if prev is None else np.array([prev > 0])
+    change = np.diff(signal.astype(np.int8), prepend=first.astype(np.int8))
+
+    # 첫 매수 이전의 보유 신호는 체결된 적이 없으므로 무시
+    buys = np.flatnonzero(change > 0)
+    if len(buys) == 0:
+        return buys, buys
+    sells = np.flatnonzero(change < 0)
+    sells = sells[sells > buys[0]]
+    return buys, sells
+
+
+# 배열 기반 백테스팅 엔진 (전액 매수/전액 매도, 수수료 및 슬리피지 포함)
+# prev_signal/offset: 앞 구간에 이어서 계산할 때 직전 신호와 거래 기록에 남길 봉 번호 시작값
+# stops: 손절/익절 설정 ({'stop_loss': 0.05, 'take_profit': 0.1, 'trailing_stop': 0.03}, 비율)
+# candles: 손절/익절 판정 캔들 (stops.intrabar_candles 결과, 없으면 종가로만 판정)
+def simulate(price, signal, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001,
+             prev_signal=None, offset=0, stops=None, candles=None):
+    price = np.asarray(price, dtype=np.float64)
+    n = len(price)
+    buys, sells = trade_points(signal, prev_signal)
+
+    buy_price = price[buys] * (1 + slippage_ratio)
+    # 청산 가격 (슬리피지 전) - 손절/익절에 걸린 거래는 신호 매도보다 먼저 해당 가격에 청산
+    exit_price = price[sells]
+    exit_reason = np.zeros(len(sells), dtype=np.int8)
+    if stops and len(buys):
+        if candles is None:
+            candles = (np.arange(n), price, price, price)
+        ends = np.append(sells, n - 1)[:len(buys)]
+        stop_bar, stop_price, stop_reason = stop_exits(candles, buys, ends, buy_price, **stops)
+        hit = stop_bar >= 0
+        sells = np.where(hit, stop_bar, np.append(sells, -1)[:len(buys)])
+        exit_price = np.where(hit, stop_price, price[np.maximum(sells, 0)])
+        exit_reason = stop_reason
+        # 보유 중이던 마지막 거래가 손절/익절로 청산되지 않았으면 제외
+        if sells[-1] < 0:
+            sells, exit_price, exit_reason = sells[:-1], exit_price[:-1], exit_reason[:-1]
+    sell_price = exit_price * (1 - slippage_ratio)
+
+    # 왕복 거래마다 현금이 변하는 비율 -> 초기 자본부터 차례로 곱해 각 매수 직전(매도 직후) 현금 계산
+    # (곱하는 순서가 고정되어 있어 구간을 나눠 이어서 계산해도 결과가 같음)
+    trips = len(sells)
+    growth = (1 - fee_ratio) ** 2 * sell_price / buy_price[:trips]
+    capital = np.cumprod(np.concatenate(([float(initial_capital)], growth)))
+    cash_before = capital[:len(buys)]
+
+    buy_fee = cash_before * fee_ratio
+    units = (cash_before - buy_fee) / buy_price
+    sell_value = units[:trips] * sell_price
+    sell_fee = sell_value * fee_ratio
+
+    # 매수/매도 이벤트를 시간순으로 합쳐 거래 기록과 각 봉의 상태 계산에 함께 사용
+    events = len(buys) + trips
+    event_idx = np.empty(events, dtype=np.int64)
+    event_idx[0::2] = buys
+    event_idx[1::2] = sells
+    event_units = np.zeros(events)
+    event_units[0::2] = units
+    event_cash = np.zeros(events)
+    event_cash[1::2] = capital[1:]
+
+    buy_value = units * price[buys]
+    side = np.empty(events, dtype=np.int8)
+    side[0::2] = BUY
+    side[1::2] = SELL
+    effective_price = np.empty(events)
+    effective_price[0::2] = buy_price
+    effective_price[1::2] = sell_price
+    value = np.empty(events)
+    value[0::2] = buy_value
+    value[1::2] = sell_value
+    fee = np.empty(events)
+    fee[0::2] = buy_fee
+    fee[1::2] = sell_fee
+    # 매도 행에 직전 매수와 짝지은 순이익(수수료 차감)을 미리 기록
+    profit = np.zeros(events)
+    profit[1::2] = sell_value - buy_value[:trips] - buy_fee[:trips] - sell_fee
+    raw_price = np.empty(events)
+    raw_price[0::2] = price[buys]
+    raw_price[1::2] = exit_price
+    reason = np.zeros(events, dtype=np.int8)
+    reason[1::2] = exit_reason
+
+    ledger = TradeLedger(events)
+    ledger.extend(
+        bar=event_idx + offset,
+        side=side,
+        price=raw_price,
+        effective_price=effective_price,
+        units=np.repeat(units, 2)[:events],
+        value=value,
+        fee=fee,
+        profit=profit,
+        reason=reason,
+    )
+
+    marks = np.zeros(n, dtype=np.int64)
+    marks[event_idx] = 1
+    last_event = np.cumsum(marks) - 1
+    started = last_event >= 0
+    last_event = np.maximum(last_event, 0)
+
+    if events:
+        units_held = np.where(started, event_units[last_event], 0.0)
+        cash = np.where(started, event_cash[last_event], initial_capital)
+    else:
+        units_held = np.zeros(n)
+        cash = np.full(n, float(initial_capital))
+
+    positions = units_held * price
+    total = positions + cash
+
+    return {
+        'positions': positions,
+        'cash': cash,
+        'total': total,
+        'units': units_held,
+        'ledger': ledger,
+        # 다음 매수에 쓸 현금 (보유 중이면 마지막 매수 직전 현금)
+        'capital': capital[-1],
+    }
+
+
+# 백테스팅 함수 (수수료 및 슬리피지 포함)
+# stops를 주면 ohlc(신호와 같은 인덱스의 캔들)의 고가/저가로, intrabar(하위 시간 프레임 캔들)까지 주면
+# 봉 안의 가격 순서대로 손절/익절 체결 여부를 판정
+def backtest(signals, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001, stops=None, ohlc=None,
+             intrabar=None):
+    price = signals['price'].to_numpy(dtype=np.float64)
+    candles = None
+    if stops and ohlc is not None:
+        candles = intrabar_candles(ohlc.loc[signals.index], intrabar)
+    result = simulate(price, signals['signal'].to_numpy(), initial_capital, fee_ratio, slippage_ratio,
+                      stops=stops, candles=candles)
+
+    portfolio = pd.DataFrame(index=signals.index)
+    portfolio['positions'] = result['positions']
+    portfolio['cash'] = result['cash']
+    portfolio['total'] = result['total']
+    portfolio['returns'] = portfolio['total'].pct_change()
+
+    trades = result['ledger'].to_frame(signals.index)
+
+    return portfolio, trades
@@ -0,0 +1,221 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+import weakref
+
+from store import atomic_write
+
+# 거래소별 연결 확인 제한 시간 (초)
+PROBE_TIMEOUT = 8
+# 연결 확인 결과 재사용 시간 (초) - 이 시간 동안 실패한 거래소는 다시 시도하지 않음
+HEALTH_TTL = 600
+
+# 시장 정보 스냅샷 위치와 재검증 주기 (초)
+SNAPSHOT_DIR = os.path.join('cache', 'markets')
+SNAPSHOT_MAX_AGE = 24 * 60 * 60
+
+# ccxt는 가져오는 데 오래 걸리므로 거래소 객체를 처음 만들 때 가져옴
+def create_exchange(exchange_id, asynchronous=False, **config):
+    if asynchronous:
+        import ccxt.async_support as ccxt_module
+    else:
+        import ccxt as ccxt_module
+    return getattr(ccxt_module, exchange_id)(dict({'enableRateLimit': True}, **config))
+
+
+# ccxt 자체 대기(enableRateLimit)를 끈 같은 거래소 객체 - 요청 속도는 scheduler.FetchScheduler가 조절
+# 복사본도 백그라운드 시장 정보 갱신 대상에 등록 (원본과 같은 시장 정보 유지)
+def unthrottled(exchange):
+    if not getattr(exchange, 'enableRateLimit', False):
+        return exchange
+    copy = create_exchange(exchange.id, enableRateLimit=False)
+    with _revalidators_lock:
+        if exchange.markets:
+            copy.set_markets(exchange.markets, exchange.currencies)
+        _live_exchanges.setdefault(exchange.id, weakref.WeakSet()).add(copy)
+    return copy
+
+
+# 거래소 상태 캐시: exchange_id -> {'ok', 'latency', 'message', 'checked_at'}
+_health = {}
+_health_lock = threading.Lock()
+
+
+def health():
+    with _health_lock:
+        return dict(_health)
+
+
+def _record(exchange_id, ok, latency, message):
+    with _health_lock:
+        _health[exchange_id] = {
+            'ok': ok,
+            'latency': latency,
+            'message': message,
+            'checked_at': time.time(),
+        }
+
+
+def known_dead(exchange_id):
+    status = health().get(exchange_id)
+    return status is not None and not status['ok'] and time.time() - status['checked_at'] < HEALTH_TTL
+
+
+def snapshot_path(exchange_id, root=None):
+    return os.path.join(root or SNAPSHOT_DIR, f"{exchange_id}.json.gz")
+
+
+# 저장된 시장 정보 스냅샷 (없거나 깨졌으면 None)
+def load_snapshot(exchange_id, root=None):
+    try:
+        with gzip.open(snapshot_path(exchange_id, root), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_snapshot(exchange_id, markets, currencies, root=None):
+    path = snapshot_path(exchange_id, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    snapshot = {'saved_at': time.time(), 'markets': markets, 'currencies': currencies}
+    atomic_write(path, gzip.compress(json.dumps(snapshot).encode('utf-8')))
+    return snapshot
+
+
+# 가벼운 호출로 연결만 확인 (시장 목록 전체를 받지 않음)
+# 반환값: 확인했으면 True, 서버 시간 조회도 스냅샷도 없어 가벼운 확인 방법이 없으면 False (확인하지 않음)
+async def _ping(exchange):
+    if exchange.has.get('fetchTime'):
+        await exchange.fetch_time()
+        return True
+    snapshot = load_snapshot(exchange.id)
+    if snapshot:
+        exchange.set_markets(snapshot['markets'], snapshot['currencies'])
+        await exchange.fetch_ticker(next(iter(exchange.markets)))
+        return True
+    return False
+
+
+async def _probe(exchange_id, timeout):
+    exchange = create_exchange(exchange_id, asynchronous=True, timeout=int(timeout * 1000))
+    start = time.monotonic()
+    try:
+        probed = await asyncio.wait_for(_ping(exchange), timeout)
+        return exchange_id, probed, time.monotonic() - start, None
+    except Exception as e:
+        return exchange_id, True, time.monotonic() - start, str(e) or type(e).__name__
+    finally:
+        await exchange.close()
+
+
+# 후보 거래소를 동시에 확인: 선호 거래소가 제한 시간 안에 응답하면 선택, 아니면 가장 빨리 응답한 정상 거래소
+# 확인하지 못한 거래소는 상태를 기록하지 않고 후보로만 남김 (선호 거래소는 그대로 우선, 나머지는 정상 거래소 다음)
+# 반환값: 연결을 시도할 순서대로 정렬한 거래소 목록
+async def _race(preferred, candidates, timeout):
+    tasks = [asyncio.create_task(_probe(exchange_id, timeout)) for exchange_id in candidates]
+    finished_ids = set()
+    healthy = []
+    unprobed = []
+    try:
+        for finished in asyncio.as_completed(tasks):
+            exchange_id, probed, latency, error = await finished
+            finished_ids.add(exchange_id)
+            if not probed:
+                unprobed.append(exchange_id)
+            else:
+                _record(exchange_id, error is None, latency, error)
+                if error is None:
+                    healthy.append(exchange_id)
+            # 선호 거래소를 확인하지 못했어도 대체할 정상 거래소 하나는 기다림
+            if preferred in finished_ids and healthy:
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    first = [preferred] if preferred in healthy or preferred in unprobed else []
+    return first + [c for c in healthy + unprobed if c != preferred]
+
+
+def connect(preferred, candidates, timeout=PROBE_TIMEOUT):
+    # 최근 실패한 거래소는 건너뜀 (선호 거래소는 항상 다시 확인)
+    candidates = [preferred] + [c for c in candidates if c != preferred and not known_dead(c)]
+    for winner in asyncio.run(_race(preferred, candidates, timeout)):
+        # 시장 정보는 스냅샷에서 읽고, 오래된 스냅샷은 백그라운드에서 갱신
+        exchange = create_exchange(winner)
+        snapshot = load_snapshot(winner)
+        if snapshot is None:
+            # 스냅샷이 없는 첫 실행에서만 전체 시장 정보를 받아 저장 (확인하지 못한 거래소는 이것으로 연결 확인)
+            start = time.monotonic()
+            try:
+                exchange.load_markets()
+            except Exception as e:
+                _record(winner, False, time.monotonic() - start, str(e) or type(e).__name__)
+                continue
+            _record(winner, True, time.monotonic() - start, None)
+            snapshot = save_snapshot(winner, exchange.markets, exchange.currencies)
+        else:
+            exchange.set_markets(snapshot['markets'], snapshot['currencies'])
+        schedule_revalidation(exchange, snapshot['saved_at'])
+        return winner, exchange
+    return None, None
+
+
+# 거래소별 (재검증 스레드, 중지 이벤트)와 시장 정보를 갱신할 거래소 객체들
+# (연결된 객체와 unthrottled 복사본, 쓰지 않게 되면 자동 제외)
+_revalidators = {}
+_live_exchanges = {}
+_revalidators_lock = threading.Lock()
+
+
+# 스냅샷이 SNAPSHOT_MAX_AGE보다 오래되면 시장 정보를 다시 받아 저장하고 등록된 모든 거래소 객체에 반영
+def _revalidate(exchange_id, saved_at, interval, stop):
+    while not stop.wait(max(0, saved_at + interval - time.time())):
+        try:
+            fresh = create_exchange(exchange_id)
+            fresh.load_markets()
+            saved_at = save_snapshot(exchange_id, fresh.markets, fresh.currencies)['saved_at']
+            with _revalidators_lock:
+                for exchange in list(_live_exchanges.get(exchange_id, ())):
+                    exchange.set_markets(fresh.markets, fresh.currencies)
+        except Exception:
+            # 실패하면 잠시 후 다시 시도
+            saved_at = time.time() - interval + 5 * 60
+
+
+def schedule_revalidation(exchange, saved_at, interval=SNAPSHOT_MAX_AGE):
+    with _revalidators_lock:
+        _live_exchanges.setdefault(exchange.id, weakref.WeakSet()).add(exchange)
+        worker, _ = _revalidators.get(exchange.id, (None, None))
+        if worker is not None and worker.is_alive():
+            return
+        stop = threading.Event()
+        worker = threading.Thread(target=_revalidate, args=(exchange.id, saved_at, interval, stop),
+                                  name=f"markets-{exchange.id}", daemon=True)
+        _revalidators[exchange.id] = (worker, stop)
+        worker.start()
+
+
+# 재검증 스레드 중지 (exchange_id가 없으면 전부) - 진행 중인 갱신은 끝날 때까지 기다림
+def stop_revalidation(exchange_id=None, timeout=None):
+    with _revalidators_lock:
+        ids = list(_revalidators) if exchange_id is None else [exchange_id]
+        workers = [_revalidators.pop(id_) for id_ in ids if id_ in _revalidators]
+    for worker, stop in workers:
+        stop.set()
+    for worker, _ in workers:
+        worker.join(timeout)
+
+
+# 거래소에서 거래 가능한 현물 심볼 목록 (기본 코인을 앞에 배치)
+def exchange_symbols(exchange, preferred=()):
+    symbols = sorted(
+        symbol for symbol, market in exchange.markets.items()
+        if market.get('spot', True) and market.get('active') is not False
+    )
+    first = [symbol for symbol in preferred if symbol in exchange.markets]
+    return first + [symbol for symbol in symbols if symbol not in first]
@@ -0,0 +1,208 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# 지표는 절대 위치 기준 블록 단위로 계산 (한 번에 계산하든 캔들을 이어 붙이든 결과가 비트 단위로 같음)
+BLOCK = 4096
+
+
+# 지표 캐시: (데이터 지문, 길이, 전체 가격 해시, 지표, 기간) -> 계산 결과
+# 같은 데이터에 새 캔들이 붙은 경우 새 구간만 계산해 이어 붙이고, 메모리 상한을 넘으면 오래 안 쓴 항목부터 삭제
+class IndicatorCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self._entries = OrderedDict()
+        # (데이터 지문, 지표, 기간) -> 마지막으로 저장한 항목의 키 (새 캔들이 붙은 데이터에서 이어 계산할 항목 찾기)
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+            self.nbytes = 0
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _get_latest(self, series):
+        with self._lock:
+            key = self._latest.get(series)
+            return None if key is None else self._entries.get(key)
+
+    def _put(self, key, series, entry):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old['values'].nbytes
+            self._entries[key] = entry
+            self._latest[series] = key
+            self.nbytes += entry['values'].nbytes
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted['values'].nbytes
+                if self._latest.get(evicted['series']) == evicted_key:
+                    del self._latest[evicted['series']]
+
+    # compute(values, start)는 values[start:] 위치의 지표 값을 반환 (start 이전 값은 계산에 필요한 과거 구간)
+    def get(self, values, index, name, window, lookback, compute):
+        n = len(values)
+        series = (fingerprint(values, index), name, window)
+        digest = content_digest(values)
+        key = (series[0], n, digest, name, window)
+        entry = self._get(key)
+        if entry is not None:
+            self._count('hits')
+            return entry['values']
+
+        # 이전에 계산한 항목의 가격 전체가 지금 데이터의 앞부분과 같으면 새 캔들이 들어온 블록부터만 다시 계산
+        base = self._get_latest(series)
+        if base is not None and base['length'] < n and content_digest(values[:base['length']]) == base['digest']:
+            self._count('extensions')
+            start = base['length'] // BLOCK * BLOCK
+            result = np.concatenate((base['values'][:start], _compute_blocks(values, start, lookback, compute)))
+        else:
+            self._count('misses')
+            result = _compute_blocks(values, 0, lookback, compute)
+
+        result.flags.writeable = False
+        self._put(key, series, {'values': result, 'length': n, 'digest': digest, 'series': series})
+        return result
+
+
+# 블록마다 앞쪽 lookback 구간을 붙여 계산하고 블록 구간만 사용
+def _compute_blocks(values, start, lookback, compute):
+    parts = []
+    for block in range(start, len(values), BLOCK):
+        lo = max(0, block - lookback)
+        parts.append(compute(values[lo:block + BLOCK], block - lo))
+    return np.concatenate(parts) if parts else np.empty((0,) + np.shape(values)[1:])
+
+
+# 데이터 시작점으로 같은 시계열을 식별 (길이가 늘어나도 지문은 유지)
+def fingerprint(values, index):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.asarray(index[:1]).view(np.int64).tobytes() if len(index) else b'')
+    digest.update(np.asarray(values[:1], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+# 가격 배열 전체의 해시 (같은 지문과 길이라도 값이 하나라도 다르면 다른 데이터)
+def content_digest(values):
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(values.dtype.str.encode(), digest_size=16)
+    digest.update(values)
+    return digest.hexdigest()
+
+
+# 프로세스 안에서 재실행 사이에도 유지되는 기본 캐시
+cache = IndicatorCache()
+
+
+# 1차원 배열은 Series, 시간 × 코인 2차원 배열은 열마다 같은 계산을 하는 DataFrame
+def _frame(values):
+    return pd.Series(values) if np.ndim(values) == 1 else pd.DataFrame(values)
+
+
+def _rolling_mean(window):
+    def compute(values, start):
+        return _frame(values).rolling(window=window, min_periods=1).mean().to_numpy()[start:]
+    return compute
+
+
+def _rolling_std(window):
+    def compute(values, start):
+        return _frame(values).rolling(window=window).std().to_numpy()[start:]
+    return compute
+
+
+def _average_gain(window, sign):
+    def compute(values, start):
+        delta = _frame(values).diff()
+        moves = (sign * delta).where(sign * delta > 0, 0)
+        return moves.rolling(window=window).mean().to_numpy()[start:]
+    return compute
+
+
+# 지표 이름 -> 기간별 (필요한 과거 구간 길이, 계산 함수)
+INDICATORS = {
+    'rolling_mean': lambda window: (window - 1, _rolling_mean(window)),
+    'rolling_std': lambda window: (window - 1, _rolling_std(window)),
+    'average_gain': lambda window: (window, _average_gain(window, 1)),
+    'average_loss': lambda window: (window, _average_gain(window, -1)),
+}
+
+
+def _series(close, name, window):
+    lookback, compute = INDICATORS[name](window)
+    return pd.Series(cache.get(close.to_numpy(), close.index, name, window, lookback, compute), index=close.index)
+
+
+# 종가 행렬(시간 × 코인)의 열별 지표를 한 번에 계산 (단일 코인과 같은 블록 경계를 써서 열마다 결과가 같음)
+def indicator_matrix(close, name, window):
+    lookback, compute = INDICATORS[name](window)
+    values = _compute_blocks(close.to_numpy(dtype=np.float64), 0, lookback, compute)
+    return pd.DataFrame(values, index=close.index, columns=close.columns)
+
+
+# 이동평균 (min_periods=1, 앞부분은 있는 데이터만으로 평균)
+def rolling_mean(close, window, full=False):
+    values = _series(close, 'rolling_mean', window)
+    if full:
+        # 기간을 다 채운 구간만 사용 (나머지는 NaN)
+        values = values.copy()
+        values.iloc[:window - 1] = np.nan
+    return values
+
+
+def rolling_std(close, window):
+    return _series(close, 'rolling_std', window)
+
+
+# RSI 계산용 평균 상승폭 / 평균 하락폭
+def average_gain(close, window):
+    return _series(close, 'average_gain', window)
+
+
+def average_loss(close, window):
+    return _series(close, 'average_loss', window)
+
+
+# 캔들이 계속 추가되는 시계열의 지표 누적 상태
+# 배치 계산과 같은 블록 경계를 쓰므로, 새 캔들이 들어오면 마지막 블록만 다시 계산해도 결과가 배치와 같음
+class IndicatorStream:
+    def __init__(self, name, window):
+        self.lookback, self.compute = INDICATORS[name](window)
+        self.size = 0
+        self._values = np.empty(BLOCK)
+
+    @property
+    def values(self):
+        return self._values[:self.size]
+
+    # values: 지금까지의 전체 가격 배열 (마지막 블록과 그 앞 lookback 구간만 읽음)
+    def update(self, values):
+        n = len(values)
+        start = self.size // BLOCK * BLOCK
+        if n > len(self._values):
+            grown = np.empty(max(n, 2 * len(self._values)))
+            grown[:self.size] = self._values[:self.size]
+            self._values = grown
+        self._values[start:n] = _compute_blocks(values, start, self.lookback, self.compute)
+        self.size = n
+        return self.values
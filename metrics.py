@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from data import parse_timeframe
+from engine import SELL
+
+# 연 무위험 수익률 (2%)
+RISK_FREE_RATE = 0.02
+# 코인 시장은 쉬는 날이 없으므로 1년 = 365일 (주식의 252 거래일 대신)
+YEAR_SECONDS = 365 * 24 * 60 * 60
+
+
+# 1년 동안의 봉 수 (연율화 기준) - 시간 프레임을 모르면 타임스탬프 간격의 중앙값으로 추정
+def periods_per_year(timeframe=None, index=None):
+    if timeframe is not None:
+        return YEAR_SECONDS / parse_timeframe(timeframe)
+    if index is not None and len(index) > 1:
+        step = np.median(np.diff(np.asarray(index.asi8))) / 1e9
+        if step > 0:
+            return YEAR_SECONDS / step
+    return 365.0
+
+
+# 봉 하나 동안의 무위험 수익률
+def bar_risk_free(periods):
+    return (1 + RISK_FREE_RATE) ** (1 / periods) - 1
+
+
+# 거래 기록(TradeLedger 또는 거래 기록 DataFrame) -> (청산 거래별 손익, 총 수수료)
+def _closed_trades(ledger):
+    if ledger is None or len(ledger) == 0:
+        return np.empty(0), 0.0
+    if isinstance(ledger, pd.DataFrame):
+        sells = (ledger['type'] == 'SELL').to_numpy()
+        return ledger['profit'].to_numpy()[sells], float(ledger['fee'].sum())
+    sells = ledger.column('side') == SELL
+    return ledger.column('profit')[sells], float(ledger.column('fee').sum())
+
+
+# 월별 수익률 (%) - 월말 자산을 전월 말 자산(첫 달은 초기 자본)과 비교한 복리 수익률
+def monthly_returns(total, index, initial_capital):
+    total = np.asarray(total, dtype=np.float64)
+    index = pd.DatetimeIndex(index)
+    months = index.year.to_numpy() * 12 + index.month.to_numpy()
+    ends = np.append(np.flatnonzero(months[1:] != months[:-1]), len(total) - 1)
+    closes = total[ends]
+    opens = np.concatenate(([initial_capital], closes[:-1]))
+    return pd.Series((closes / opens - 1) * 100, index=index[ends].to_period('M').to_timestamp())
+
+
+# 자산 곡선과 거래 기록으로 성과 지표를 한 번에 계산
+# total: 봉별 자산, ledger: 거래 기록, periods: 1년 동안의 봉 수 (periods_per_year)
+# index를 주면 월별 수익률도 함께 계산 (파라미터 최적화처럼 결과가 많을 때는 생략)
+# 반환값의 수익률/MDD/변동성/승률은 %, 기간은 봉 수와 일수
+def performance(total, ledger=None, initial_capital=None, periods=365.0, index=None):
+    total = np.asarray(total, dtype=np.float64)
+    initial_capital = float(total[0] if initial_capital is None else initial_capital)
+    # 첫 봉의 변화(첫 매수 수수료 등)도 반영되도록 초기 자본을 앞에 붙여 계산
+    equity = np.concatenate(([initial_capital], total))
+    returns = equity[1:] / equity[:-1] - 1
+    n = len(returns)
+
+    # 고점 위치를 함께 누적해 MDD 구간과 가장 긴 하락 기간을 같은 배열에서 계산
+    peak = np.maximum.accumulate(equity)
+    drawdown = equity / peak - 1
+    positions = np.arange(len(equity))
+    peak_at = np.maximum.accumulate(np.where(equity >= peak, positions, 0))
+    trough = int(np.argmin(drawdown))
+    max_drawdown = drawdown[trough] * 100
+    drawdown_bars = int(trough - peak_at[trough])
+    longest_drawdown_bars = int((positions - peak_at).max())
+
+    excess = returns - bar_risk_free(periods)
+    mean = excess.mean() if n else 0.0
+    std = excess.std(ddof=1) if n > 1 else 0.0
+    downside = np.sqrt(np.mean(np.minimum(excess, 0) ** 2)) if n else 0.0
+    scale = np.sqrt(periods)
+
+    growth = equity[-1] / initial_capital
+    years = n / periods
+    if growth <= 0:
+        cagr = -100.0
+    else:
+        cagr = (growth ** (1 / years) - 1) * 100 if years > 0 else 0.0
+
+    profits, total_fees = _closed_trades(ledger)
+    wins = profits[profits > 0]
+    gross_loss = -profits[profits < 0].sum()
+    if gross_loss > 0:
+        profit_factor = wins.sum() / gross_loss
+    else:
+        profit_factor = np.inf if len(wins) else 0.0
+
+    metrics = {
+        'total_return': (growth - 1) * 100,
+        'cagr': cagr,
+        'max_drawdown': max_drawdown,
+        'sharpe_ratio': scale * mean / std if std > 1e-12 else 0.0,
+        'trades': len(profits),
+        'sortino_ratio': scale * mean / downside if downside > 1e-12 else 0.0,
+        'calmar_ratio': cagr / -max_drawdown if max_drawdown < 0 else 0.0,
+        'win_rate': len(wins) / len(profits) * 100 if len(profits) else 0.0,
+        'profit_factor': profit_factor,
+        'volatility': returns.std(ddof=1) * scale * 100 if n > 1 else 0.0,
+        # MDD 고점 ~ 저점 구간 (total 기준 위치, 고점이 초기 자본이면 0)
+        'drawdown_start': max(int(peak_at[trough]) - 1, 0),
+        'drawdown_end': max(trough - 1, 0),
+        'drawdown_bars': drawdown_bars,
+        'drawdown_days': drawdown_bars * 365 / periods,
+        'longest_drawdown_bars': longest_drawdown_bars,
+        'longest_drawdown_days': longest_drawdown_bars * 365 / periods,
+        'total_profit': profits.sum(),
+        'average_profit': profits.mean() if len(profits) else 0.0,
+        'max_profit': profits.max() if len(profits) else 0.0,
+        'max_loss': profits.min() if len(profits) else 0.0,
+        'total_fees': total_fees,
+    }
+    if index is not None:
+        metrics['monthly_returns'] = monthly_returns(total, index, initial_capital)
+    return metrics
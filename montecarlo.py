@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from metrics import bar_risk_free
+
+# 한 번에 만드는 경로 행렬의 최대 크기 (바이트) - 경로 수가 많으면 여러 묶음으로 나누어 계산
+BATCH_BYTES = 64 * 1024 * 1024
+# 분포 요약에 쓰는 백분위
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+# 수익률 경로 행렬(경로 × 봉)의 경로별 최종 수익률, MDD, 샤프 비율 (%)
+# periods: 1년 동안의 봉 수 (metrics.performance와 같은 기준으로 연율화)
+def path_metrics(returns, periods=365.0):
+    log_equity = np.cumsum(np.log1p(returns), axis=1)
+    final_return = np.expm1(log_equity[:, -1]) * 100
+    # 시작 자산(로그 0)도 고점 후보에 포함
+    peak = np.maximum(np.maximum.accumulate(log_equity, axis=1), 0)
+    max_drawdown = np.expm1((log_equity - peak).min(axis=1)) * 100
+
+    excess = returns - bar_risk_free(periods)
+    std = excess.std(axis=1, ddof=1) if returns.shape[1] > 1 else np.zeros(len(returns))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 1e-12, np.sqrt(periods) * excess.mean(axis=1) / std, 0.0)
+    return final_return, max_drawdown, sharpe
+
+
+# 원형 블록 부트스트랩: 길이 block인 연속 구간을 무작위 위치에서 이어 붙여 원래 길이의 경로를 만듦
+# (블록 안의 변동성 군집/자기상관은 유지)
+def block_bootstrap(returns, paths=10000, block=None, seed=0, periods=365.0):
+    returns = np.asarray(returns, dtype=np.float64)
+    returns = returns[np.isfinite(returns)]
+    n = len(returns)
+    if n < 2:
+        raise ValueError("수익률 데이터가 너무 짧습니다.")
+    block = int(block or max(1, round(n ** (1 / 3))))
+    blocks = -(-n // block)
+    # 끝에서 처음으로 이어지도록 앞부분을 뒤에 붙여 나머지 연산 없이 인덱싱
+    extended = np.concatenate((returns, returns[:block]))
+    offsets = np.arange(block)
+
+    rng = np.random.default_rng(seed)
+    batch = max(1, BATCH_BYTES // (n * 8 * 3))
+    results = []
+    for start in range(0, paths, batch):
+        count = min(batch, paths - start)
+        starts = rng.integers(0, n, size=(count, blocks))
+        sampled = extended[(starts[:, :, None] + offsets).reshape(count, -1)[:, :n]]
+        results.append(path_metrics(sampled, periods))
+    return tuple(np.concatenate(parts) for parts in zip(*results)), block
+
+
+# 거래 기록 -> 왕복 거래별 현금 배율 (매도 후 현금 / 매수 전 현금)
+def trade_growth(trades):
+    buys = trades[trades['type'] == 'BUY']
+    sells = trades[trades['type'] == 'SELL']
+    trips = len(sells)
+    cost = (buys['units'] * buys['effective_price'] + buys['fee']).to_numpy()[:trips]
+    proceeds = (sells['value'] - sells['fee']).to_numpy()
+    return proceeds / cost
+
+
+# 거래 순서 섞기 / 거래 복원 추출
+# 순서만 섞으면 최종 수익률은 같고 MDD 분포만 달라지며, 복원 추출은 최종 수익률 분포도 바꿈
+def trade_resample(trades, paths=10000, seed=0, replace=False):
+    growth = trade_growth(trades)
+    if len(growth) < 2:
+        raise ValueError("거래가 2회 이상 있어야 합니다.")
+    rng = np.random.default_rng(seed)
+    if replace:
+        order = rng.integers(0, len(growth), size=(paths, len(growth)))
+    else:
+        order = np.argsort(rng.random((paths, len(growth))), axis=1)
+    return path_metrics(growth[order] - 1)
+
+
+def summarize_distribution(values, actual=None):
+    row = {'평균': values.mean()}
+    row.update({f'{p}%': value for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+    if actual is not None:
+        # 실제 결과보다 나쁜 경로 비율
+        row['실제값'] = actual
+        row['실제값 이하 비율(%)'] = (values <= actual).mean() * 100
+    return row
+
+
+# 강건성 분석: 봉 단위 블록 부트스트랩과 거래 순서 섞기 결과의 분포 요약
+# returns: 봉별 수익률, trades: 거래 기록, actual: 실제 (최종 수익률, MDD, 샤프 비율), periods: 1년 동안의 봉 수
+def robustness(returns, trades, actual, paths=10000, block=None, seed=0, periods=365.0):
+    (final_return, max_drawdown, sharpe), block = block_bootstrap(returns, paths, block, seed, periods)
+    distributions = {
+        '최종 수익률 (%)': final_return,
+        'MDD (%)': max_drawdown,
+        '샤프 비율': sharpe,
+    }
+    summary = {name: summarize_distribution(values, value) for (name, values), value in zip(distributions.items(), actual)}
+    summary['손실 확률 (%)'] = {'평균': (final_return < 0).mean() * 100}
+
+    if len(trade_growth(trades)) >= 2:
+        _, shuffled_mdd, _ = trade_resample(trades, paths, seed)
+        resampled_return, _, _ = trade_resample(trades, paths, seed, replace=True)
+        distributions['거래 순서 섞기 MDD (%)'] = shuffled_mdd
+        distributions['거래 복원 추출 수익률 (%)'] = resampled_return
+        summary['거래 순서 섞기 MDD (%)'] = summarize_distribution(shuffled_mdd)
+        summary['거래 복원 추출 수익률 (%)'] = summarize_distribution(resampled_return)
+
+    return pd.DataFrame(summary).T, distributions, block
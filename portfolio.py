@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+# 자본 배분 방식
+ALLOCATIONS = {
+    "동일 비중": 'equal',          # 코인마다 1/N 자리를 고정, 신호가 없으면 그 몫은 현금
+    "보유 코인 균등": 'active',     # 신호가 있는 코인끼리 자본을 균등 분배
+}
+
+
+# 코인별 OHLCV를 공통 시간 인덱스로 맞춘 종가 행렬 (상장 전 구간은 NaN)
+def align_close(frames):
+    close = pd.DataFrame({symbol: df['close'] for symbol, df in frames.items()}).sort_index()
+    return close.ffill()
+
+
+# 첫 매수 전에 이미 켜져 있던 신호는 체결된 적이 없으므로 무시 (단일 코인 엔진과 동일)
+def _entered(signal):
+    started = np.cumsum(np.diff(signal, axis=0, prepend=signal[:1]) > 0, axis=0) > 0
+    return signal * started
+
+
+# 신호 행렬 -> 목표 비중 행렬 (시간 × 코인)
+def target_weights(signal, allocation='equal', max_weight=1.0):
+    signal = _entered(np.nan_to_num(np.asarray(signal, dtype=np.float64)) > 0).astype(np.float64)
+    if allocation == 'active':
+        weights = signal / np.maximum(signal.sum(axis=1, keepdims=True), 1)
+    else:
+        weights = signal / signal.shape[1]
+    return np.minimum(weights, max_weight)
+
+
+# 시간 × 코인 배열 기반 포트폴리오 엔진
+# 목표 비중이 바뀌는 봉에서만 리밸런싱하고, 그 사이에는 보유 수량을 유지한다.
+# 리밸런싱 구간마다의 수익 배율과 거래 비용은 모든 구간/코인에 대해 한 번에 계산한다.
+def simulate_portfolio(close, weights, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001):
+    price = np.asarray(close, dtype=np.float64)
+    # 상장 전 가격은 첫 가격으로 채움 (비중이 0이므로 결과에 영향 없음)
+    price = pd.DataFrame(price).bfill().to_numpy()
+    weights = np.asarray(weights, dtype=np.float64)
+    n, assets = price.shape
+    cost_rate = fee_ratio + slippage_ratio
+
+    # 리밸런싱 봉: 첫 봉(전부 현금) + 목표 비중이 바뀐 봉
+    changed = np.any(np.diff(weights, axis=0, prepend=np.zeros((1, assets))) != 0, axis=1)
+    changed[0] = True
+    events = np.flatnonzero(changed)
+    start_price = price[events]
+    event_weights = weights[events]
+
+    # 구간 k 동안 보유 비중이 가격 변화에 따라 흘러간 결과
+    end_price = price[np.append(events[1:], n - 1)]
+    relative = end_price / start_price
+    growth = (event_weights * relative).sum(axis=1) + (1 - event_weights.sum(axis=1))
+    drifted = event_weights * relative / growth[:, None]
+
+    # 각 리밸런싱 시점의 회전율 -> 거래 비용 (수수료 + 슬리피지, 거래 금액 기준)
+    before = np.vstack((np.zeros((1, assets)), drifted[:-1]))
+    turnover = np.abs(event_weights - before)
+    cost = cost_rate * turnover.sum(axis=1)
+
+    # 리밸런싱 직후 자산 = 이전 구간 배율과 비용을 누적곱
+    equity_before = initial_capital * np.concatenate(([1.0], np.cumprod(growth[:-1] * (1 - cost[:-1]))))
+    equity = equity_before * (1 - cost)
+
+    # 각 봉을 자신이 속한 구간의 보유 수량으로 평가
+    segment = np.cumsum(changed) - 1
+    units = (equity[:, None] * event_weights / start_price)[segment]
+    positions = units * price
+    cash = (equity * (1 - event_weights.sum(axis=1)))[segment]
+    total = positions.sum(axis=1) + cash
+
+    # 거래 기록: 리밸런싱 시점마다 비중이 바뀐 코인
+    traded = equity_before[:, None] * (event_weights - before)
+    rows, cols = np.nonzero(np.abs(traded) > 1e-12)
+    trades = {
+        'bar': events[rows],
+        'asset': cols,
+        'side': np.sign(traded[rows, cols]).astype(np.int8),
+        'price': start_price[rows, cols],
+        'value': np.abs(traded[rows, cols]),
+        'fee': cost_rate * np.abs(traded[rows, cols]),
+    }
+    trades['units'] = trades['value'] / trades['price']
+
+    return {
+        'units': units,
+        'positions': positions,
+        'cash': cash,
+        'total': total,
+        'weights': weights,
+        'trades': trades,
+    }
+
+
+def backtest_portfolio(close, signal, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001,
+                       allocation='equal', max_weight=1.0):
+    weights = target_weights(signal, allocation, max_weight)
+    result = simulate_portfolio(close, weights, initial_capital, fee_ratio, slippage_ratio)
+
+    portfolio = pd.DataFrame(index=close.index)
+    portfolio['cash'] = result['cash']
+    portfolio['total'] = result['total']
+    portfolio['returns'] = portfolio['total'].pct_change()
+    positions = pd.DataFrame(result['positions'], index=close.index, columns=close.columns)
+
+    trades = result['trades']
+    trades = pd.DataFrame({
+        'timestamp': close.index.to_numpy()[trades['bar']],
+        'symbol': close.columns.to_numpy()[trades['asset']],
+        'type': np.where(trades['side'] > 0, 'BUY', 'SELL'),
+        'price': trades['price'],
+        'units': trades['units'],
+        'value': trades['value'],
+        'fee': trades['fee'],
+    })
+
+    return portfolio, positions, trades
@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import pandas as pd
+
+
+# 실행 단계별 경과 시간 / 처리 행 수 / 최대 추가 메모리 기록
+# lap(name)을 부르면 직전 lap(또는 생성) 이후 구간을 name 단계로 기록하므로 코드 사이에 한 줄씩 넣어 사용
+# memory=True이면 tracemalloc으로 단계별 최대 할당량을 함께 측정 (할당이 많은 단계는 느려짐,
+# tracemalloc은 프로세스 전체 기준이라 다른 세션이 동시에 실행 중이면 그 할당도 포함됨)
+class StageTimer:
+    def __init__(self, memory=False, **context):
+        self.memory = memory
+        self.context = context
+        self.created_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.records = []
+        # 실행 전체의 최대 추가 메모리 (생성 시점 대비, memory=True일 때만)
+        self.peak_bytes = 0
+        self._started_tracing = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if memory:
+            self._origin = tracemalloc.get_traced_memory()[0]
+        self._reset()
+
+    def _reset(self):
+        if self.memory:
+            self._base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+
+    def lap(self, name, rows=None):
+        record = {'stage': name, 'seconds': time.perf_counter() - self._start, 'rows': rows}
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            record['peak_bytes'] = max(0, peak - self._base)
+            self.peak_bytes = max(self.peak_bytes, peak - self._origin)
+        self.records.append(record)
+        self._reset()
+        return record
+
+    def close(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @property
+    def total(self):
+        return sum(record['seconds'] for record in self.records)
+
+    def frame(self):
+        table = pd.DataFrame(self.records, columns=['stage', 'seconds', 'rows', 'peak_bytes'])
+        table[['rows', 'peak_bytes']] = table[['rows', 'peak_bytes']].astype(float)
+        table['share'] = table['seconds'] / self.total * 100 if self.total > 0 else 0.0
+        table['rows_per_second'] = table['rows'] / table['seconds']
+        table['peak_mb'] = table['peak_bytes'] / 1024 ** 2
+        return table.drop(columns='peak_bytes').set_index('stage')
+
+    # 단계마다 한 줄씩, 실행 정보(코인/전략 등)를 붙인 JSON Lines
+    def to_jsonl(self):
+        lines = []
+        for record in self.records:
+            lines.append(json.dumps({'run_at': self.created_at, **self.context, **record}, ensure_ascii=False))
+        return '\n'.join(lines) + '\n'
+
+    # 배포 환경마다 같은 파일에 누적해 추세를 비교할 수 있도록 이어 쓰기
+    def append_to(self, path):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(self.to_jsonl())
+
+
+# 샘플링 프로파일러: 별도 스레드가 일정 간격으로 측정 대상 스레드의 호출 스택을 기록
+# (함수 호출마다 개입하지 않으므로 측정 대상은 거의 느려지지 않음)
+class SamplingProfiler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    # 함수별 표본 비율: 자체(스택 맨 위) / 누적(스택 어딘가에 포함)
+    def top(self, limit=30):
+        own, cumulative = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            if stack:
+                own[stack[-1]] += count
+            for function in set(stack):
+                cumulative[function] += count
+        table = pd.DataFrame({'self_percent': pd.Series(own, dtype=float),
+                              'cumulative_percent': pd.Series(cumulative, dtype=float)}).fillna(0)
+        table = table * 100 / max(self.samples, 1)
+        table.index.name = 'function'
+        return table.sort_values(['self_percent', 'cumulative_percent'], ascending=False).head(limit)
+
+    # flamegraph 도구(speedscope, flamegraph.pl 등)에서 읽는 접힌 스택 형식
+    def folded(self):
+        return '\n'.join(f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()) + '\n'
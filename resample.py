@@ -0,0 +1,47 @@
+import numpy as np
+
+from data import parse_timeframe
+
+# 시간 프레임 집계: 저장된 가장 세밀한 캔들로 더 큰 시간 프레임 캔들을 로컬에서 만들기
+# 봉 시작 시각은 거래소와 같이 UTC epoch 기준 (주봉은 월요일 00:00 시작)
+ORIGINS = {'w': 4 * 24 * 60 * 60 * 1000}
+# 길이가 일정하지 않은 단위 (집계하지 않고 거래소에서 직접 받음)
+CALENDAR_UNITS = ('M', 'y')
+
+
+# target 캔들을 base 캔들로 만들 수 있는지 (target 길이가 base 길이의 정수 배이고 봉 경계가 맞을 때)
+def divides(base, target):
+    if base[-1] in CALENDAR_UNITS or target[-1] in CALENDAR_UNITS:
+        return base == target
+    base_seconds, target_seconds = parse_timeframe(base), parse_timeframe(target)
+    if target_seconds % base_seconds:
+        return False
+    # 주봉 경계(월요일)는 일 단위 이하 캔들의 경계와 항상 맞지만, 그 반대는 아님
+    return ORIGINS.get(target[-1], 0) % (base_seconds * 1000) == 0
+
+
+# 타임스탬프(밀리초)가 속한 timeframe 봉의 시작 시각
+def bucket_start(timestamps, timeframe):
+    step = parse_timeframe(timeframe) * 1000
+    origin = ORIGINS.get(timeframe[-1], 0)
+    return timestamps - (timestamps - origin) % step
+
+
+# 열별 OHLCV 배열을 timeframe 캔들로 집계 (반복문 없이 봉 경계 위치에서 reduceat으로 한 번에 계산)
+# 시가: 봉의 첫 캔들, 고가/저가: 최대/최소, 종가: 마지막 캔들, 거래량: 합
+# 빠진 캔들이 있는 봉은 있는 캔들로만 만들고, 캔들이 하나도 없는 봉은 만들지 않음 (거래소 캔들과 같음)
+def resample_columns(columns, timeframe):
+    timestamps = np.asarray(columns['timestamp'], dtype=np.int64)
+    if len(timestamps) == 0:
+        return {name: np.asarray(column)[:0].copy() for name, column in columns.items()}
+    buckets = bucket_start(timestamps, timeframe)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(timestamps)) - 1
+    return {
+        'timestamp': buckets[starts],
+        'open': np.asarray(columns['open'])[starts],
+        'high': np.maximum.reduceat(np.asarray(columns['high']), starts),
+        'low': np.minimum.reduceat(np.asarray(columns['low']), starts),
+        'close': np.asarray(columns['close'])[ends],
+        'volume': np.add.reduceat(np.asarray(columns['volume']), starts),
+    }
@@ -0,0 +1,158 @@
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from cache_manager import CacheStats
+from store import atomic_write
+
+# 결과 캐시 파일 형식이 바뀌면 올려서 이전 파일을 무시
+FORMAT_VERSION = 1
+
+
+class ResultStats(CacheStats):
+    FIELDS = ['hits', 'misses', 'bytes_read', 'bytes_written', 'evictions', 'bytes_evicted']
+
+
+# 캔들 데이터 전체의 지문 (타임스탬프와 OHLC가 하나라도 다르면 다른 값)
+def data_fingerprint(df):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(df.index.asi8).tobytes())
+    for name in ('open', 'high', 'low', 'close'):
+        if name in df:
+            digest.update(np.ascontiguousarray(df[name].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+# 백테스팅 결과 키: 데이터 지문 + 전략/파라미터/비용 설정 (extra: 손절/익절 등 결과에 영향을 주는 나머지 설정)
+def result_key(df, strategy, params, initial_capital, fee_ratio, slippage_ratio, **extra):
+    settings = {
+        'version': FORMAT_VERSION,
+        'data': data_fingerprint(df),
+        'strategy': strategy,
+        'params': params,
+        'initial_capital': float(initial_capital),
+        'fee_ratio': float(fee_ratio),
+        'slippage_ratio': float(slippage_ratio),
+        **extra,
+    }
+    text = json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+# DataFrame -> 열별 배열 (문자열은 고정 길이 유니코드, 날짜는 int64 나노초)
+def _pack(arrays, name, frame, with_index=True):
+    columns, dates = [], []
+    for column in frame.columns:
+        values = frame[column].to_numpy()
+        if pd.api.types.is_datetime64_any_dtype(frame[column]):
+            values = frame[column].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            dates.append(column)
+        elif values.dtype == object:
+            values = values.astype(str)
+        arrays[f'{name}.{column}'] = values
+        columns.append(column)
+    if with_index:
+        arrays[f'{name}.__index__'] = frame.index.asi8
+    return {'columns': columns, 'dates': dates, 'index': [frame.index.name] if with_index else None}
+
+
+def _unpack(data, name, layout):
+    frame = pd.DataFrame({
+        column: data[f'{name}.{column}'].view('datetime64[ns]') if column in layout['dates'] else data[f'{name}.{column}']
+        for column in layout['columns']
+    }, columns=layout['columns'])
+    if layout['index']:
+        frame.index = pd.DatetimeIndex(data[f'{name}.__index__'].view('datetime64[ns]'), name=layout['index'][0])
+    return frame
+
+
+# 백테스팅 결과(신호, 자산 곡선, 거래 기록, 성과 지표) 디스크 캐시
+# - 키는 데이터와 설정 전체의 해시이므로 같은 설정을 다시 실행하면 세션/프로세스가 달라도 계산 없이 재사용
+# - 결과마다 .npz 파일 하나 (열별 배열 + 성과 지표 JSON, pickle 없이 저장)
+# - 임시 파일 교체로 저장하므로 여러 프로세스가 동시에 읽고 써도 안전
+# - 용량 상한을 넘으면 가장 오래 사용하지 않은 결과부터 삭제 (읽을 때 수정 시각 갱신)
+class ResultCache:
+    def __init__(self, root='cache/results', max_bytes=128 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.stats = ResultStats()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.npz")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['__meta__']))
+                frames = {name: _unpack(data, name, layout) for name, layout in meta['frames'].items()}
+            os.utime(path)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            self.stats.add(misses=1)
+            return None
+
+        metrics = meta['metrics']
+        if 'monthly_returns' in frames:
+            monthly = frames.pop('monthly_returns')
+            metrics['monthly_returns'] = pd.Series(monthly['value'].to_numpy(), index=monthly.index)
+        self.stats.add(hits=1, bytes_read=os.path.getsize(path))
+        return frames, metrics
+
+    # frames: 이름 -> DataFrame (거래 기록처럼 인덱스가 필요 없는 표는 이름을 no_index에 지정)
+    def put(self, key, frames, metrics, no_index=('trades',)):
+        arrays, layouts = {}, {}
+        for name, frame in frames.items():
+            layouts[name] = _pack(arrays, name, frame, name not in no_index)
+        scalars = {}
+        for name, value in metrics.items():
+            if isinstance(value, pd.Series):
+                layouts[name] = _pack(arrays, name, value.to_frame('value'))
+            else:
+                scalars[name] = value.item() if isinstance(value, np.generic) else value
+        arrays['__meta__'] = np.array(json.dumps({'frames': layouts, 'metrics': scalars}))
+
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, buffer.getvalue())
+        self.stats.add(bytes_written=buffer.tell())
+        self.evict(keep=path)
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.npz'):
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        info = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((info.st_mtime, info.st_size, path))
+        return entries
+
+    def usage(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep=None):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats.add(evictions=1, bytes_evicted=size)
@@ -0,0 +1,217 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from cache_manager import CacheStats
+from data import OHLCV_COLUMNS, PAGE_LIMIT, fetch_range, timeframe_ms, to_columns
+
+# 우선순위 (값이 작을수록 먼저 처리): 화면에서 기다리는 요청 > 미리 받아 두는 요청
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# 거래소별 공개 API 허용 속도 (초당 요청 수, 한 번에 몰아서 보낼 수 있는 요청 수)
+# 목록에 없으면 ccxt의 rateLimit(요청 간 최소 간격, 밀리초)으로 계산
+RATE_LIMITS = {
+    'binance': (20, 40),
+    'binanceus': (10, 20),
+    'upbit': (10, 10),
+    'kraken': (1, 15),
+    'kucoin': (10, 30),
+}
+
+# 다시 시도할 오류 (ccxt를 가져오지 않도록 클래스 이름으로 판별)
+RETRYABLE_ERRORS = {'NetworkError', 'RequestTimeout', 'DDoSProtection', 'RateLimitExceeded',
+                    'ExchangeNotAvailable', 'ConnectionError', 'TimeoutError'}
+# 요청 제한 오류는 모든 요청을 잠시 멈춤
+RATE_LIMIT_ERRORS = {'DDoSProtection', 'RateLimitExceeded'}
+
+
+def _error_names(error):
+    return {cls.__name__ for cls in type(error).__mro__}
+
+
+class FetchStats(CacheStats):
+    FIELDS = ['requests', 'retries', 'failures', 'rate_limited']
+
+
+# 토큰 버킷: 초당 rate개씩 채워지고 최대 burst개까지 쌓임, 요청마다 하나씩 사용
+# 기다리는 요청이 여럿이면 우선순위가 높은(값이 작은) 요청부터, 같으면 먼저 온 요청부터 받음
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority=INTERACTIVE):
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiting[0] != ticket:
+                        # 앞 순서가 토큰을 받거나 포기하면 깨움
+                        self._cond.wait()
+                    elif now < self.blocked_until:
+                        self._cond.wait(self.blocked_until - now)
+                    elif self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    else:
+                        self._cond.wait((1 - self.tokens) / self.rate)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    # 기다리지 않고 토큰을 받을 수 있으면 사용 (가상 거래소의 서버 쪽 제한에 사용)
+    def try_acquire(self):
+        with self._cond:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    # 요청 제한에 걸리면 남은 토큰을 버리고 seconds 동안 모든 요청을 멈춤
+    def penalize(self, seconds):
+        with self._cond:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+
+# 스케줄러를 거쳐 요청 속도를 지키는 거래소 객체 (fetch_ohlcv 외의 속성은 원래 거래소 객체 그대로)
+class PacedExchange:
+    def __init__(self, scheduler, priority):
+        self._scheduler = scheduler
+        self._priority = priority
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        self._scheduler.bucket.acquire(self._priority)
+        self._scheduler.stats.add(requests=1)
+        return self._scheduler.exchange.fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+    def __getattr__(self, name):
+        return getattr(self._scheduler.exchange, name)
+
+
+# 거래소 하나에 대한 요청 스케줄러
+# - 토큰 버킷으로 거래소 허용 속도를 지키면서 workers개의 요청을 동시에 보냄
+# - 네트워크 오류/요청 제한은 지수 백오프(무작위 지연 포함)로 retries번까지 다시 시도
+# - 작업과 토큰 모두 우선순위 순으로 처리 (화면 요청이 미리 받기 작업보다 먼저)
+# ccxt 자체 대기(enableRateLimit)는 요청을 한 줄로 세우므로 끈 거래소 객체를 넘김 (exchanges.unthrottled)
+class FetchScheduler:
+    def __init__(self, exchange, rate=None, burst=None, workers=4, retries=3, backoff=0.5):
+        default_rate, default_burst = RATE_LIMITS.get(
+            exchange.id, (1000 / (getattr(exchange, 'rateLimit', None) or 1000), None))
+        self.exchange = exchange
+        self.bucket = TokenBucket(rate or default_rate, burst or default_burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.stats = FetchStats()
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    # fn(거래소)를 작업으로 등록하고 Future 반환 - fn이 받는 거래소 객체는 작업 우선순위로 속도 제한을 받음
+    def submit(self, fn, priority=BACKGROUND):
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("스케줄러가 종료되었습니다.")
+            heapq.heappush(self._queue, (priority, next(self._seq), future, fn))
+            self._cond.notify()
+        return future
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                priority, _, future, fn = heapq.heappop(self._queue)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._run(fn, priority))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _run(self, fn, priority):
+        exchange = PacedExchange(self, priority)
+        for attempt in itertools.count():
+            try:
+                return fn(exchange)
+            except Exception as e:
+                names = _error_names(e)
+                if attempt >= self.retries or not names & RETRYABLE_ERRORS:
+                    self.stats.add(failures=1)
+                    raise
+                delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+                if names & RATE_LIMIT_ERRORS:
+                    self.stats.add(rate_limited=1)
+                    self.bucket.penalize(delay)
+                self.stats.add(retries=1)
+                time.sleep(delay)
+
+    # 캔들 한 페이지
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None, priority=INTERACTIVE):
+        return self.submit(lambda exchange: exchange.fetch_ohlcv(symbol, timeframe, since, limit), priority)
+
+    # data.fetch_range와 같은 결과를 페이지 구간별 작업으로 나누어 동시에 가져옴
+    # (거래소가 limit보다 적게 주면 해당 구간 작업 안에서 이어서 요청)
+    def fetch_range(self, symbol, timeframe, since, until=None, limit=PAGE_LIMIT, priority=INTERACTIVE):
+        step = timeframe_ms(self.exchange, timeframe)
+        until = until if until is not None else self.exchange.milliseconds()
+        bounds = list(range(since, until, step * limit)) + [until]
+        futures = [
+            self.submit(lambda exchange, lo=lo, hi=hi: fetch_range(exchange, symbol, timeframe, lo, hi, limit), priority)
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        ]
+        try:
+            pages = [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+        if not pages:
+            return to_columns([])
+        return {name: np.concatenate([page[name] for page in pages]) for name in OHLCV_COLUMNS}
+
+    # CacheManager.load(fetch=)에 넘기는 구간 수집 함수
+    def range_fetcher(self, priority=INTERACTIVE):
+        return lambda symbol, timeframe, since, until: self.fetch_range(symbol, timeframe, since, until,
+                                                                         priority=priority)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,77 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from sweep import RESULT_COLUMNS, run_params
+
+# 스크리너: 같은 전략/파라미터를 거래소의 여러 코인에 적용해 결과를 순위로 비교
+# - 데이터: load(symbol)이 돌려주는 Future (예: 요청 스케줄러 작업으로 캐시를 거쳐 가져오기)
+# - 계산: 데이터가 준비된 코인부터 프로세스 풀에서 백테스팅 (CPU가 하나면 현재 프로세스에서 계산)
+# - 결과: 끝난 코인부터 한 행씩 반환하고, 코인 하나가 실패해도 나머지는 계속 진행
+SCREEN_COLUMNS = ['symbol', *RESULT_COLUMNS, 'buy_and_hold', 'bars', 'error']
+
+
+# 코인 하나의 결과 행 (보유 전략 수익률과 같은 기간 단순 보유 수익률 비교)
+def screen_symbol(symbol, df, strategy, params, initial_capital, fee_ratio, slippage_ratio, periods=None):
+    if len(df) < 2:
+        raise ValueError(f"캔들이 부족합니다 ({len(df)}개)")
+    row = dict(zip(RESULT_COLUMNS, run_params(df, strategy, params, initial_capital, fee_ratio, slippage_ratio,
+                                              periods)))
+    close = df['close'].to_numpy()
+    row.update(symbol=symbol, buy_and_hold=(close[-1] / close[0] - 1) * 100, bars=len(df), error=None)
+    return row
+
+
+def _failure(symbol, error):
+    return {'symbol': symbol, 'error': f"{type(error).__name__}: {error}"}
+
+
+# symbols 전체를 스크리닝하며 끝난 순서대로 결과 행(dict) 반환 - 실패한 코인은 error에 오류 메시지
+# 반복을 중간에 멈추면 아직 시작하지 않은 데이터 요청과 계산은 취소
+def screen(symbols, load, strategy, params, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001,
+           periods=None, workers=None):
+    workers = workers or os.cpu_count() or 1
+    args = (strategy, params, initial_capital, fee_ratio, slippage_ratio, periods)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) if workers > 1 else None
+    loads, runs = {}, {}
+    try:
+        for symbol in symbols:
+            try:
+                loads[load(symbol)] = symbol
+            except Exception as e:
+                yield _failure(symbol, e)
+
+        while loads or runs:
+            done, _ = wait([*loads, *runs], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in loads:
+                    symbol = loads.pop(future)
+                    try:
+                        df = future.result()
+                        if pool is None:
+                            yield screen_symbol(symbol, df, *args)
+                        else:
+                            runs[pool.submit(screen_symbol, symbol, df, *args)] = symbol
+                    except Exception as e:
+                        yield _failure(symbol, e)
+                else:
+                    symbol = runs.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield _failure(symbol, e)
+    finally:
+        for future in [*loads, *runs]:
+            future.cancel()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# 성공한 결과 행 -> metric 내림차순 순위표 (순위는 1부터)
+def rank(rows, metric='total_return'):
+    table = pd.DataFrame(rows, columns=SCREEN_COLUMNS).drop(columns='error')
+    table = table.sort_values(metric, ascending=False, ignore_index=True)
+    table.index += 1
+    return table
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# 청산 사유 (거래 기록 reason 열)
+SIGNAL = 0
+STOP_LOSS = 1
+TAKE_PROFIT = 2
+TRAILING_STOP = 3
+# 구간 끝 강제 청산 (워크포워드 fold 경계)
+PERIOD_END = 4
+REASONS = ['signal', 'stop_loss', 'take_profit', 'trailing_stop', 'period_end']
+
+
+# 손절/익절 판정에 쓸 캔들 목록: (봉 번호, 시가, 고가, 저가) - 시간순
+# intrabar(하위 시간 프레임 캔들)가 있으면 각 봉을 그 캔들들로 나누어 봉 안에서 먼저 닿은 가격을 찾고,
+# 하위 캔들이 없는 봉은 해당 봉의 시가/고가/저가 한 개로 판정
+def intrabar_candles(ohlc, intrabar=None):
+    n = len(ohlc)
+    bars = np.arange(n)
+    columns = [ohlc[name].to_numpy(dtype=np.float64) for name in ('open', 'high', 'low')]
+    if intrabar is None or len(intrabar) == 0 or n == 0:
+        return (bars, *columns)
+
+    coarse = ohlc.index.asi8
+    fine = intrabar.index.asi8
+    step = np.median(np.diff(coarse)) if n > 1 else fine[-1] - coarse[0] + 1
+    fine_bars = np.searchsorted(coarse, fine, side='right') - 1
+    # 첫 봉 이전과 마지막 봉이 끝난 뒤의 하위 캔들은 제외
+    valid = (fine_bars >= 0) & (fine < coarse[np.maximum(fine_bars, 0)] + step)
+    fine_bars = fine_bars[valid]
+    covered = np.zeros(n, dtype=bool)
+    covered[fine_bars] = True
+    missing = np.flatnonzero(~covered)
+
+    # 하위 캔들은 이미 시간순이므로 봉 번호 기준 안정 정렬로 대체 캔들만 제자리에 끼워 넣음
+    order = np.argsort(np.concatenate((fine_bars, missing)), kind='stable')
+    merged = [np.concatenate((fine_bars, missing))[order]]
+    for name, column in zip(('open', 'high', 'low'), columns):
+        merged.append(np.concatenate((intrabar[name].to_numpy(dtype=np.float64)[valid], column[missing]))[order])
+    return tuple(merged)
+
+
+# 거래마다 손절/익절/추적 손절 가격에 처음 닿은 캔들 찾기 (반복문 없이 전체 캔들을 한 번에 판정)
+# candles: intrabar_candles 결과, buys: 매수 봉, ends: 신호 청산 봉 (보유 중이면 마지막 봉), entry_price: 체결가
+# stop_loss/take_profit/trailing_stop: 체결가(추적 손절은 진입 후 최고가) 대비 비율, None이면 사용하지 않음
+# 매수 봉은 종가에 진입하므로 다음 봉부터, 신호 청산 봉은 종가 전에 닿으면 손절/익절이 먼저 체결
+# 반환값: (청산 봉 - 닿지 않았으면 -1, 청산 가격, 청산 사유)
+def stop_exits(candles, buys, ends, entry_price, stop_loss=None, take_profit=None, trailing_stop=None):
+    trips = len(buys)
+    exit_bar = np.full(trips, -1, dtype=np.int64)
+    exit_price = np.full(trips, np.nan)
+    reason = np.zeros(trips, dtype=np.int8)
+    if trips == 0 or not (stop_loss or take_profit or trailing_stop):
+        return exit_bar, exit_price, reason
+
+    bars, open_, high, low = candles
+    trip = np.searchsorted(buys, bars, side='left') - 1
+    active = trip >= 0
+    active[active] = bars[active] <= ends[trip[active]]
+    keep = np.flatnonzero(active)
+    trip, bars, open_, high, low = trip[keep], bars[keep], open_[keep], high[keep], low[keep]
+    entry = entry_price[trip]
+
+    stop_level = entry * (1 - stop_loss) if stop_loss else np.full(len(keep), -np.inf)
+    trailing = np.zeros(len(keep), dtype=bool)
+    if trailing_stop:
+        # 직전 캔들까지의 최고가 기준 (같은 캔들 안에서 고가와 저가의 순서는 알 수 없으므로 현재 캔들 고가 제외)
+        running = pd.Series(high).groupby(trip).cummax().to_numpy()
+        previous = np.concatenate(([-np.inf], running[:-1]))
+        previous[np.concatenate(([True], trip[1:] != trip[:-1]))] = -np.inf
+        trail_level = np.maximum(previous, entry) * (1 - trailing_stop)
+        trailing = trail_level > stop_level
+        stop_level = np.maximum(stop_level, trail_level)
+    tp_level = entry * (1 + take_profit) if take_profit else np.full(len(keep), np.inf)
+
+    hit_stop = low <= stop_level
+    hit_tp = high >= tp_level
+    # 한 캔들 안에서 둘 다 닿으면 손절을 먼저 체결 (시가가 이미 익절 가격 이상이면 익절)
+    take = hit_tp & (~hit_stop | (open_ >= tp_level))
+    hits = np.flatnonzero(hit_stop | hit_tp)
+    hit_trips, first = np.unique(trip[hits], return_index=True)
+    at = hits[first]
+
+    exit_bar[hit_trips] = bars[at]
+    # 시가가 이미 기준 가격을 넘어서 시작하면 시가에 체결
+    exit_price[hit_trips] = np.where(take[at], np.maximum(open_[at], tp_level[at]),
+                                     np.minimum(open_[at], stop_level[at]))
+    reason[hit_trips] = np.where(take[at], TAKE_PROFIT, np.where(trailing[at], TRAILING_STOP, STOP_LOSS))
+    return exit_bar, exit_price, reason
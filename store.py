@@ -0,0 +1,249 @@
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 잠금 없이 동작
+    fcntl = None
+
+# 열별 바이너리 파일 (timestamp: 밀리초 epoch)
+COLUMNS = [
+    ('timestamp', np.dtype('<i8')),
+    ('open', np.dtype('<f8')),
+    ('high', np.dtype('<f8')),
+    ('low', np.dtype('<f8')),
+    ('close', np.dtype('<f8')),
+    ('volume', np.dtype('<f8')),
+]
+
+
+# 같은 시계열을 여러 세션/프로세스가 동시에 쓰지 않도록 파일 잠금 (읽기는 공유 잠금)
+@contextmanager
+def file_lock(path, shared=False, blocking=True):
+    if fcntl is None:
+        yield True
+        return
+    with open(path, 'a') as f:
+        mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        try:
+            fcntl.flock(f, mode if blocking else mode | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# 임시 파일에 쓴 뒤 교체 (이미 메모리 맵으로 열린 기존 파일은 그대로 유효)
+def atomic_write(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# 열별 배열 -> 타임스탬프 인덱스 OHLCV DataFrame (복사 없이)
+def columns_frame(columns):
+    columns = dict(columns)
+    index = pd.DatetimeIndex(pd.to_datetime(columns.pop('timestamp'), unit='ms'), name='timestamp')
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+# 거래소/코인/시간 프레임 하나의 캔들 시계열 (열마다 메모리 맵 파일 하나)
+# manifest.json에 현재 세대와 길이를 기록하고 열 파일을 다 쓴 뒤 마지막에 교체하므로,
+# 쓰기 도중 중단되어도 읽는 쪽은 항상 한 세대의 같은 길이 열들만 봄
+# - 끝에 추가: 현재 세대 파일 뒤에 쓰고 manifest의 길이를 늘림
+# - 병합: 모든 열을 다음 세대 파일로 새로 쓰고 manifest를 다음 세대로 바꾼 뒤 이전 세대 파일 삭제
+class CandleSeries:
+    def __init__(self, path):
+        self.path = path
+
+    # 0세대는 manifest 도입 이전 파일 이름 (<열>.bin)
+    def _file(self, name, generation=0):
+        return os.path.join(self.path, f"{name}.bin" if generation == 0 else f"{name}.{generation}.bin")
+
+    @contextmanager
+    def lock(self, shared=False, blocking=True):
+        if shared and not os.path.isdir(self.path):
+            yield True
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with file_lock(os.path.join(self.path, '.lock'), shared, blocking) as acquired:
+            yield acquired
+
+    def _manifest(self):
+        try:
+            with open(os.path.join(self.path, 'manifest.json')) as f:
+                manifest = json.load(f)
+            return int(manifest['generation']), int(manifest['length'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, None
+
+    def _write_manifest(self, generation, length):
+        atomic_write(os.path.join(self.path, 'manifest.json'),
+                     json.dumps({'generation': generation, 'length': length}).encode())
+
+    # (세대, 길이) - 열 파일이 manifest 길이보다 짧으면 (파일 손상 등) 가장 짧은 열 기준
+    def _state(self):
+        generation, length = self._manifest()
+        lengths = [] if length is None else [length]
+        for name, dtype in COLUMNS:
+            file = self._file(name, generation)
+            lengths.append(os.path.getsize(file) // dtype.itemsize if os.path.exists(file) else 0)
+        return generation, min(lengths)
+
+    def _length(self):
+        return self._state()[1]
+
+    def _columns(self):
+        generation, n = self._state()
+        if n == 0:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS}
+        return {name: np.memmap(self._file(name, generation), dtype=dtype, mode='r', shape=(n,))
+                for name, dtype in COLUMNS}
+
+    def __len__(self):
+        with self.lock(shared=True):
+            return self._length()
+
+    def columns(self):
+        with self.lock(shared=True):
+            return self._columns()
+
+    @property
+    def first(self):
+        timestamps = self.columns()['timestamp']
+        return int(timestamps[0]) if len(timestamps) else None
+
+    @property
+    def last(self):
+        timestamps = self.columns()['timestamp']
+        return int(timestamps[-1]) if len(timestamps) else None
+
+    # [start, end) 구간을 타임스탬프 이진 탐색으로 찾아 복사 없이 슬라이스
+    def read(self, start=None, end=None):
+        columns = self.columns()
+        timestamps = columns['timestamp']
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def frame(self, start=None, end=None):
+        return columns_frame(self.read(start, end))
+
+    # 새 캔들 저장: 기존 마지막 캔들 이후만 있으면 파일 끝에 추가, 겹치면 병합 후 교체
+    def write(self, columns):
+        timestamps = np.asarray(columns['timestamp'], dtype=np.int64)
+        if len(timestamps) == 0:
+            return 0
+        order = np.argsort(timestamps, kind='stable')
+        new = {name: np.asarray(columns[name], dtype=dtype)[order] for name, dtype in COLUMNS}
+        # 같은 타임스탬프가 여러 번 들어오면 마지막 값 사용
+        keep = np.append(new['timestamp'][1:] != new['timestamp'][:-1], True)
+        new = {name: column[keep] for name, column in new.items()}
+
+        with self.lock():
+            generation, n = self._state()
+            last = int(self._columns()['timestamp'][-1]) if n else None
+            if last is not None and new['timestamp'][0] <= last:
+                merged = self._merge(new)
+                for name, _ in COLUMNS:
+                    atomic_write(self._file(name, generation + 1), merged[name].tobytes())
+                self._write_manifest(generation + 1, len(merged['timestamp']))
+                self._remove_stale(generation + 1)
+            else:
+                for name, dtype in COLUMNS:
+                    with open(self._file(name, generation), 'ab') as f:
+                        f.truncate(n * dtype.itemsize)
+                        f.write(new[name].tobytes())
+                self._write_manifest(generation, n + len(new['timestamp']))
+        return sum(column.nbytes for column in new.values())
+
+    # 현재 세대가 아닌 열 파일 삭제 (이미 메모리 맵으로 열린 파일은 닫을 때까지 유효)
+    def _remove_stale(self, generation):
+        current = {os.path.basename(self._file(name, generation)) for name, _ in COLUMNS}
+        for filename in os.listdir(self.path):
+            if filename.endswith('.bin') and filename not in current:
+                try:
+                    os.remove(os.path.join(self.path, filename))
+                except OSError:
+                    pass
+
+    def _merge(self, new):
+        old = {name: np.array(column) for name, column in self._columns().items()}
+        timestamps = np.concatenate((old['timestamp'], new['timestamp']))
+        # 기존 값보다 새로 들어온 값을 우선
+        order = np.lexsort((np.concatenate((np.zeros(len(old['timestamp'])), np.ones(len(new['timestamp'])))), timestamps))
+        merged = {name: np.concatenate((old[name], new[name]))[order] for name, _ in COLUMNS}
+        keep = np.append(merged['timestamp'][1:] != merged['timestamp'][:-1], True)
+        return {name: column[keep] for name, column in merged.items()}
+
+    def nbytes(self):
+        if not os.path.isdir(self.path):
+            return 0
+        return sum(os.path.getsize(os.path.join(self.path, filename)) for filename in os.listdir(self.path)
+                   if filename.endswith('.bin'))
+
+    # 수집 시각, 마지막 사용 시각 등 시계열 메타데이터
+    def meta(self):
+        try:
+            with open(os.path.join(self.path, 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def update_meta(self, **values):
+        os.makedirs(self.path, exist_ok=True)
+        meta = self.meta()
+        meta.update(values)
+        atomic_write(os.path.join(self.path, 'meta.json'), json.dumps(meta).encode())
+
+    def remove(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+# 시계열 디렉토리인지 (manifest 또는 manifest 도입 이전의 열 파일)
+def _is_series(filenames):
+    return 'manifest.json' in filenames or 'timestamp.bin' in filenames
+
+
+# 캔들 저장소: cache/<거래소>/<코인>/<시간 프레임>/ 아래에 시계열 보관
+class CandleStore:
+    def __init__(self, root='cache'):
+        self.root = root
+
+    def _symbol_path(self, exchange_id, symbol):
+        return os.path.join(self.root, exchange_id, symbol.replace('/', '_'))
+
+    def series(self, exchange_id, symbol, timeframe):
+        return CandleSeries(os.path.join(self._symbol_path(exchange_id, symbol), timeframe))
+
+    # 코인 하나에 저장된 시간 프레임 목록
+    def timeframes(self, exchange_id, symbol):
+        path = self._symbol_path(exchange_id, symbol)
+        if not os.path.isdir(path):
+            return []
+        return [name for name in sorted(os.listdir(path))
+                if os.path.isdir(os.path.join(path, name)) and _is_series(os.listdir(os.path.join(path, name)))]
+
+    def all_series(self):
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            if _is_series(filenames):
+                found.append(CandleSeries(dirpath))
+        return found
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from composite import composite_strategy
+from indicators import rolling_mean, rolling_std, average_gain, average_loss, indicator_matrix
+
+# 전략 구현 - MA 교차
+def ma_cross_strategy(df, short_window=20, long_window=50):
+    signals = pd.DataFrame(index=df.index)
+    signals['price'] = df['close']
+    signals['short_ma'] = rolling_mean(df['close'], short_window)
+    signals['long_ma'] = rolling_mean(df['close'], long_window)
+    
+    # 매수 신호: 단기 MA가 장기 MA를 상향 돌파
+    signals['signal'] = 0
+    signals.iloc[short_window:, signals.columns.get_loc('signal')] = np.where(
+        signals['short_ma'][short_window:] > signals['long_ma'][short_window:], 1, 0
+    )
+    
+    # 포지션 변화 감지
+    signals['position'] = signals['signal'].diff()
+    
+    return signals
+
+# 전략 구현 - RSI
+def rsi_strategy(df, rsi_period=14, oversold=30, overbought=70):
+    signals = pd.DataFrame(index=df.index)
+    signals['price'] = df['close']
+    
+    # RSI 계산
+    gain = average_gain(df['close'], rsi_period)
+    loss = average_loss(df['close'], rsi_period)
+    
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    signals['rsi'] = rsi
+    
+    # 매수 신호: RSI가 oversold 아래로 갔다가 다시 올라옴
+    # 매도 신호: RSI가 overbought 위로 갔다가 다시 내려옴
+    signals['signal'] = 0
+    signals['signal'] = np.where(signals['rsi'] < oversold, 1, 0)  # 매수
+    signals['signal'] = np.where(signals['rsi'] > overbought, 0, signals['signal'])  # 매도
+    
+    # 포지션 변화 감지
+    signals['position'] = signals['signal'].diff()
+    
+    return signals
+
+# 전략 구현 - 볼린저 밴드
+def bollinger_bands_strategy(df, window=20, num_std=2):
+    signals = pd.DataFrame(index=df.index)
+    signals['price'] = df['close']
+    
+    # 볼린저 밴드 계산
+    signals['rolling_mean'] = rolling_mean(df['close'], window, full=True)
+    signals['rolling_std'] = rolling_std(df['close'], window)
+    signals['upper_band'] = signals['rolling_mean'] + (signals['rolling_std'] * num_std)
+    signals['lower_band'] = signals['rolling_mean'] - (signals['rolling_std'] * num_std)
+    
+    # 매수 신호: 가격이 하단 밴드 아래로 갔다가 다시 위로
+    # 매도 신호: 가격이 상단 밴드 위로 갔다가 다시 아래로
+    signals['signal'] = 0
+    signals['signal'] = np.where(signals['price'] < signals['lower_band'], 1, 0)  # 매수
+    signals['signal'] = np.where(signals['price'] > signals['upper_band'], 0, signals['signal'])  # 매도
+    
+    # 포지션 변화 감지
+    signals['position'] = signals['signal'].diff()
+    
+    return signals
+
+
+# 전략 이름 -> (전략 함수, 파라미터 이름 목록)
+STRATEGIES = {
+    "MA 교차": (ma_cross_strategy, ['short_window', 'long_window']),
+    "RSI": (rsi_strategy, ['rsi_period', 'oversold', 'overbought']),
+    "볼린저 밴드": (bollinger_bands_strategy, ['window', 'num_std']),
+    # 여러 전략/지표 조건의 조합 (composite.py)
+    "복합 전략": (composite_strategy, ['legs', 'combine', 'min_votes']),
+}
+
+
+# 시간 × 코인 종가 행렬에 적용할 수 있는 전략 (코인별 종가 열 하나로 신호가 정해지는 전략)
+MATRIX_STRATEGIES = ["MA 교차", "RSI", "볼린저 밴드"]
+
+
+# 여러 코인의 종가 행렬(시간 × 코인)에 전략을 한 번에 적용해 0/1 신호 행렬 반환
+# 지표는 indicators.indicator_matrix로 전체 행렬을 열별로 계산하고, 규칙은 위의 전략 함수와 같음
+def signal_matrix(strategy, close, **params):
+    if strategy not in MATRIX_STRATEGIES:
+        raise ValueError(f"포트폴리오 백테스팅에서 지원하지 않는 전략입니다: {strategy}")
+    if strategy == "MA 교차":
+        short_window = params['short_window']
+        short_ma = indicator_matrix(close, 'rolling_mean', short_window)
+        long_ma = indicator_matrix(close, 'rolling_mean', params['long_window'])
+        signal = (short_ma > long_ma).astype(np.int8)
+        signal.iloc[:short_window] = 0
+    elif strategy == "RSI":
+        gain = indicator_matrix(close, 'average_gain', params['rsi_period'])
+        loss = indicator_matrix(close, 'average_loss', params['rsi_period'])
+        rsi = 100 - (100 / (1 + gain / loss))
+        signal = ((rsi < params['oversold']) & ~(rsi > params['overbought'])).astype(np.int8)
+    else:
+        window, num_std = params['window'], params['num_std']
+        mean = indicator_matrix(close, 'rolling_mean', window)
+        mean.iloc[:window - 1] = np.nan
+        std = indicator_matrix(close, 'rolling_std', window)
+        lower_band = mean - std * num_std
+        upper_band = mean + std * num_std
+        signal = ((close < lower_band) & ~(close > upper_band)).astype(np.int8)
+    return signal
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+
+from engine import TradeLedger, SELL, simulate
+from indicators import IndicatorStream
+
+# 전략별로 누적 계산할 지표: 전략 이름 -> 파라미터로 (열 이름, 지표, 기간) 목록 생성
+STREAM_INDICATORS = {
+    "MA 교차": lambda p: [('short_ma', 'rolling_mean', p['short_window']),
+                          ('long_ma', 'rolling_mean', p['long_window'])],
+    "RSI": lambda p: [('gain', 'average_gain', p['rsi_period']),
+                      ('loss', 'average_loss', p['rsi_period'])],
+    "볼린저 밴드": lambda p: [('rolling_mean', 'rolling_mean', p['window']),
+                            ('rolling_std', 'rolling_std', p['window'])],
+}
+
+
+# 용량이 부족하면 2배로 늘리는 1차원 배열
+class _Buffer:
+    def __init__(self, dtype=np.float64, capacity=1024):
+        self.size = 0
+        self._data = np.empty(capacity, dtype=dtype)
+
+    @property
+    def values(self):
+        return self._data[:self.size]
+
+    def extend(self, values):
+        count = len(values)
+        if self.size + count > len(self._data):
+            grown = np.empty(max(self.size + count, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:self.size + count] = values
+        self.size += count
+
+
+# 캔들이 계속 추가되는 실시간 백테스팅
+# 보유 상태(현금, 수량, 미청산 매수)와 지표 누적 상태를 유지하고, 새 캔들 구간만 계산해 포트폴리오와 거래 기록에 이어 붙인다.
+# 같은 캔들로 한 번에 backtest()를 돌린 결과와 값이 같다.
+class StreamingBacktest:
+    def __init__(self, strategy, params, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001):
+        self.strategy = strategy
+        self.params = dict(params)
+        self.initial_capital = initial_capital
+        self.fee_ratio = fee_ratio
+        self.slippage_ratio = slippage_ratio
+
+        self.indicators = {column: IndicatorStream(name, window)
+                           for column, name, window in STREAM_INDICATORS[strategy](self.params)}
+        self.timestamps = _Buffer(np.int64)
+        self.price = _Buffer()
+        self.signal = _Buffer(np.int8)
+        self.positions = _Buffer()
+        self.cash = _Buffer()
+        self.total = _Buffer()
+        self.ledger = TradeLedger()
+
+        # 엔진 상태: 직전 신호, 다음 매수에 쓸 현금(보유 중이면 매수 직전 현금), 보유 수량
+        self.prev_signal = None
+        self.capital = float(initial_capital)
+        self.units = 0.0
+
+    def __len__(self):
+        return self.price.size
+
+    @property
+    def last_timestamp(self):
+        return int(self.timestamps.values[-1]) if len(self) else None
+
+    # 지표 값으로 [lo, hi) 구간의 신호 및 차트용 열 계산 (전략 함수와 같은 식)
+    def _columns(self, lo, hi):
+        values = {column: stream.values[lo:hi] for column, stream in self.indicators.items()}
+        price = self.price.values[lo:hi]
+        p = self.params
+        if self.strategy == "MA 교차":
+            signal = np.where(values['short_ma'] > values['long_ma'], 1, 0)
+            signal[:max(0, p['short_window'] - lo)] = 0
+            return {'short_ma': values['short_ma'], 'long_ma': values['long_ma'], 'signal': signal}
+        if self.strategy == "RSI":
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rs = values['gain'] / values['loss']
+            rsi = 100 - (100 / (1 + rs))
+            signal = np.where(rsi < p['oversold'], 1, 0)
+            signal = np.where(rsi > p['overbought'], 0, signal)
+            return {'rsi': rsi, 'signal': signal}
+        # 볼린저 밴드: 기간을 다 채운 구간만 사용
+        rolling_mean = values['rolling_mean'].copy()
+        rolling_mean[:max(0, p['window'] - 1 - lo)] = np.nan
+        upper_band = rolling_mean + (values['rolling_std'] * p['num_std'])
+        lower_band = rolling_mean - (values['rolling_std'] * p['num_std'])
+        signal = np.where(price < lower_band, 1, 0)
+        signal = np.where(price > upper_band, 0, signal)
+        return {'rolling_mean': rolling_mean, 'rolling_std': values['rolling_std'],
+                'upper_band': upper_band, 'lower_band': lower_band, 'signal': signal}
+
+    # 새 캔들 반영: 마지막으로 처리한 캔들 이후만 사용 (df는 마감된 캔들만 포함해야 함)
+    # 반환값: 새로 처리한 캔들 수
+    def update(self, df):
+        timestamps = df.index.asi8 if isinstance(df.index, pd.DatetimeIndex) else np.asarray(df.index, dtype=np.int64)
+        start = 0 if self.last_timestamp is None else int(np.searchsorted(timestamps, self.last_timestamp, side='right'))
+        if start >= len(timestamps):
+            return 0
+        lo = len(self)
+        self.timestamps.extend(timestamps[start:])
+        self.price.extend(df['close'].to_numpy(dtype=np.float64)[start:])
+        hi = len(self)
+
+        for stream in self.indicators.values():
+            stream.update(self.price.values)
+        signal = self._columns(lo, hi)['signal']
+        self.signal.extend(signal)
+        self._advance(self.price.values[lo:hi], signal, lo)
+        return hi - lo
+
+    # 새 구간의 포트폴리오/거래 계산 (보유 중에 시작하면 첫 매도까지만 직접 계산하고 나머지는 엔진에 맡김)
+    def _advance(self, price, signal, offset):
+        positions = np.zeros(len(price))
+        cash = np.zeros(len(price))
+        split = 0
+        if self.units > 0:
+            exits = np.flatnonzero(np.diff(signal, prepend=self.prev_signal) < 0)
+            split = exits[0] if len(exits) else len(price)
+            positions[:split] = self.units * price[:split]
+            if split < len(price):
+                self._sell(price[split], offset + split)
+            self.prev_signal = 0
+
+        if split < len(price):
+            result = simulate(price[split:], signal[split:], self.capital, self.fee_ratio, self.slippage_ratio,
+                              prev_signal=self.prev_signal, offset=offset + split)
+            positions[split:] = result['positions']
+            cash[split:] = result['cash']
+            self.capital = float(result['capital'])
+            self.units = float(result['units'][-1])
+            ledger = result['ledger']
+            self.ledger.extend(**{name: ledger.column(name) for name in ledger.columns})
+
+        self.prev_signal = int(signal[-1])
+        self.positions.extend(positions)
+        self.cash.extend(cash)
+        self.total.extend(positions + cash)
+
+    # 이전 구간에서 매수한 포지션 청산 (엔진과 같은 식으로 계산)
+    def _sell(self, price, bar):
+        buy = self.ledger.size - 1
+        buy_price = self.ledger.column('effective_price')[buy]
+        buy_value = self.ledger.column('value')[buy]
+        buy_fee = self.ledger.column('fee')[buy]
+
+        sell_price = price * (1 - self.slippage_ratio)
+        growth = (1 - self.fee_ratio) ** 2 * sell_price / buy_price
+        sell_value = self.units * sell_price
+        sell_fee = sell_value * self.fee_ratio
+        self.ledger.append(bar, SELL, price, sell_price, self.units, sell_value, sell_fee,
+                           sell_value - buy_value - buy_fee - sell_fee)
+        self.capital = float(self.capital * growth)
+        self.units = 0.0
+
+    def index(self):
+        return pd.DatetimeIndex(pd.to_datetime(self.timestamps.values), name='timestamp')
+
+    # backtest()와 같은 형태의 (portfolio, trades)
+    def results(self):
+        index = self.index()
+        portfolio = pd.DataFrame(index=index)
+        portfolio['positions'] = self.positions.values
+        portfolio['cash'] = self.cash.values
+        portfolio['total'] = self.total.values
+        portfolio['returns'] = portfolio['total'].pct_change()
+        return portfolio, self.ledger.to_frame(index)
+
+    # 전략 함수와 같은 열의 신호 DataFrame (차트 표시용)
+    def signals(self):
+        signals = pd.DataFrame(index=self.index())
+        signals['price'] = self.price.values
+        for column, values in self._columns(0, len(self)).items():
+            signals[column] = values
+        signals['position'] = signals['signal'].diff()
+        return signals
@@ -0,0 +1,126 @@
+import itertools
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from engine import simulate
+from metrics import performance, periods_per_year
+from strategies import STRATEGIES
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+RESULT_COLUMNS = ['total_return', 'max_drawdown', 'sharpe_ratio', 'trades', 'sortino_ratio', 'calmar_ratio',
+                  'win_rate', 'profit_factor']
+
+# 워커 프로세스마다 한 번만 붙이는 공유 데이터
+_shared = {}
+
+
+# OHLCV 배열을 공유 메모리에 올려 워커들이 복사 없이 참조하도록 함
+class SharedOHLCV:
+    def __init__(self, df):
+        n = len(df)
+        self.length = n
+        self.shm = shared_memory.SharedMemory(create=True, size=max(n * 8 * (len(OHLCV_COLUMNS) + 1), 1))
+        buffer = np.ndarray((len(OHLCV_COLUMNS) + 1, n), dtype=np.float64, buffer=self.shm.buf)
+        buffer[0] = df.index.asi8.view(np.float64)
+        buffer[1:] = df[OHLCV_COLUMNS].to_numpy(dtype=np.float64).T
+
+    @property
+    def handle(self):
+        return self.shm.name, self.length
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(name, length):
+    shm = shared_memory.SharedMemory(name=name)
+    buffer = np.ndarray((len(OHLCV_COLUMNS) + 1, length), dtype=np.float64, buffer=shm.buf)
+    index = pd.DatetimeIndex(buffer[0].view(np.int64))
+    df = pd.DataFrame(dict(zip(OHLCV_COLUMNS, buffer[1:])), index=index, copy=False)
+    return shm, df
+
+
+def _init_worker(name, length, initial_capital, fee_ratio, slippage_ratio, periods=None):
+    shm, df = attach(name, length)
+    _shared.update(shm=shm, df=df, costs=(initial_capital, fee_ratio, slippage_ratio),
+                   periods=periods or periods_per_year(index=df.index))
+
+
+# 성과 지표 중 결과표에 쓰는 값 (RESULT_COLUMNS 순서)
+def result_row(total, ledger, initial_capital, periods):
+    metrics = performance(total, ledger, initial_capital, periods)
+    return tuple(metrics[column] for column in RESULT_COLUMNS)
+
+
+# periods: 1년 동안의 봉 수 (생략하면 df의 타임스탬프 간격으로 추정)
+def run_params(df, strategy, params, initial_capital, fee_ratio, slippage_ratio, periods=None):
+    strategy_func = STRATEGIES[strategy][0]
+    signals = strategy_func(df, **params)
+    result = simulate(signals['price'].to_numpy(), signals['signal'].to_numpy(),
+                      initial_capital, fee_ratio, slippage_ratio)
+    return result_row(result['total'], result['ledger'], initial_capital,
+                      periods or periods_per_year(index=df.index))
+
+
+def _run_chunk(strategy, chunk):
+    df = _shared['df']
+    initial_capital, fee_ratio, slippage_ratio = _shared['costs']
+    return [run_params(df, strategy, params, initial_capital, fee_ratio, slippage_ratio, _shared['periods'])
+            for params in chunk]
+
+
+# 파라미터 범위 -> 조합 목록 (MA 교차는 단기 < 장기 조합만 사용)
+def parameter_grid(strategy, **ranges):
+    names = STRATEGIES[strategy][1]
+    grid = [dict(zip(names, values)) for values in itertools.product(*(ranges[name] for name in names))]
+    if strategy == "MA 교차":
+        grid = [params for params in grid if params['short_window'] < params['long_window']]
+    return grid
+
+
+def _chunks(grid, workers):
+    size = max(1, len(grid) // (workers * 8))
+    return [grid[i:i + size] for i in range(0, len(grid), size)]
+
+
+# 파라미터 그리드 전체를 프로세스 풀에서 실행하고 수익률 순으로 정렬
+# periods: 1년 동안의 봉 수 (단일 백테스트와 같도록 periods_per_year(timeframe)을 넘김, 생략하면 타임스탬프 간격으로 추정)
+def run_sweep(df, strategy, grid, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001,
+              workers=None, progress=None, periods=None):
+    workers = workers or os.cpu_count() or 1
+    costs = (initial_capital, fee_ratio, slippage_ratio)
+    periods = periods or periods_per_year(index=df.index)
+    rows = []
+
+    if workers == 1 or len(grid) < 2:
+        for i, params in enumerate(grid):
+            rows.append(run_params(df, strategy, params, *costs, periods))
+            if progress:
+                progress(i + 1, len(grid))
+    else:
+        chunks = _chunks(grid, workers)
+        with SharedOHLCV(df) as shared:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(*shared.handle, *costs, periods)) as pool:
+                done = 0
+                for chunk, chunk_rows in zip(chunks, pool.map(_run_chunk, itertools.repeat(strategy), chunks)):
+                    rows.extend(chunk_rows)
+                    done += len(chunk)
+                    if progress:
+                        progress(done, len(grid))
+
+    results = pd.DataFrame(grid)
+    results[RESULT_COLUMNS] = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    return results.sort_values('total_return', ascending=False, ignore_index=True)
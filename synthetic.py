@@ -0,0 +1,122 @@
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from data import parse_timeframe
+from scheduler import TokenBucket
+
+# 일간 수익률 표준편차 (기존 샘플 데이터와 같은 2%) - 시간 프레임 길이에 맞게 조정
+DAILY_VOLATILITY = 0.02
+# 변동성 국면 길이 (봉) - 국면마다 변동성 배율이 바뀜
+REGIME_BARS = 500
+DAY_MS = 24 * 60 * 60 * 1000
+# 시작 시각을 주지 않았을 때의 기본값 (2020-01-01 UTC)
+DEFAULT_START = 1577836800000
+
+
+# 재현 가능한 가상 OHLCV 생성 (반복문 없이 배열 연산으로 생성, 같은 seed면 같은 데이터)
+# bars 또는 end 중 하나로 길이 지정, start/end는 밀리초 epoch
+def synthetic_ohlcv(bars=None, timeframe='1h', start=None, end=None, seed=42, price=100.0,
+                    volatility=DAILY_VOLATILITY):
+    if bars is None and end is None:
+        raise ValueError("bars(봉 수)와 end(끝 시각) 중 하나는 지정해야 합니다.")
+    step = parse_timeframe(timeframe) * 1000
+    if start is None:
+        start = DEFAULT_START if end is None else end - bars * step
+    start -= start % step
+    if bars is None:
+        bars = max(0, -(-(end - start) // step))
+    timestamps = start + np.arange(bars, dtype=np.int64) * step
+
+    rng = np.random.default_rng(seed)
+    sigma = volatility * np.sqrt(step / DAY_MS)
+    # 국면별 변동성 배율 (로그정규)로 변동성이 몰려 나타나는 구간을 흉내냄
+    regimes = np.exp(rng.normal(0, 0.4, -(-bars // REGIME_BARS)))
+    returns = rng.standard_normal(bars) * sigma * np.repeat(regimes, REGIME_BARS)[:bars]
+
+    close = price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([price], close[:-1]))[:bars]
+    wicks = np.abs(rng.standard_normal((2, bars))) * sigma * 0.5
+    high = np.maximum(open_, close) * np.exp(wicks[0])
+    low = np.minimum(open_, close) * np.exp(-wicks[1])
+    # 가격 변동이 클수록 거래량도 큼
+    volume = np.exp(rng.normal(8, 0.3, bars)) * (1 + np.abs(returns) / sigma)
+
+    index = pd.DatetimeIndex(pd.to_datetime(timestamps, unit='ms'), name='timestamp')
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+
+
+# ccxt와 같은 이름의 오류 (scheduler는 오류 클래스 이름으로 다시 시도할지 판단)
+class NetworkError(Exception):
+    pass
+
+
+class RateLimitExceeded(NetworkError):
+    pass
+
+
+# 네트워크 없이 가상 캔들을 돌려주는 거래소 (ccxt 거래소 객체 중 캐시/수집 코드가 쓰는 부분만 구현)
+# 코인/시간 프레임마다 start부터 now까지 한 번 생성해 두고 요청 구간만 잘라서 반환
+# 스케줄러 시험용 설정:
+#   latency: 요청마다 걸리는 시간 (초), rate/burst: 서버 쪽 허용 속도 (넘으면 RateLimitExceeded)
+#   page_limit: 한 번에 주는 최대 캔들 수, failure_rate: NetworkError를 내는 비율
+#   recorded: {(코인, 시간 프레임): OHLCV DataFrame} - 가상 데이터 대신 저장해 둔 캔들 사용
+class SyntheticExchange:
+    id = 'synthetic'
+    has = {'fetchOHLCV': True}
+
+    def __init__(self, start, now, seed=42, latency=0.0, rate=None, burst=None, page_limit=1000,
+                 failure_rate=0.0, recorded=None):
+        self.start = start
+        self.now = now
+        self.seed = seed
+        self.latency = latency
+        self.page_limit = page_limit
+        self.failure_rate = failure_rate
+        self.recorded = recorded or {}
+        self.requests = 0
+        self.rejected = 0
+        self.markets = {}
+        self._series = {}
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def milliseconds(self):
+        return self.now
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return parse_timeframe(timeframe)
+
+    def _candles(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self._series:
+                if key in self.recorded:
+                    df = self.recorded[key][['open', 'high', 'low', 'close', 'volume']]
+                else:
+                    seed = zlib.crc32(f"{self.seed}:{symbol}:{timeframe}".encode())
+                    df = synthetic_ohlcv(timeframe=timeframe, start=self.start, end=self.now, seed=seed)
+                self._series[key] = np.column_stack((df.index.asi8 // 10 ** 6, df.to_numpy()))
+            return self._series[key]
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            failed = self.failure_rate and self._rng.random() < self.failure_rate
+        if self._bucket is not None and not self._bucket.try_acquire():
+            with self._lock:
+                self.rejected += 1
+            raise RateLimitExceeded(f"{self.id} rate limit exceeded")
+        if failed:
+            raise NetworkError(f"{self.id} connection reset")
+        candles = self._candles(symbol, timeframe)
+        limit = min(limit or 500, self.page_limit)
+        lo = 0 if since is None else int(np.searchsorted(candles[:, 0], since, side='left'))
+        return [[int(row[0]), *row[1:]] for row in candles[lo:lo + limit].tolist()]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 루트의 모듈(engine, strategies 등)을 테스트에서 바로 가져오기
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,142 @@
+import pandas as pd
+
+from cache_manager import CacheManager
+from store import COLUMNS, CandleStore
+from synthetic import DEFAULT_START, SyntheticExchange, synthetic_ohlcv
+
+SYMBOL = 'BTC/USDT'
+HOUR = 60 * 60 * 1000
+MINUTE = 60 * 1000
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+CANDLES = synthetic_ohlcv(2000, timeframe='1h', start=DEFAULT_START, seed=1)
+# 첫 실행 시각 (1500번째 봉이 형성 중)
+NOW = DEFAULT_START + 1500 * HOUR + 10 * MINUTE
+
+
+# 저장해 둔 캔들을 돌려주는 가상 거래소 (now 이후 캔들은 아직 없음)
+def exchange_at(now, candles=CANDLES, timeframe='1h'):
+    recorded = candles[candles.index.asi8 // 10 ** 6 <= now]
+    return SyntheticExchange(DEFAULT_START, now, recorded={(SYMBOL, timeframe): recorded})
+
+
+def expected(since, now, candles=CANDLES):
+    stamps = candles.index.asi8 // 10 ** 6
+    return candles[(stamps >= since) & (stamps <= now)][OHLCV]
+
+
+def test_head_and_tail_backfill(tmp_path):
+    cache = CacheManager(str(tmp_path))
+    since = DEFAULT_START + 1000 * HOUR
+    exchange = exchange_at(NOW)
+    pd.testing.assert_frame_equal(cache.load(exchange, SYMBOL, '1h', since), expected(since, NOW), check_freq=False)
+    assert exchange.requests == 1
+    cache.load(exchange, SYMBOL, '1h', since)
+    assert exchange.requests == 1
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
+
+    # 앞 구간: 빠진 구간만 요청
+    earlier = DEFAULT_START + 500 * HOUR
+    pd.testing.assert_frame_equal(cache.load(exchange, SYMBOL, '1h', earlier), expected(earlier, NOW),
+                                  check_freq=False)
+    assert exchange.requests == 2
+
+    # 뒤 구간: 형성 중이던 마지막 캔들부터 한 번만 요청
+    later = exchange_at(NOW + 5 * HOUR)
+    pd.testing.assert_frame_equal(cache.load(later, SYMBOL, '1h', earlier), expected(earlier, NOW + 5 * HOUR),
+                                  check_freq=False)
+    assert later.requests == 1
+
+
+# 상장 전 구간을 요청해도 캔들이 없던 앞 구간은 다시 요청하지 않음
+def test_listing_gap_is_not_refetched(tmp_path):
+    cache = CacheManager(str(tmp_path))
+    exchange = exchange_at(NOW)
+    before_listing = DEFAULT_START - 100 * HOUR
+    df = cache.load(exchange, SYMBOL, '1h', before_listing)
+    assert df.index[0] == CANDLES.index[0]
+    requests = exchange.requests
+    cache.load(exchange, SYMBOL, '1h', before_listing)
+    cache.load(exchange, SYMBOL, '1h', before_listing + HOUR)
+    assert exchange.requests == requests
+
+
+# 형성 중인 마지막 캔들은 시간 프레임별 허용 시간(1h: 5분)이 지나야 다시 받아 새 값으로 교체
+def test_forming_candle_refetched_after_freshness(tmp_path):
+    cache = CacheManager(str(tmp_path))
+    since = DEFAULT_START + 1400 * HOUR
+    cache.load(exchange_at(NOW), SYMBOL, '1h', since)
+
+    updated = CANDLES.copy()
+    updated.iloc[1500, updated.columns.get_loc('close')] += 3.0
+    soon = exchange_at(NOW + 2 * MINUTE, updated)
+    df = cache.load(soon, SYMBOL, '1h', since)
+    assert soon.requests == 0
+    assert df['close'].iloc[-1] == CANDLES['close'].iloc[1500]
+
+    later = exchange_at(NOW + 6 * MINUTE, updated)
+    df = cache.load(later, SYMBOL, '1h', since)
+    assert later.requests == 1
+    assert len(df) == 101 and df['close'].iloc[-1] == updated['close'].iloc[1500]
+
+
+def resampled(df, timeframe):
+    return df.resample(timeframe).agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+                                       'volume': 'sum'}).dropna()
+
+
+def test_coarser_timeframe_derived_from_stored_series(tmp_path):
+    cache = CacheManager(str(tmp_path))
+    since = DEFAULT_START + 1000 * HOUR
+    exchange = exchange_at(NOW)
+    cache.load(exchange, SYMBOL, '1h', since)
+    df = cache.load(exchange, SYMBOL, '4h', since)
+    assert exchange.requests == 1
+    assert CandleStore(str(tmp_path)).timeframes('synthetic', SYMBOL) == ['1h']
+    pd.testing.assert_frame_equal(df, resampled(expected(since, NOW), '4h'), check_freq=False)
+
+    # 새 캔들이 붙으면 마지막 봉부터 다시 집계한 결과가 전체 집계와 같음
+    later = exchange_at(NOW + 9 * HOUR)
+    df = cache.load(later, SYMBOL, '4h', since)
+    pd.testing.assert_frame_equal(df, resampled(expected(since, NOW + 9 * HOUR), '4h'), check_freq=False)
+
+
+# 더 세밀한 시계열이 같은 구간을 담게 되면 큰 시간 프레임 시계열은 삭제하고 집계로 대신함
+def test_prune_coarser_series(tmp_path):
+    cache = CacheManager(str(tmp_path))
+    since = DEFAULT_START + 1000 * HOUR
+    four_hour = resampled(CANDLES, '4h')
+    recorded = {(SYMBOL, '1h'): CANDLES[CANDLES.index.asi8 // 10 ** 6 <= NOW],
+                (SYMBOL, '4h'): four_hour[four_hour.index.asi8 // 10 ** 6 <= NOW]}
+    exchange = SyntheticExchange(DEFAULT_START, NOW, recorded=recorded)
+    store = CandleStore(str(tmp_path))
+
+    cache.load(exchange, SYMBOL, '4h', since)
+    assert store.timeframes('synthetic', SYMBOL) == ['4h']
+    # 더 짧은 구간의 1h는 4h를 대신할 수 없음
+    cache.load(exchange, SYMBOL, '1h', since + 100 * HOUR)
+    assert store.timeframes('synthetic', SYMBOL) == ['1h', '4h']
+    cache.load(exchange, SYMBOL, '1h', since)
+    assert store.timeframes('synthetic', SYMBOL) == ['1h']
+
+    requests = exchange.requests
+    df = cache.load(exchange, SYMBOL, '4h', since)
+    assert exchange.requests == requests
+    pd.testing.assert_frame_equal(df, resampled(expected(since, NOW), '4h'), check_freq=False)
+
+
+# 용량 상한을 넘으면 가장 오래 사용하지 않은 시계열부터 삭제 (방금 읽은 시계열은 유지)
+def test_lru_eviction(tmp_path):
+    size = 501 * sum(dtype.itemsize for _, dtype in COLUMNS)
+    cache = CacheManager(str(tmp_path), max_bytes=int(size * 3.5))
+    store = CandleStore(str(tmp_path))
+    since = DEFAULT_START + 1000 * HOUR
+    for i, symbol in enumerate(['A/USDT', 'B/USDT', 'C/USDT']):
+        cache.load(SyntheticExchange(DEFAULT_START, NOW + i * MINUTE), symbol, '1h', since)
+    assert cache.usage() == 3 * size and cache.stats.evictions == 0
+
+    # A를 다시 사용하면 가장 오래된 것은 B
+    cache.load(SyntheticExchange(DEFAULT_START, NOW + 3 * MINUTE), 'A/USDT', '1h', since)
+    cache.load(SyntheticExchange(DEFAULT_START, NOW + 4 * MINUTE), 'D/USDT', '1h', since)
+    assert [bool(store.timeframes('synthetic', symbol)) for symbol in ['A/USDT', 'B/USDT', 'C/USDT', 'D/USDT']] == \
+        [True, False, True, True]
+    assert cache.stats.evictions == 1 and cache.stats.bytes_evicted == size
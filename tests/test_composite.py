@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from composite import composite_strategy
+from synthetic import synthetic_ohlcv
+
+MA = {'strategy': "MA 교차", 'params': {'short_window': 10, 'long_window': 30}}
+RSI = {'indicator': 'rsi', 'window': 14, 'op': '<', 'value': 50}
+PRICE = {'indicator': 'close', 'op': '>', 'value': 100}
+
+
+@pytest.fixture
+def df():
+    return synthetic_ohlcv(500, seed=0)
+
+
+# 같은 조건을 두 번 넣으면 투표에서 두 표로 계산 (중복을 지우면 과반 기준이 바뀜)
+def test_duplicate_legs_keep_their_votes(df):
+    signals = composite_strategy(df, [MA, MA, RSI], combine='vote')
+    expected = composite_strategy(df, [MA], combine='and')
+    np.testing.assert_array_equal(signals['signal'], expected['signal'])
+
+    signals = composite_strategy(df, [MA, RSI, RSI, PRICE], combine='vote', min_votes=3)
+    legs = [composite_strategy(df, [leg])['signal'].to_numpy() for leg in (MA, RSI, PRICE)]
+    np.testing.assert_array_equal(signals['signal'], (legs[0] + 2 * legs[1] + legs[2] >= 3).astype(np.int8))
+
+
+def test_rsi_condition_defaults_to_14(df):
+    default = composite_strategy(df, [{'indicator': 'rsi', 'op': '<', 'value': 50}])
+    np.testing.assert_array_equal(default['signal'], composite_strategy(df, [RSI])['signal'])
+
+
+def test_window_required_for_rolling_conditions(df):
+    with pytest.raises(ValueError, match='window'):
+        composite_strategy(df, [{'indicator': 'rolling_mean', 'op': '<', 'value': 50}])
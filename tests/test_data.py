@@ -0,0 +1,38 @@
+import numpy as np
+
+from data import fetch_range
+from synthetic import DEFAULT_START, SyntheticExchange
+
+HOUR = 60 * 60 * 1000
+NOW = DEFAULT_START + 5000 * HOUR + 123
+
+
+# 형성 중인 캔들은 주지 않고 마감된 캔들만 주는 거래소
+class ClosedOnlyExchange(SyntheticExchange):
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        candles = super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+        return [candle for candle in candles if candle[0] + HOUR <= self.now]
+
+
+def test_full_range_pages():
+    exchange = SyntheticExchange(DEFAULT_START, NOW)
+    candles = fetch_range(exchange, 'BTC/USDT', '1h', DEFAULT_START, NOW)
+    np.testing.assert_array_equal(candles['timestamp'], DEFAULT_START + np.arange(5001) * HOUR)
+    assert exchange.requests == 6
+
+
+# 한 번에 limit보다 적게 주는 거래소도 과거 구간을 끝까지 받음
+def test_exchange_page_cap_below_limit():
+    exchange = SyntheticExchange(DEFAULT_START, NOW, page_limit=200)
+    candles = fetch_range(exchange, 'BTC/USDT', '1h', DEFAULT_START, NOW)
+    assert len(candles['timestamp']) == 5001
+    assert exchange.requests == 26
+
+
+# 마지막 몇 봉만 이어 받을 때는 짧은 페이지 하나로 끝 (빈 페이지를 한 번 더 요청하지 않음)
+def test_short_tail_page_is_one_request():
+    since = NOW - NOW % HOUR - 3 * HOUR
+    for exchange, expected in ((SyntheticExchange(DEFAULT_START, NOW), 4), (ClosedOnlyExchange(DEFAULT_START, NOW), 3)):
+        candles = fetch_range(exchange, 'BTC/USDT', '1h', since, NOW)
+        assert len(candles['timestamp']) == expected
+        assert exchange.requests == 1
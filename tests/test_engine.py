@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import backtest
+from strategies import STRATEGIES
+from synthetic import synthetic_ohlcv
+
+
+# 기존 행 단위 반복 백테스팅과 같은 순서로 한 봉씩 계산하는 기준 구현
+# (기존 반복문은 보유 가치를 1개 단위(asset * price)로 계산했으므로, 매수한 수량 기준으로만 바꿈)
+def reference_backtest(signals, initial_capital, fee_ratio, slippage_ratio):
+    cash, units = float(initial_capital), 0.0
+    buy_value = buy_fee = 0.0
+    positions, cashes, totals, trades = [], [], [], []
+    previous = None
+    for timestamp, price, signal in zip(signals.index, signals['price'], signals['signal']):
+        holding = signal > 0
+        # 첫 봉은 변화 없음으로 취급 (첫 매수 전의 보유 신호는 체결되지 않음)
+        change = 0 if previous is None else int(holding) - int(previous)
+        previous = holding
+        if change > 0:
+            effective_price = price * (1 + slippage_ratio)
+            fee = cash * fee_ratio
+            units = (cash - fee) / effective_price
+            buy_value, buy_fee = units * price, fee
+            trades.append((timestamp, 'BUY', price, effective_price, units, buy_value, fee, 0.0))
+            cash = 0.0
+        elif change < 0 and units > 0:
+            effective_price = price * (1 - slippage_ratio)
+            value = units * effective_price
+            fee = value * fee_ratio
+            trades.append((timestamp, 'SELL', price, effective_price, units, value, fee,
+                           value - buy_value - buy_fee - fee))
+            cash, units = value - fee, 0.0
+        positions.append(units * price)
+        cashes.append(cash)
+        totals.append(units * price + cash)
+    columns = ['timestamp', 'type', 'price', 'effective_price', 'units', 'value', 'fee', 'profit']
+    return np.array(positions), np.array(cashes), np.array(totals), pd.DataFrame(trades, columns=columns)
+
+
+def assert_parity(signals, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001):
+    portfolio, trades = backtest(signals, initial_capital, fee_ratio, slippage_ratio)
+    positions, cash, total, expected = reference_backtest(signals, initial_capital, fee_ratio, slippage_ratio)
+    np.testing.assert_allclose(portfolio['positions'], positions, rtol=1e-12)
+    np.testing.assert_allclose(portfolio['cash'], cash, rtol=1e-12)
+    np.testing.assert_allclose(portfolio['total'], total, rtol=1e-12)
+    assert len(trades) == len(expected)
+    assert (trades['timestamp'].to_numpy() == expected['timestamp'].to_numpy()).all()
+    assert (trades['type'].to_numpy() == expected['type'].to_numpy()).all()
+    for column in ['price', 'effective_price', 'units', 'value', 'fee', 'profit']:
+        np.testing.assert_allclose(trades[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                   rtol=1e-12, atol=1e-12)
+    return portfolio, trades
+
+
+def make_signals(signal, seed=0):
+    n = len(signal)
+    index = pd.date_range('2024-01-01', periods=n, freq='h')
+    price = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+    signals = pd.DataFrame({'price': price, 'signal': np.asarray(signal)}, index=index)
+    signals['position'] = signals['signal'].diff()
+    return signals
+
+
+@pytest.mark.parametrize('fee_ratio, slippage_ratio', [(0.0, 0.0), (0.001, 0.001), (0.01, 0.005)])
+@pytest.mark.parametrize('strategy', list(STRATEGIES)[:3])
+def test_strategy_parity(strategy, fee_ratio, slippage_ratio):
+    df = synthetic_ohlcv(2000, '1h', seed=7)
+    signals = STRATEGIES[strategy][0](df)
+    assert_parity(signals, 1000.0, fee_ratio, slippage_ratio)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_signal_parity(seed):
+    signal = (np.random.default_rng(seed).random(500) < 0.5).astype(int)
+    assert_parity(make_signals(signal, seed), 2500.0, 0.002, 0.003)
+
+
+def test_no_trades():
+    portfolio, trades = assert_parity(make_signals(np.zeros(100, dtype=int)))
+    assert len(trades) == 0
+    assert (portfolio['total'] == 1000.0).all()
+
+
+def test_hold_signal_before_first_buy_is_not_a_position():
+    portfolio, trades = assert_parity(make_signals(np.ones(100, dtype=int)))
+    assert len(trades) == 0
+    assert (portfolio['positions'] == 0).all()
+
+
+def test_position_open_at_end():
+    signal = np.zeros(100, dtype=int)
+    signal[10:30] = 1
+    signal[60:] = 1
+    signals = make_signals(signal)
+    portfolio, trades = assert_parity(signals, 1000.0, 0.001, 0.002)
+    assert trades['type'].tolist() == ['BUY', 'SELL', 'BUY']
+    # 마지막 봉은 매수한 수량 기준으로 평가
+    assert portfolio['positions'].iloc[-1] == pytest.approx(trades['units'].iloc[-1] * signals['price'].iloc[-1])
+    assert portfolio['cash'].iloc[-1] == 0
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import exchanges
+
+
+# 네트워크 없이 시장 정보만 흉내 내는 거래소 객체 (load_markets마다 새 버전)
+class FakeExchange:
+    version = 0
+
+    def __init__(self, exchange_id, enableRateLimit=True):
+        self.id = exchange_id
+        self.enableRateLimit = enableRateLimit
+        self.markets = {}
+        self.currencies = {}
+
+    def set_markets(self, markets, currencies=None):
+        self.markets, self.currencies = dict(markets), dict(currencies or {})
+
+    def load_markets(self):
+        FakeExchange.version += 1
+        self.set_markets({'BTC/USDT': {'version': FakeExchange.version}})
+
+
+@pytest.fixture
+def fake_exchanges(monkeypatch):
+    monkeypatch.setattr(exchanges, 'create_exchange', lambda exchange_id, **config: FakeExchange(exchange_id, **config))
+    yield
+    # 재검증 스레드와 등록된 거래소 객체가 다른 테스트로 이어지지 않도록 정리
+    exchanges.stop_revalidation(timeout=5)
+    exchanges._live_exchanges.clear()
+
+
+# 백그라운드 갱신이 연결된 객체와 요청 스케줄러용 unthrottled 복사본 모두에 반영되는지 확인
+# (재검증 반복 한 번을 현재 스레드에서 실행하고, 저장 직후 중지 이벤트를 설정해 반복을 끝냄)
+def test_revalidation_refreshes_unthrottled_copy(fake_exchanges, monkeypatch):
+    stop = threading.Event()
+
+    def save_snapshot(exchange_id, markets, currencies, root=None):
+        stop.set()
+        return {'saved_at': time.time(), 'markets': markets, 'currencies': currencies}
+    monkeypatch.setattr(exchanges, 'save_snapshot', save_snapshot)
+
+    exchange = FakeExchange('fake-revalidate')
+    exchange.set_markets({'BTC/USDT': {'version': 0}})
+    exchanges.schedule_revalidation(exchange, saved_at=time.time(), interval=3600)
+    copy = exchanges.unthrottled(exchange)
+    assert copy is not exchange and copy.markets == exchange.markets
+
+    exchanges._revalidate('fake-revalidate', saved_at=0, interval=1, stop=stop)
+    version = FakeExchange.version
+    assert exchange.markets['BTC/USDT']['version'] == version
+    assert copy.markets['BTC/USDT']['version'] == version
+
+
+def test_stop_revalidation_ends_thread(fake_exchanges):
+    exchanges.schedule_revalidation(FakeExchange('fake-stop'), saved_at=time.time(), interval=3600)
+    worker, _ = exchanges._revalidators['fake-stop']
+    assert worker.is_alive()
+    exchanges.stop_revalidation('fake-stop', timeout=5)
+    assert not worker.is_alive() and 'fake-stop' not in exchanges._revalidators
+
+
+# 연결 확인용 비동기/동기 거래소 객체 (서버 시간 조회 지원 여부와 시장 정보 수신 성공 여부 지정)
+class ProbeExchange(FakeExchange):
+    fetch_time_ids = set()
+    broken_ids = set()
+    calls = []
+
+    def __init__(self, exchange_id, asynchronous=False, timeout=None, enableRateLimit=True):
+        super().__init__(exchange_id, enableRateLimit)
+        self.asynchronous = asynchronous
+        self.has = {'fetchTime': exchange_id in self.fetch_time_ids}
+
+    async def fetch_time(self):
+        ProbeExchange.calls.append(('fetch_time', self.id))
+        return 0
+
+    def load_markets(self):
+        ProbeExchange.calls.append(('load_markets', self.id, self.asynchronous))
+        if self.id in self.broken_ids:
+            raise OSError("connection refused")
+        super().load_markets()
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def probe_exchanges(fake_exchanges, monkeypatch, tmp_path):
+    monkeypatch.setattr(exchanges, 'create_exchange', ProbeExchange)
+    monkeypatch.setattr(exchanges, 'SNAPSHOT_DIR', str(tmp_path))
+    monkeypatch.setattr(exchanges, '_health', {})
+    monkeypatch.setattr(ProbeExchange, 'fetch_time_ids', {'fake-time'})
+    monkeypatch.setattr(ProbeExchange, 'broken_ids', set())
+    monkeypatch.setattr(ProbeExchange, 'calls', [])
+
+
+# 서버 시간 조회도 스냅샷도 없는 거래소는 제한 시간 안에 시장 정보 전체를 받지 않고 확인하지 않은 채로 둠
+def test_probe_without_cheap_check_skips_markets(probe_exchanges):
+    assert asyncio.run(exchanges._probe('fake-notime', 1))[:2] == ('fake-notime', False)
+    assert asyncio.run(exchanges._race('fake-notime', ['fake-notime', 'fake-time'], 1))[0] == 'fake-notime'
+    assert not any(call[0] == 'load_markets' for call in ProbeExchange.calls)
+    assert 'fake-notime' not in exchanges.health()
+
+    # 선택한 거래소라면 연결 단계에서 시장 정보를 받아 저장하고 정상으로 기록
+    winner, exchange = exchanges.connect('fake-notime', ['fake-notime', 'fake-time'], timeout=1)
+    assert winner == 'fake-notime' and exchange.markets
+    assert ('load_markets', 'fake-notime', False) in ProbeExchange.calls
+    assert exchanges.load_snapshot('fake-notime') is not None
+    assert exchanges.health()['fake-notime']['ok']
+
+
+# 확인하지 못한 거래소의 시장 정보 수신이 실패하면 실패로 기록하고 다음 후보로 연결
+def test_connect_falls_back_when_unprobed_exchange_fails(probe_exchanges):
+    ProbeExchange.broken_ids.add('fake-notime')
+    winner, exchange = exchanges.connect('fake-notime', ['fake-notime', 'fake-time'], timeout=1)
+    assert winner == 'fake-time' and exchange.markets
+    assert not exchanges.health()['fake-notime']['ok']
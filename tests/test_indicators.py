@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from indicators import BLOCK, INDICATORS, IndicatorCache
+
+LOOKBACK, COMPUTE = INDICATORS['rolling_mean'](20)
+
+
+def close(n, seed=0):
+    return 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+
+
+def index(n):
+    return pd.date_range('2024-01-01', periods=n, freq='h')
+
+
+def get(cache, values):
+    return cache.get(values, index(len(values)), 'rolling_mean', 20, LOOKBACK, COMPUTE)
+
+
+def expected(values):
+    return pd.Series(values).rolling(20, min_periods=1).mean().to_numpy()
+
+
+def test_hit_extension_and_changed_values():
+    cache = IndicatorCache()
+    values = close(3 * BLOCK)
+    np.testing.assert_allclose(get(cache, values[:2 * BLOCK + 10]), expected(values[:2 * BLOCK + 10]))
+    np.testing.assert_allclose(get(cache, values[:2 * BLOCK + 10]), expected(values[:2 * BLOCK + 10]))
+    np.testing.assert_allclose(get(cache, values), expected(values))
+    assert (cache.hits, cache.extensions, cache.misses) == (1, 1, 1)
+
+    # 시작점과 길이가 같아도 중간 값이 다르면 캐시 결과를 쓰지 않음
+    changed = values.copy()
+    changed[BLOCK + 7] += 1.0
+    np.testing.assert_allclose(get(cache, changed), expected(changed))
+    longer = np.append(changed, close(10, seed=1))
+    longer[5] -= 1.0
+    np.testing.assert_allclose(get(cache, longer), expected(longer))
+    assert (cache.hits, cache.extensions, cache.misses) == (1, 1, 3)
+
+
+def test_counters_are_exact_under_threads():
+    cache = IndicatorCache()
+    values = close(500)
+    get(cache, values)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: get(cache, values), range(2000)))
+    assert (cache.hits, cache.misses) == (2000, 1)
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import BUY, SELL, TradeLedger
+from metrics import monthly_returns, performance, periods_per_year
+
+
+# 연율화 기준: 1년 = 365일, 시간 프레임을 모르면 타임스탬프 간격의 중앙값
+def test_periods_per_year():
+    assert periods_per_year('1h') == 365 * 24
+    assert periods_per_year('4h') == 365 * 6
+    assert periods_per_year('1d') == 365
+    assert periods_per_year('1w') == pytest.approx(365 / 7)
+    index = pd.date_range('2024-01-01', periods=100, freq='15min')
+    assert periods_per_year(index=index) == 365 * 96
+    # 빠진 봉이 있어도 중앙값 간격 기준
+    assert periods_per_year(index=index.delete([10, 11, 50])) == 365 * 96
+    assert periods_per_year(index=index[:1]) == 365.0
+
+
+def test_drawdown_and_ratios():
+    # 자산 100 -> 110 -> 99 -> 121 -> 110, 1년 = 4봉
+    metrics = performance([110.0, 99.0, 121.0, 110.0], None, 100.0, periods=4)
+    assert metrics['total_return'] == pytest.approx(10.0)
+    assert metrics['cagr'] == pytest.approx(10.0)
+    assert metrics['max_drawdown'] == pytest.approx(-10.0)
+    assert metrics['calmar_ratio'] == pytest.approx(1.0)
+    # MDD는 110(첫 봉) -> 99(둘째 봉), 가장 긴 하락도 1봉 (1봉 = 365/4일)
+    assert (metrics['drawdown_start'], metrics['drawdown_end'], metrics['drawdown_bars']) == (0, 1, 1)
+    assert metrics['longest_drawdown_bars'] == 1
+    assert metrics['drawdown_days'] == pytest.approx(365 / 4)
+
+    # 봉 수익률 10%, -10%, 22.2%, -9.09%에서 봉당 무위험 수익률(연 2%)을 뺀 초과 수익률
+    returns = np.array([0.1, -0.1, 121 / 99 - 1, 110 / 121 - 1])
+    excess = returns - (1.02 ** 0.25 - 1)
+    mean = excess.sum() / 4
+    std = np.sqrt(((excess - mean) ** 2).sum() / 3)
+    downside = np.sqrt((excess[1] ** 2 + excess[3] ** 2) / 4)
+    assert metrics['sharpe_ratio'] == pytest.approx(2 * mean / std)
+    assert metrics['sortino_ratio'] == pytest.approx(2 * mean / downside)
+    assert metrics['volatility'] == pytest.approx(returns.std(ddof=1) * 2 * 100)
+
+
+def test_cagr():
+    # 2년(1년 = 2봉) 동안 4배 -> 연 100%
+    assert performance([150.0, 200.0, 300.0, 400.0], None, 100.0, periods=2)['cagr'] == pytest.approx(100.0)
+    # 반년 동안 +21% -> 연 46.41%
+    assert performance([110.0, 121.0], None, 100.0, periods=4)['cagr'] == pytest.approx(46.41)
+    assert performance([50.0, 0.0], None, 100.0, periods=2)['cagr'] == -100.0
+
+
+def trades_frame(profits):
+    rows = []
+    for profit in profits:
+        rows.append({'type': 'BUY', 'profit': 0.0, 'fee': 1.0})
+        rows.append({'type': 'SELL', 'profit': profit, 'fee': 1.0})
+    return pd.DataFrame(rows)
+
+
+def test_trade_statistics():
+    total = [100.0, 120.0]
+    metrics = performance(total, trades_frame([10.0, -5.0, 20.0, -5.0]), 100.0)
+    assert metrics['trades'] == 4
+    assert metrics['win_rate'] == 50.0
+    assert metrics['profit_factor'] == pytest.approx(3.0)
+    assert (metrics['total_profit'], metrics['average_profit']) == (20.0, 5.0)
+    assert (metrics['max_profit'], metrics['max_loss']) == (20.0, -5.0)
+    assert metrics['total_fees'] == 8.0
+    assert performance(total, trades_frame([10.0]), 100.0)['profit_factor'] == np.inf
+    assert performance(total, trades_frame([]), 100.0)['profit_factor'] == 0.0
+
+    # 엔진의 거래 기록(TradeLedger)도 같은 결과
+    ledger = TradeLedger()
+    for bar, profit in enumerate([10.0, -5.0, 20.0, -5.0]):
+        ledger.append(2 * bar, BUY, 1.0, 1.0, 1.0, 1.0, 1.0)
+        ledger.append(2 * bar + 1, SELL, 1.0, 1.0, 1.0, 1.0, 1.0, profit)
+    assert performance(total, ledger, 100.0) == performance(total, trades_frame([10.0, -5.0, 20.0, -5.0]), 100.0)
+
+
+# 월별 수익률은 월말 자산끼리의 복리 수익률 (첫 달은 초기 자본 기준)
+def test_monthly_returns_compound():
+    index = pd.date_range('2024-01-01', '2024-03-31', freq='D')
+    total = np.where(index.month == 1, 110.0, np.where(index.month == 2, 99.0, 108.9))
+    result = monthly_returns(total, index, 100.0)
+    assert list(result.index) == list(pd.to_datetime(['2024-01-01', '2024-02-01', '2024-03-01']))
+    np.testing.assert_allclose(result, [10.0, -10.0, 10.0])
+    monthly = performance(total, None, 100.0, periods_per_year('1d'), index=index)['monthly_returns']
+    pd.testing.assert_series_equal(monthly, result)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from resample import divides, resample_columns
+from synthetic import synthetic_ohlcv
+
+AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def columns(df):
+    return {'timestamp': df.index.asi8 // 10 ** 6, **{name: df[name].to_numpy() for name in AGG}}
+
+
+# pandas로 같은 봉 경계(UTC epoch, 주봉은 월요일 시작)에 묶은 기준 결과
+def expected(df, timeframe):
+    if timeframe == '1w':
+        buckets = df.index.to_period('W-SUN').start_time
+    else:
+        buckets = df.index.floor(timeframe.replace('m', 'min'))
+    return df.groupby(buckets).agg(AGG)
+
+
+@pytest.mark.parametrize('base, target', [('1m', '15m'), ('1h', '4h'), ('1h', '1d'), ('1d', '1w'), ('4h', '1w')])
+def test_resample_matches_pandas(base, target):
+    df = synthetic_ohlcv(3000, timeframe=base, seed=3)
+    # 앞뒤가 잘린 봉과 중간에 빠진 캔들 포함
+    df = df.iloc[5:-3].drop(df.index[[100, 101, 102, 700]])
+    result = resample_columns(columns(df), target)
+    reference = expected(df, target)
+    np.testing.assert_array_equal(result['timestamp'], reference.index.asi8 // 10 ** 6)
+    for name in AGG:
+        np.testing.assert_allclose(result[name], reference[name], rtol=1e-12)
+
+
+def test_resample_skips_empty_buckets():
+    df = synthetic_ohlcv(48, timeframe='1h', seed=1)
+    df = df[(df.index.hour < 4) | (df.index.hour >= 8)]
+    result = resample_columns(columns(df), '4h')
+    hours = pd.to_datetime(result['timestamp'], unit='ms').hour
+    assert len(hours) == 10 and 4 not in set(hours)
+    empty = resample_columns(columns(df.iloc[:0]), '4h')
+    assert all(len(column) == 0 for column in empty.values())
+
+
+@pytest.mark.parametrize('base, target, result', [
+    ('1h', '4h', True), ('4h', '1h', False), ('1d', '1w', True), ('12h', '1w', True),
+    ('3d', '1w', False), ('7h', '1w', False), ('1h', '1M', False), ('1M', '1M', True),
+])
+def test_divides(base, target, result):
+    assert divides(base, target) is result
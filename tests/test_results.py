@@ -0,0 +1,85 @@
+import os
+
+import pandas as pd
+import pytest
+
+from engine import backtest
+from metrics import performance, periods_per_year
+from results import ResultCache, result_key
+from strategies import ma_cross_strategy
+from synthetic import synthetic_ohlcv
+
+CANDLES = synthetic_ohlcv(500, timeframe='1h', seed=11)
+PARAMS = {'short_window': 5, 'long_window': 20}
+STOPS = {'stop_loss': 0.02, 'take_profit': None, 'trailing_stop': 0.03}
+
+
+def run(stops=STOPS):
+    signals = ma_cross_strategy(CANDLES, **PARAMS)
+    portfolio, trades = backtest(signals, 1000.0, 0.001, 0.001, stops, CANDLES)
+    metrics = performance(portfolio['total'].to_numpy(), trades, 1000.0, periods_per_year('1h'), portfolio.index)
+    return {'signals': signals, 'portfolio': portfolio, 'trades': trades}, metrics
+
+
+def key(**changes):
+    settings = dict(params=PARAMS, initial_capital=1000.0, fee_ratio=0.001, slippage_ratio=0.001, stops=STOPS)
+    settings.update(changes)
+    return result_key(CANDLES, "MA 교차", settings.pop('params'), settings.pop('initial_capital'),
+                      settings.pop('fee_ratio'), settings.pop('slippage_ratio'), **settings)
+
+
+# 저장한 신호/자산 곡선/거래 기록/성과 지표(월별 수익률 포함)를 그대로 읽음
+def test_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    frames, metrics = run()
+    assert cache.get(key()) is None
+    cache.put(key(), frames, metrics)
+
+    loaded, loaded_metrics = cache.get(key())
+    for name, frame in frames.items():
+        pd.testing.assert_frame_equal(loaded[name], frame, check_freq=False)
+    assert (loaded['trades']['reason'] != 'signal').any()
+    pd.testing.assert_series_equal(loaded_metrics.pop('monthly_returns'), metrics['monthly_returns'],
+                                   check_freq=False, check_names=False)
+    assert loaded_metrics == {name: value for name, value in metrics.items() if name != 'monthly_returns'}
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
+
+
+# 결과에 영향을 주는 설정이 하나라도 다르면 다른 키
+def test_key_changes_with_settings():
+    base = key()
+    assert key() == base
+    changed = [
+        key(fee_ratio=0.002),
+        key(slippage_ratio=0.0),
+        key(initial_capital=2000.0),
+        key(params={'short_window': 5, 'long_window': 21}),
+        key(stops={**STOPS, 'stop_loss': 0.03}),
+        key(stops=None),
+        key(periods=periods_per_year('4h')),
+    ]
+    assert base not in changed and len(set(changed)) == len(changed)
+    other = CANDLES.copy()
+    other.iloc[-1, other.columns.get_loc('close')] += 1.0
+    assert result_key(other, "MA 교차", PARAMS, 1000.0, 0.001, 0.001, stops=STOPS) != base
+
+
+# 용량 상한을 넘으면 가장 오래 사용하지 않은 결과부터 삭제 (읽으면 최근 사용으로 갱신)
+def test_lru_byte_cap(tmp_path):
+    frames, metrics = run()
+    probe = ResultCache(str(tmp_path / 'probe'))
+    probe.put(key(), frames, metrics)
+    size = probe.usage()
+
+    cache = ResultCache(str(tmp_path / 'results'), max_bytes=int(size * 3.5))
+    keys = [key(fee_ratio=fee) for fee in (0.001, 0.002, 0.003, 0.004)]
+    for i, k in enumerate(keys[:3]):
+        cache.put(k, frames, metrics)
+        os.utime(cache._path(k), (1000 + i, 1000 + i))
+    assert cache.usage() == pytest.approx(3 * size, rel=0.01) and cache.stats.evictions == 0
+
+    # 첫 결과를 다시 읽으면 가장 오래된 것은 두 번째 결과
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[3], frames, metrics)
+    assert [cache.get(k) is not None for k in keys] == [True, False, True, True]
+    assert cache.stats.evictions == 1 and cache.usage() <= cache.max_bytes
@@ -0,0 +1,116 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import scheduler
+from data import fetch_range
+from scheduler import BACKGROUND, INTERACTIVE, FetchScheduler, TokenBucket
+from synthetic import DEFAULT_START, NetworkError, SyntheticExchange
+
+HOUR = 60 * 60 * 1000
+NOW = DEFAULT_START + 1500 * HOUR
+
+
+def test_bucket_paces_after_burst():
+    bucket = TokenBucket(rate=50, burst=5)
+    start = time.monotonic()
+    for _ in range(25):
+        bucket.acquire()
+    # 처음 5개는 바로, 나머지 20개는 초당 50개 속도
+    assert time.monotonic() - start >= 20 / 50 * 0.95
+
+    bucket = TokenBucket(rate=0.001, burst=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+# 토큰을 기다리는 요청이 여럿이면 화면 요청이 먼저 받음
+def test_bucket_serves_interactive_first():
+    bucket = TokenBucket(rate=5, burst=1)
+    bucket.acquire()
+    order = []
+    threads = [threading.Thread(target=lambda p=p: (bucket.acquire(p), order.append(p)))
+               for p in (BACKGROUND, INTERACTIVE)]
+    for thread in threads:
+        thread.start()
+        while len(bucket._waiting) < threads.index(thread) + 1:
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+    assert order == [INTERACTIVE, BACKGROUND]
+
+
+# 작업 대기열도 우선순위 순 (같은 우선순위는 먼저 온 순서)
+def test_queue_priority_order():
+    with FetchScheduler(SyntheticExchange(DEFAULT_START, NOW), rate=1000, workers=1) as fetcher:
+        release = threading.Event()
+        order = []
+        fetcher.submit(lambda exchange: release.wait(5))
+        futures = [fetcher.submit(lambda exchange, name=name: order.append(name), priority)
+                   for name, priority in [('b1', BACKGROUND), ('i1', INTERACTIVE), ('b2', BACKGROUND),
+                                          ('i2', INTERACTIVE)]]
+        release.set()
+        for future in futures:
+            future.result(5)
+    assert order == ['i1', 'i2', 'b1', 'b2']
+
+
+# 다시 시도할 오류는 지수 백오프 간격으로 retries번까지 재시도, 그 밖의 오류는 바로 실패
+def test_backoff_retries(monkeypatch):
+    delays = []
+    # 스케줄러 모듈이 쓰는 time/random만 바꿔 대기 시간을 기록 (무작위 배율은 1로 고정)
+    monkeypatch.setattr(scheduler, 'time', SimpleNamespace(sleep=delays.append, monotonic=time.monotonic))
+    monkeypatch.setattr(scheduler, 'random', SimpleNamespace(random=lambda: 0.5))
+    attempts = []
+
+    def flaky(failures, error=NetworkError):
+        def fn(exchange):
+            attempts.append(1)
+            if len(attempts) <= failures:
+                raise error("connection reset")
+            return 'ok'
+        return fn
+
+    with FetchScheduler(SyntheticExchange(DEFAULT_START, NOW), rate=1000, workers=1, retries=3,
+                        backoff=0.1) as fetcher:
+        assert fetcher.submit(flaky(3)).result(5) == 'ok'
+        assert delays == pytest.approx([0.1, 0.2, 0.4])
+        assert fetcher.stats.retries == 3 and fetcher.stats.failures == 0
+
+        attempts.clear()
+        with pytest.raises(NetworkError):
+            fetcher.submit(flaky(10)).result(5)
+        assert len(attempts) == 4
+
+        attempts.clear()
+        with pytest.raises(ValueError):
+            fetcher.submit(flaky(1, ValueError)).result(5)
+        assert len(attempts) == 1
+        assert fetcher.stats.failures == 2
+
+
+# 무작위 네트워크 오류가 있어도 재시도로 같은 캔들을 모두 받음
+def test_fetch_range_with_network_errors():
+    clean = fetch_range(SyntheticExchange(DEFAULT_START, NOW, page_limit=100), 'BTC/USDT', '1h', DEFAULT_START, NOW)
+    exchange = SyntheticExchange(DEFAULT_START, NOW, page_limit=100, failure_rate=0.3, seed=42)
+    with FetchScheduler(exchange, rate=1000, workers=4, retries=10, backoff=0.001) as fetcher:
+        candles = fetcher.fetch_range('BTC/USDT', '1h', DEFAULT_START, NOW, limit=100)
+        assert fetcher.stats.retries > 0 and fetcher.stats.failures == 0
+    for name, column in clean.items():
+        np.testing.assert_array_equal(candles[name], column)
+
+
+# 서버 쪽 허용 속도보다 느리게 보내면 거절이 없고, 빠르게 보내 거절되면 잠시 멈췄다가 다시 시도
+def test_server_rate_limit():
+    exchange = SyntheticExchange(DEFAULT_START, NOW, page_limit=100, rate=40, burst=4)
+    with FetchScheduler(exchange, rate=30, burst=4, workers=4) as fetcher:
+        fetcher.fetch_range('BTC/USDT', '1h', DEFAULT_START, NOW, limit=100)
+    assert exchange.rejected == 0
+
+    exchange = SyntheticExchange(DEFAULT_START, NOW, page_limit=100, rate=40, burst=4)
+    with FetchScheduler(exchange, rate=1000, burst=100, workers=8, retries=10, backoff=0.01) as fetcher:
+        candles = fetcher.fetch_range('BTC/USDT', '1h', DEFAULT_START, NOW, limit=100)
+        assert fetcher.stats.rate_limited == exchange.rejected > 0
+    assert len(candles['timestamp']) == 1500
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import SELL, simulate
+from stops import PERIOD_END, REASONS, STOP_LOSS, TAKE_PROFIT, TRAILING_STOP, intrabar_candles, stop_exits
+from synthetic import synthetic_ohlcv
+from walkforward import close_out
+
+SETTINGS = [
+    {'stop_loss': 0.004},
+    {'take_profit': 0.004},
+    {'trailing_stop': 0.003},
+    {'stop_loss': 0.006, 'take_profit': 0.005, 'trailing_stop': 0.004},
+]
+
+
+# 1분봉을 한 개씩 따라가며 거래마다 처음 닿은 가격을 찾는 기준 구현
+# (1분봉이 없는 봉은 봉 시가/고가/저가 하나로 판정, 같은 캔들에서 둘 다 닿으면 손절 우선)
+def reference_exits(hourly, minutes, buys, ends, entry_price, stop_loss=None, take_profit=None, trailing_stop=None):
+    by_bar = {}
+    hour_of = np.searchsorted(hourly.index.asi8, minutes.index.asi8, side='right') - 1
+    for bar, (open_, high, low) in zip(hour_of, minutes[['open', 'high', 'low']].to_numpy()):
+        by_bar.setdefault(bar, []).append((open_, high, low))
+
+    results = []
+    for buy, end, entry in zip(buys, ends, entry_price):
+        peak = entry
+        result = (-1, np.nan, 0)
+        for bar in range(buy + 1, end + 1):
+            candles = by_bar.get(bar) or [tuple(hourly[['open', 'high', 'low']].to_numpy()[bar])]
+            for open_, high, low in candles:
+                fixed = entry * (1 - stop_loss) if stop_loss else -np.inf
+                trail = peak * (1 - trailing_stop) if trailing_stop else -np.inf
+                level = max(fixed, trail)
+                target = entry * (1 + take_profit) if take_profit else np.inf
+                hit_stop, hit_tp = low <= level, high >= target
+                if hit_tp and (not hit_stop or open_ >= target):
+                    result = (bar, max(open_, target), TAKE_PROFIT)
+                elif hit_stop:
+                    result = (bar, min(open_, level), TRAILING_STOP if trail > fixed else STOP_LOSS)
+                peak = max(peak, high)
+                if result[0] >= 0:
+                    break
+            if result[0] >= 0:
+                break
+        results.append(result)
+    return [np.array(column) for column in zip(*results)]
+
+
+def hourly_from(minutes):
+    return minutes.resample('1h').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'})
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('settings', SETTINGS)
+def test_intrabar_exits_match_minute_walk(settings, seed):
+    minutes = synthetic_ohlcv(60 * 200, timeframe='1m', seed=seed)
+    hourly = hourly_from(minutes)
+    # 일부 봉은 1분봉이 없어 봉 전체로 판정
+    rng = np.random.default_rng(seed)
+    gaps = rng.choice(len(hourly), 15, replace=False)
+    minutes = minutes[~np.isin(np.searchsorted(hourly.index.asi8, minutes.index.asi8, side='right') - 1, gaps)]
+
+    points = np.sort(rng.choice(np.arange(1, len(hourly)), 40, replace=False))
+    buys, ends = points[0::2], points[1::2]
+    entry_price = hourly['close'].to_numpy()[buys]
+
+    candles = intrabar_candles(hourly, minutes)
+    exit_bar, exit_price, reason = stop_exits(candles, buys, ends, entry_price, **settings)
+    expected_bar, expected_price, expected_reason = reference_exits(hourly, minutes, buys, ends, entry_price,
+                                                                    **settings)
+    assert (exit_bar >= 0).any()
+    np.testing.assert_array_equal(exit_bar, expected_bar)
+    np.testing.assert_allclose(exit_price, expected_price, rtol=1e-12)
+    np.testing.assert_array_equal(reason, expected_reason)
+
+
+def test_intrabar_candles_order_and_fallback():
+    minutes = synthetic_ohlcv(180, timeframe='1m', seed=1)
+    hourly = hourly_from(minutes)
+    bars, open_, high, low = intrabar_candles(hourly, minutes[minutes.index.hour != 1])
+    # 1분봉이 빠진 두 번째 봉은 봉 캔들 하나로 대체
+    assert list(np.bincount(bars)) == [60, 1, 60]
+    assert high[60] == hourly['high'].iloc[1]
+    np.testing.assert_array_equal(open_[61:], minutes['open'].to_numpy()[120:])
+
+
+def single_trip(rows, **settings):
+    ohlc = pd.DataFrame(rows, columns=['open', 'high', 'low', 'close'],
+                        index=pd.date_range('2024-01-01', periods=len(rows), freq='h'))
+    exit_bar, exit_price, reason = stop_exits(intrabar_candles(ohlc), np.array([0]), np.array([len(rows) - 1]),
+                                              np.array([100.0]), **settings)
+    return int(exit_bar[0]), float(exit_price[0]), REASONS[reason[0]]
+
+
+def test_gap_through_fills_at_open():
+    entry = [100, 100, 100, 100]
+    assert single_trip([entry, [90, 95, 85, 92]], stop_loss=0.05) == (1, 90.0, 'stop_loss')
+    assert single_trip([entry, [115, 120, 112, 118]], take_profit=0.1) == (1, 115.0, 'take_profit')
+    # 시가가 기준 가격 안쪽이면 기준 가격에 체결
+    assert single_trip([entry, [99, 101, 94, 96]], stop_loss=0.05) == (1, 95.0, 'stop_loss')
+
+
+def test_both_levels_in_one_bar():
+    entry = [100, 100, 100, 100]
+    # 시가가 두 가격 사이면 손절 우선
+    assert single_trip([entry, [100, 111, 94, 105]], stop_loss=0.05, take_profit=0.1) == (1, 95.0, 'stop_loss')
+    # 시가가 이미 익절 가격 이상이면 익절
+    assert single_trip([entry, [112, 113, 90, 95]], stop_loss=0.05, take_profit=0.1) == (1, 112.0, 'take_profit')
+
+
+def test_trailing_stop_tracks_previous_peak():
+    entry = [100, 100, 100, 100]
+    # 같은 봉의 고가는 그 봉의 추적 손절 기준에 쓰지 않음 (봉 안의 순서를 알 수 없음)
+    assert single_trip([entry, [101, 130, 115, 120]], trailing_stop=0.1)[0] == -1
+    bar, price, reason = single_trip([entry, [101, 120, 110, 115], [115, 116, 107, 108]], trailing_stop=0.1)
+    assert (bar, reason) == (2, 'trailing_stop') and price == pytest.approx(108.0)
+    # 추적 가격이 고정 손절 가격보다 낮으면 손절로 기록
+    assert single_trip([entry, [99, 101, 90, 92]], stop_loss=0.05, trailing_stop=0.1) == (1, 95.0, 'stop_loss')
+
+
+# 구간 끝에 보유 중인 포지션은 마지막 봉 종가에 슬리피지와 수수료를 내고 period_end로 청산
+def test_close_out_records_period_end():
+    price = np.array([100.0, 100.0, 110.0, 120.0])
+    result = simulate(price, np.array([0, 1, 1, 1]), 1000.0, 0.001, 0.002)
+    result = close_out(result, price, 0.001, 0.002)
+    ledger = result['ledger']
+    assert len(ledger) == 2
+    assert ledger.column('side')[-1] == SELL and ledger.column('reason')[-1] == PERIOD_END
+    units = ledger.column('units')[0]
+    value = units * 120.0 * (1 - 0.002)
+    assert ledger.column('effective_price')[-1] == pytest.approx(120.0 * (1 - 0.002))
+    assert ledger.column('fee')[-1] == pytest.approx(value * 0.001)
+    assert result['total'][-1] == result['cash'][-1] == pytest.approx(value * (1 - 0.001))
+    assert result['positions'][-1] == 0.0
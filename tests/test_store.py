@@ -0,0 +1,83 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from store import COLUMNS, CandleSeries, CandleStore
+from synthetic import DEFAULT_START, synthetic_ohlcv
+
+SYMBOL = 'BTC/USDT'
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+CANDLES = synthetic_ohlcv(200, timeframe='1h', start=DEFAULT_START, seed=1)
+
+
+def columns(df):
+    return {'timestamp': df.index.asi8 // 10 ** 6, **{name: df[name].to_numpy() for name in OHLCV}}
+
+
+def frame(series):
+    return series.frame()[OHLCV]
+
+
+def test_append_extends_generation_and_merge_swaps(tmp_path):
+    series = CandleStore(str(tmp_path)).series('synthetic', SYMBOL, '1h')
+    series.write(columns(CANDLES.iloc[:100]))
+    series.write(columns(CANDLES.iloc[100:150]))
+    assert series._manifest() == (0, 150)
+    pd.testing.assert_frame_equal(frame(series), CANDLES.iloc[:150][OHLCV], check_freq=False)
+
+    # 겹치는 구간은 새 값으로 바꾸고 다음 세대 파일로 교체, 이전 세대 파일은 삭제
+    update = CANDLES.iloc[140:160].copy()
+    update['close'] += 1.0
+    series.write(columns(update))
+    assert series._manifest() == (1, 160)
+    assert sorted(name for name in os.listdir(series.path) if name.endswith('.bin')) == \
+        sorted(f"{name}.1.bin" for name, _ in COLUMNS)
+    pd.testing.assert_frame_equal(frame(series), pd.concat((CANDLES.iloc[:140], update))[OHLCV], check_freq=False)
+
+    series.write(columns(CANDLES.iloc[160:170]))
+    assert series._manifest() == (1, 170)
+    assert len(series) == 170
+
+
+# 병합 도중 manifest를 바꾸기 전에 중단되면 이전 세대가 그대로 읽힘
+def test_interrupted_merge_keeps_previous_generation(tmp_path, monkeypatch):
+    series = CandleStore(str(tmp_path)).series('synthetic', SYMBOL, '1h')
+    series.write(columns(CANDLES.iloc[:100]))
+
+    def crash(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(CandleSeries, '_write_manifest', crash)
+    update = CANDLES.iloc[50:120].copy()
+    update['close'] *= 2
+    with pytest.raises(OSError):
+        series.write(columns(update))
+    assert os.path.exists(series._file('close', 1))
+    pd.testing.assert_frame_equal(frame(series), CANDLES.iloc[:100][OHLCV], check_freq=False)
+
+    monkeypatch.undo()
+    series.write(columns(update))
+    assert series._manifest() == (1, 120)
+    pd.testing.assert_frame_equal(frame(series), pd.concat((CANDLES.iloc[:50], update))[OHLCV], check_freq=False)
+
+
+# manifest 도입 이전 파일(<열>.bin만 있음)도 읽고 이어 쓰기
+def test_legacy_series_without_manifest(tmp_path):
+    store = CandleStore(str(tmp_path))
+    series = store.series('synthetic', SYMBOL, '1h')
+    os.makedirs(series.path)
+    legacy = columns(CANDLES.iloc[:30])
+    for name, dtype in COLUMNS:
+        with open(series._file(name), 'wb') as f:
+            f.write(np.asarray(legacy[name], dtype=dtype).tobytes())
+    assert store.timeframes('synthetic', SYMBOL) == ['1h']
+    pd.testing.assert_frame_equal(frame(series), CANDLES.iloc[:30][OHLCV], check_freq=False)
+
+    series.write(columns(CANDLES.iloc[30:40]))
+    assert series._manifest() == (0, 40)
+    # manifest 길이보다 짧은 열 파일은 가장 짧은 열 길이까지만 읽음
+    with open(os.path.join(series.path, 'manifest.json'), 'w') as f:
+        json.dump({'generation': 0, 'length': 45}, f)
+    assert len(series) == 40
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies import MATRIX_STRATEGIES, STRATEGIES, signal_matrix
+from synthetic import synthetic_ohlcv
+
+PARAMS = {
+    "MA 교차": {'short_window': 10, 'long_window': 30},
+    "RSI": {'rsi_period': 14, 'oversold': 40, 'overbought': 60},
+    "볼린저 밴드": {'window': 20, 'num_std': 1.5},
+}
+
+
+# 종가 행렬의 신호가 코인별 단일 전략 신호와 같은지 확인 (지표 블록 경계를 넘는 길이, 상장 전/중간 빈 구간 포함)
+@pytest.mark.parametrize('strategy', MATRIX_STRATEGIES)
+def test_signal_matrix_matches_single_strategy(strategy):
+    close = pd.DataFrame({symbol: synthetic_ohlcv(10000, seed=seed)['close']
+                          for seed, symbol in enumerate(['A', 'B', 'C', 'D'])})
+    close.iloc[:700, 1] = np.nan
+    close.iloc[5000:5030, 2] = np.nan
+    matrix = signal_matrix(strategy, close, **PARAMS[strategy])
+    assert matrix.shape == close.shape
+    for symbol in close.columns:
+        df = close[[symbol]].rename(columns={symbol: 'close'})
+        single = STRATEGIES[strategy][0](df, **PARAMS[strategy])['signal']
+        np.testing.assert_array_equal(matrix[symbol], single)
+
+
+def test_signal_matrix_rejects_unsupported_strategy():
+    close = pd.DataFrame({'A': synthetic_ohlcv(100)['close']})
+    with pytest.raises(ValueError, match="복합 전략"):
+        signal_matrix("복합 전략", close, legs=[], combine='and')
+    with pytest.raises(ValueError):
+        signal_matrix("없는 전략", close)
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import backtest
+from strategies import STRATEGIES
+from streaming import StreamingBacktest
+from synthetic import synthetic_ohlcv
+
+PARAMS = {
+    "MA 교차": {'short_window': 10, 'long_window': 30},
+    "RSI": {'rsi_period': 14, 'oversold': 40, 'overbought': 60},
+    "볼린저 밴드": {'window': 20, 'num_std': 1.5},
+}
+
+
+# 무작위 크기의 구간으로 캔들을 나눠 넣은 결과가 전체를 한 번에 백테스팅한 결과와 비트 단위로 같은지 확인
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('strategy', list(PARAMS))
+def test_chunked_updates_match_batch(strategy, seed):
+    df = synthetic_ohlcv(1500, '1h', seed=seed)
+    params = PARAMS[strategy]
+    stream = StreamingBacktest(strategy, params, 1000.0, 0.001, 0.002)
+
+    rng = np.random.default_rng(seed)
+    end = 0
+    while end < len(df):
+        end = min(len(df), end + int(rng.integers(1, 200)))
+        stream.update(df.iloc[:end])
+    portfolio, trades = stream.results()
+
+    expected_portfolio, expected_trades = backtest(STRATEGIES[strategy][0](df, **params), 1000.0, 0.001, 0.002)
+    assert len(expected_trades) > 0
+    pd.testing.assert_frame_equal(portfolio, expected_portfolio, check_exact=True, check_freq=False)
+    pd.testing.assert_frame_equal(trades.reset_index(drop=True), expected_trades.reset_index(drop=True),
+                                  check_exact=True)
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from engine import simulate
+from metrics import performance, periods_per_year
+from strategies import STRATEGIES
+from sweep import RESULT_COLUMNS, parameter_grid, run_sweep
+from synthetic import synthetic_ohlcv
+
+
+# 1h 캔들 중 앞 구간은 한 봉씩 건너뛰어 타임스탬프 간격의 중앙값이 2시간인 데이터
+def gappy_candles():
+    df = synthetic_ohlcv(1000, timeframe='1h', seed=5)
+    keep = (np.arange(len(df)) % 2 == 0) | (np.arange(len(df)) >= 800)
+    return df[keep]
+
+
+# 탐색 결과의 샤프/소르티노/칼마 비율이 선택한 시간 프레임으로 연율화한 단일 백테스트와 같음
+@pytest.mark.parametrize('workers', [1, 2])
+def test_sweep_annualized_by_timeframe(workers):
+    df = gappy_candles()
+    assert periods_per_year(index=df.index) != periods_per_year('1h')
+    grid = parameter_grid("MA 교차", short_window=[5, 10], long_window=[20, 40])
+    results = run_sweep(df, "MA 교차", grid, 1000.0, 0.001, 0.001, workers=workers,
+                        periods=periods_per_year('1h'))
+    for _, row in results.iterrows():
+        params = {'short_window': int(row['short_window']), 'long_window': int(row['long_window'])}
+        signals = STRATEGIES["MA 교차"][0](df, **params)
+        result = simulate(signals['price'].to_numpy(), signals['signal'].to_numpy(), 1000.0, 0.001, 0.001)
+        metrics = performance(result['total'], result['ledger'], 1000.0, periods_per_year('1h'))
+        assert [row[column] for column in RESULT_COLUMNS] == pytest.approx([metrics[column] for column in RESULT_COLUMNS])
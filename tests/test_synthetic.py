@@ -0,0 +1,15 @@
+import pytest
+
+from synthetic import DEFAULT_START, synthetic_ohlcv
+
+HOUR = 60 * 60 * 1000
+
+
+# 길이는 bars 또는 end로 지정 (둘 다 없으면 오류)
+def test_length_from_bars_or_end():
+    assert len(synthetic_ohlcv(10)) == 10
+    by_end = synthetic_ohlcv(end=DEFAULT_START + 10 * HOUR, start=DEFAULT_START)
+    assert len(by_end) == 10 and by_end.index[0].value // 10 ** 6 == DEFAULT_START
+    assert synthetic_ohlcv(5, end=DEFAULT_START + 10 * HOUR).index[0].value // 10 ** 6 == DEFAULT_START + 5 * HOUR
+    with pytest.raises(ValueError):
+        synthetic_ohlcv()
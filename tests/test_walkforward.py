@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import simulate
+from stops import PERIOD_END
+from sweep import parameter_grid
+from synthetic import synthetic_ohlcv
+from walkforward import close_out, fold_windows, out_of_sample, walk_forward
+
+CANDLES = synthetic_ohlcv(1200, timeframe='1h', seed=7)
+GRID = parameter_grid("MA 교차", short_window=[5, 10], long_window=[20, 40])
+COSTS = (1000.0, 0.001, 0.002)
+
+
+def run(workers):
+    return walk_forward(CANDLES, "MA 교차", GRID, 400, 200, *COSTS, workers=workers)
+
+
+# 검증 구간 자산은 끊김 없이 이어짐: 각 fold는 직전 fold의 마지막 자산에서 시작한 것과 같음
+def test_out_of_sample_equity_is_continuous():
+    folds, portfolio, trades = run(1)
+    windows = fold_windows(len(CANDLES), 400, 200)
+    assert len(folds) == len(windows) == 4
+    assert portfolio.index.equals(CANDLES.index[windows[0][1]:windows[-1][2]])
+
+    carry = COSTS[0]
+    for k, (window, (_, row)) in enumerate(zip(windows, folds.iterrows())):
+        params = {name: row[name] for name in GRID[0]}
+        total, _, _ = out_of_sample(CANDLES, "MA 교차", params, *window, *COSTS)
+        stitched = portfolio['total'][portfolio['fold'] == k + 1].to_numpy()
+        np.testing.assert_allclose(stitched, total * carry / COSTS[0])
+        carry = stitched[-1]
+    assert portfolio['total'].iloc[-1] == carry
+
+
+# 구간 끝 청산도 슬리피지와 수수료를 내고 period_end로 기록
+def test_period_end_close_out_charges_costs():
+    price = CANDLES['close'].to_numpy()[:50]
+    _, fee_ratio, slippage_ratio = COSTS
+    result = simulate(price, np.ones(len(price)), 1000.0, fee_ratio, slippage_ratio, prev_signal=0, offset=100)
+    ledger = result['ledger']
+    assert len(ledger) == 1
+    bought_value, bought_fee, units = ledger.column('value')[0], ledger.column('fee')[0], ledger.column('units')[0]
+
+    result = close_out(result, price, fee_ratio, slippage_ratio, offset=100)
+    assert len(ledger) == 2 and ledger.column('reason')[-1] == PERIOD_END
+    assert ledger.column('bar')[-1] == 149
+    sell_price = price[-1] * (1 - slippage_ratio)
+    value = units * sell_price
+    fee = value * fee_ratio
+    assert ledger.column('effective_price')[-1] == pytest.approx(sell_price)
+    assert ledger.column('fee')[-1] == pytest.approx(fee)
+    assert ledger.column('profit')[-1] == pytest.approx(value - bought_value - bought_fee - fee)
+    assert result['total'][-1] == result['cash'][-1] == pytest.approx(value - fee)
+    assert result['positions'][-1] == 0.0
+
+
+# 워커 1개와 프로세스 풀의 결과가 같음
+def test_workers_give_identical_results():
+    serial = run(1)
+    parallel = run(2)
+    for left, right in zip(serial, parallel):
+        pd.testing.assert_frame_equal(left, right)
+    trades = serial[2]
+    assert (trades['reason'] == 'period_end').any()
@@ -0,0 +1,174 @@
+import itertools
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from engine import SELL, simulate
+from stops import PERIOD_END
+from strategies import STRATEGIES
+from metrics import periods_per_year
+from sweep import RESULT_COLUMNS, SharedOHLCV, _init_worker, _shared, result_row, run_params
+
+# 거래 기록에서 자본 크기에 비례하는 열 (fold 결과를 이어 붙일 때 배율 적용)
+SCALED_COLUMNS = ['units', 'value', 'fee', 'profit']
+
+
+# 학습/검증 구간 (봉 위치): 학습 구간 바로 뒤를 검증하고, 검증 길이만큼 밀면서 반복
+def fold_windows(n, train_bars, test_bars):
+    windows = []
+    start = 0
+    while start + train_bars < n:
+        windows.append((start, start + train_bars, min(start + train_bars + test_bars, n)))
+        start += test_bars
+    return windows
+
+
+# 구간 마지막 봉에 보유 중인 코인을 종가에 슬리피지와 수수료를 반영해 매도하고 거래 기록에 남김
+def close_out(result, price, fee_ratio, slippage_ratio, offset=0):
+    ledger = result['ledger']
+    if len(ledger) == 0 or ledger.column('side')[-1] == SELL:
+        return result
+    units = ledger.column('units')[-1]
+    sell_price = price[-1] * (1 - slippage_ratio)
+    value = units * sell_price
+    fee = value * fee_ratio
+    profit = value - ledger.column('value')[-1] - ledger.column('fee')[-1] - fee
+    ledger.append(offset + len(price) - 1, SELL, price[-1], sell_price, units, value, fee, profit, PERIOD_END)
+    for name in ('total', 'cash', 'positions'):
+        result[name] = result[name].copy()
+    result['positions'][-1] = 0.0
+    result['cash'][-1] = result['total'][-1] = value - fee
+    return result
+
+
+# 학습 구간에서 고른 파라미터를 검증 구간에서 평가
+# 지표 계산은 학습 구간부터 시작해 검증 첫 봉부터 지표가 채워져 있도록 하고, 거래는 검증 구간에서만 실행
+# 검증 구간 끝에 보유 중인 코인은 마지막 봉에 청산 (fold마다 파라미터가 달라 포지션을 넘기지 않음)
+def out_of_sample(df, strategy, params, train_lo, test_lo, test_hi, initial_capital, fee_ratio, slippage_ratio,
+                  periods=None):
+    signals = STRATEGIES[strategy][0](df.iloc[train_lo:test_hi], **params)
+    skip = test_lo - train_lo
+    price = signals['price'].to_numpy()[skip:]
+    result = simulate(price, signals['signal'].to_numpy()[skip:],
+                      initial_capital, fee_ratio, slippage_ratio, offset=test_lo)
+    result = close_out(result, price, fee_ratio, slippage_ratio, offset=test_lo)
+    periods = periods or periods_per_year(index=df.index)
+    return result['total'], result['ledger'], result_row(result['total'], result['ledger'], initial_capital, periods)
+
+
+def _train_chunk(strategy, lo, hi, chunk):
+    df = _shared['df'].iloc[lo:hi]
+    return [run_params(df, strategy, params, *_shared['costs'], _shared['periods']) for params in chunk]
+
+
+def _test_fold(strategy, params, window):
+    return out_of_sample(_shared['df'], strategy, params, *window, *_shared['costs'], _shared['periods'])
+
+
+# 워크포워드 최적화
+# 각 fold의 학습 구간에서 그리드 전체를 실행해 objective 기준 최고 조합을 고르고, 이어지는 검증 구간에서 평가한다.
+# 모든 fold의 그리드와 검증은 공유 메모리의 OHLCV 한 벌을 쓰는 프로세스 풀 하나에서 실행한다.
+# periods: 1년 동안의 봉 수 (생략하면 타임스탬프 간격으로 추정)
+# 반환값: (fold별 결과, 이어 붙인 검증 구간 포트폴리오, 검증 구간 거래 기록)
+def walk_forward(df, strategy, grid, train_bars, test_bars, initial_capital=1000.0, fee_ratio=0.001,
+                 slippage_ratio=0.001, objective='total_return', workers=None, progress=None, periods=None):
+    windows = fold_windows(len(df), train_bars, test_bars)
+    if not windows:
+        raise ValueError("데이터가 학습 기간보다 짧아 워크포워드를 실행할 수 없습니다.")
+    workers = workers or os.cpu_count() or 1
+    costs = (initial_capital, fee_ratio, slippage_ratio)
+    periods = periods or periods_per_year(index=df.index)
+    total_tasks = len(windows) * (len(grid) + 1)
+    done = 0
+    train_rows = [[None] * len(grid) for _ in windows]
+
+    def report(count):
+        nonlocal done
+        done += count
+        if progress:
+            progress(done, total_tasks)
+
+    if workers == 1:
+        for k, (lo, mid, _) in enumerate(windows):
+            train = df.iloc[lo:mid]
+            for i, params in enumerate(grid):
+                train_rows[k][i] = run_params(train, strategy, params, *costs, periods)
+                report(1)
+        best = _best(train_rows, objective)
+        tests = []
+        for i, window in zip(best, windows):
+            tests.append(out_of_sample(df, strategy, grid[i], *window, *costs, periods))
+            report(1)
+    else:
+        # fold 수만큼 작업이 늘어나므로 전체 작업 수 기준으로 묶음 크기 결정
+        size = max(1, len(grid) * len(windows) // (workers * 8))
+        chunks = [grid[i:i + size] for i in range(0, len(grid), size)]
+        offsets = np.cumsum([0] + [len(chunk) for chunk in chunks])
+        with SharedOHLCV(df) as shared:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(*shared.handle, *costs, periods)) as pool:
+                futures = {
+                    pool.submit(_train_chunk, strategy, lo, mid, chunk): (k, offsets[c])
+                    for (k, (lo, mid, _)), (c, chunk) in itertools.product(enumerate(windows), enumerate(chunks))
+                }
+                for future in as_completed(futures):
+                    k, offset = futures[future]
+                    rows = future.result()
+                    train_rows[k][offset:offset + len(rows)] = rows
+                    report(len(rows))
+                best = _best(train_rows, objective)
+                tests = []
+                for result in pool.map(_test_fold, itertools.repeat(strategy), [grid[i] for i in best], windows):
+                    tests.append(result)
+                    report(1)
+
+    return _stitch(df, grid, windows, train_rows, best, tests, initial_capital)
+
+
+# fold별 objective 기준 최고 조합의 그리드 위치
+def _best(train_rows, objective):
+    column = RESULT_COLUMNS.index(objective)
+    return [int(np.argmax([row[column] for row in rows])) for rows in train_rows]
+
+
+# 검증 구간 결과를 순서대로 연결: 각 fold는 같은 초기 자본으로 계산되므로 직전 fold의 마지막 자산 비율만큼 배율 적용
+# (fold 끝의 포지션은 out_of_sample에서 수수료와 슬리피지를 내고 청산했으므로 다음 fold는 현금으로 시작)
+def _stitch(df, grid, windows, train_rows, best, tests, initial_capital):
+    index = df.index
+    carry = float(initial_capital)
+    totals, fold_ids, trades, rows = [], [], [], []
+    for k, ((lo, mid, hi), i, (total, ledger, metrics)) in enumerate(zip(windows, best, tests)):
+        scale = carry / initial_capital
+        totals.append(total * scale)
+        fold_ids.append(np.full(len(total), k + 1))
+        fold_trades = ledger.to_frame(index)
+        fold_trades[SCALED_COLUMNS] *= scale
+        fold_trades.insert(0, 'fold', k + 1)
+        trades.append(fold_trades)
+        carry = float(totals[-1][-1])
+
+        train_metrics = train_rows[k][i]
+        rows.append({
+            'fold': k + 1,
+            'train_start': index[lo],
+            'train_end': index[mid - 1],
+            'test_start': index[mid],
+            'test_end': index[hi - 1],
+            **grid[i],
+            'train_return': train_metrics[0],
+            'train_sharpe': train_metrics[2],
+            'test_return': metrics[0],
+            'test_max_drawdown': metrics[1],
+            'test_sharpe': metrics[2],
+            'test_trades': metrics[3],
+        })
+
+    start = windows[0][1]
+    portfolio = pd.DataFrame(index=index[start:start + sum(len(total) for total in totals)])
+    portfolio['total'] = np.concatenate(totals)
+    portfolio['returns'] = portfolio['total'].pct_change()
+    portfolio['fold'] = np.concatenate(fold_ids)
+    return pd.DataFrame(rows), portfolio, pd.concat(trades, ignore_index=True)